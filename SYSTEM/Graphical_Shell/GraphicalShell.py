@@ -2,68 +2,103 @@ import pygame
 import sys
 import os
 import time
-import subprocess
-from datetime import datetime
 from pygame import mixer
 
-pygame.init()
-mixer.init()
+GRAPHICAL_SHELL_DIR = os.path.dirname(os.path.abspath(__file__))
+SHELLOS_DIR = os.path.abspath(os.path.join(GRAPHICAL_SHELL_DIR, "..", ".."))
+sys.path.append(os.path.join(SHELLOS_DIR, "SYSTEM"))
+
+import ShlOSConfig
+import ShlOSSession
+from compositor import Compositor
+from surfacecache import SurfaceCache
+from clockwidget import ClockWidget
+from wallpaper import WallpaperService
+from zygote import ZygotePool
+from taskmanager import ProcessRegistry, TaskManagerPanel
+from lockscreen import LockScreen
+from programregistry import ProgramRegistry
+from iconatlas import IconService
+from programsearch import ProgramIndex, LaunchCounts
+from frameprofiler import FrameProfiler
 
 WIDTH, HEIGHT = 1509, 890
 TASKBAR_HEIGHT = 30
 DEFAULT_BG = "ShellOS_1.png"
 
-GRAPHICAL_SHELL_DIR = os.path.dirname(os.path.abspath(__file__))
-SHELLOS_DIR = os.path.abspath(os.path.join(GRAPHICAL_SHELL_DIR, "..", ".."))
 ICON_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "shellos.png")
 ICO_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "shellos.ico")
 SOUND_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "sounds", "ShlosStartup.mp3")
 BACKGROUND_FOLDER = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "backgrounds")
+# wallpaper variants, icon atlases, the program list, launch counts and traces all live in here
+CACHE_DIR = os.path.join(SHELLOS_DIR, "SYSTEM", "cache")
 LAUNCHER_ICON_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "launcher.png")
 FILEMGR_ICON_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "filemgr.png")
-BROWSER_ICON_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "browser.ico")
+BROWSER_ICON_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "Browser.ico")
 TERMINAL_ICON_PATH = os.path.join(SHELLOS_DIR, "SYSTEM", "Graphical_Shell", "icons", "terminal.png")
 
 PROGRESS_BAR_WIDTH = 300
 PROGRESS_BAR_HEIGHT = 10
 PROGRESS_BAR_BORDER = 2
 
-programs = {
-    "About Shellos": "System64/Programs/about.py",
-    "Calculator": "System64/Programs/calc.py",
-    "File Manager": "System64/Programs/filemgr.py",
-    "Terminal": "System64/Programs/terminal.py",
-    "Notepad": "System64/Programs/notepad.py",
-    "ShellOS Browser": "System64/Programs/ShellOS-Browser/browser.py",
-    "Tic Tac Toe": "System64/Programs/games/ttt.py",
-    "Settings": "System64/Programs/settings.py",
-}
-
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("ShellOS")
-
-try:
-    pygame.display.set_icon(pygame.image.load(ICON_PATH))
-except pygame.error as e:
-    print(f"Warning: Could not load window icon: {e}")
-    pygame.display.set_icon(pygame.Surface((32, 32), pygame.SRCALPHA))
-
-if sys.platform == "win32":
+TASKBAR_COLOR_RGB = (15, 6, 27)
+TASKBAR_ALPHA = 200
+
+START_MENU_COLOR_RGB = (10, 4, 18)
+START_MENU_ALPHA = 220
+
+WHITE = (255, 255, 255)
+
+# posted when the minute changes so the taskbar clock can redraw
+CLOCK_TICK_EVENT = pygame.USEREVENT + 1
+# posted once the window has stopped changing size for a moment
+WALLPAPER_SETTLE_EVENT = pygame.USEREVENT + 2
+WALLPAPER_SETTLE_MS = 200
+# how often idle launcher workers are checked for eviction
+LAUNCHER_REAP_EVENT = pygame.USEREVENT + 3
+LAUNCHER_REAP_MS = 60 * 1000
+# reaps exited programs and refreshes the task manager while anything is running
+PROCESS_POLL_EVENT = pygame.USEREVENT + 4
+PROCESS_POLL_MS = 1000
+# posted by the icon loader thread when an atlas is ready to draw from
+ICONS_READY_EVENT = pygame.USEREVENT + 5
+# posted by the wallpaper service once the smooth scale for a new window size is done
+WALLPAPER_READY_EVENT = pygame.USEREVENT + 6
+
+INPUT_EVENTS = {pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL, pygame.KEYDOWN, pygame.TEXTINPUT}
+
+TASKBAR_ICON_SIZE = (26, 26)
+MENU_ICON_SIZE = (20, 20)
+
+# folders scanned for start menu programs, earlier folders win on duplicate names
+PROGRAM_DIRS = [
+    os.path.join(SHELLOS_DIR, "System64", "programs"),
+    os.path.join(SHELLOS_DIR, "System64", "programs", "games"),
+]
+
+FILEMGR_PROGRAM = "System64/programs/filemgr.py"
+BROWSER_PROGRAM = "System64/programs/ShellOS-Browser/browser.py"
+TERMINAL_PROGRAM = "System64/programs/terminal.py"
+ABOUT_PROGRAM = "System64/programs/about.py"
+SETTINGS_PROGRAM = "System64/programs/settings.py"
+
+def set_window_icon():
     try:
-        import ctypes
-        hwnd = pygame.display.get_wm_info()["window"]
-        ctypes.windll.user32.SendMessageW(hwnd, 0x80, 0, ctypes.windll.shell32.ExtractIconW(0, ICO_PATH, 0))
-    except (ImportError, AttributeError, FileNotFoundError) as e:
-        print(f"Warning: Could not set Windows taskbar icon: {e}")
-
-try:
-    logo_img = pygame.image.load(ICON_PATH).convert_alpha()
-except pygame.error as e:
-    print(f"Error: Could not load logo image for splash screen: {e}")
-    logo_img = pygame.Surface((100, 100), pygame.SRCALPHA)
-
-def get_scaled_logo():
-    max_width, max_height = WIDTH * 0.8, HEIGHT * 0.6
+        pygame.display.set_icon(pygame.image.load(ICON_PATH))
+    except pygame.error as e:
+        print(f"Warning: Could not load window icon: {e}")
+        pygame.display.set_icon(pygame.Surface((32, 32), pygame.SRCALPHA))
+
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            hwnd = pygame.display.get_wm_info()["window"]
+            ctypes.windll.user32.SendMessageW(hwnd, 0x80, 0, ctypes.windll.shell32.ExtractIconW(0, ICO_PATH, 0))
+        except (ImportError, AttributeError, FileNotFoundError) as e:
+            print(f"Warning: Could not set Windows taskbar icon: {e}")
+
+def get_scaled_logo(logo_img, width, height):
+    max_width, max_height = width * 0.8, height * 0.6
     if logo_img.get_width() == 0 or logo_img.get_height() == 0:
         return pygame.Surface((1,1), pygame.SRCALPHA)
     ratio = min(max_width / logo_img.get_width(), max_height / logo_img.get_height())
@@ -83,322 +118,689 @@ def draw_progress_bar(screen, x, y, width, height, progress, border=2):
         progress_rect = pygame.Rect(x, y, progress_width, height)
         pygame.draw.rect(screen, (255, 255, 255), progress_rect, border_radius=3)
 
-scaled_logo = get_scaled_logo()
+def run_splash(screen, width, height, tasks):
+    """
+    Shows the boot logo while the desktop's startup tasks run, one per frame, so the
+    progress bar follows the actual work. Returns the window size, or None if the
+    window was closed.
+    """
+    try:
+        logo_img = pygame.image.load(ICON_PATH).convert_alpha()
+    except pygame.error as e:
+        print(f"Error: Could not load logo image for splash screen: {e}")
+        logo_img = pygame.Surface((100, 100), pygame.SRCALPHA)
 
-start_time = time.time()
-clock = pygame.time.Clock()
-progress = 0.0
-running = True
+    scaled_logo = get_scaled_logo(logo_img, width, height)
+    completed = 0
 
-while running:
-    current_time_splash = time.time()
-    elapsed = current_time_splash - start_time
-    progress = min(elapsed / 10.0, 1.0)
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return None
+            elif event.type == pygame.VIDEORESIZE:
+                width, height = event.w, event.h
+                screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+                scaled_logo = get_scaled_logo(logo_img, width, height)
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            sys.exit()
-        elif event.type == pygame.VIDEORESIZE:
-            WIDTH, HEIGHT = event.w, event.h
-            screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-            scaled_logo = get_scaled_logo()
+        progress = completed / len(tasks) if tasks else 1.0
 
-    screen.fill((0, 0, 0))
+        screen.fill((0, 0, 0))
 
-    logo_rect = scaled_logo.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 30))
-    screen.blit(scaled_logo, logo_rect)
+        logo_rect = scaled_logo.get_rect(center=(width // 2, height // 2 - 30))
+        screen.blit(scaled_logo, logo_rect)
 
-    bar_x = (WIDTH - PROGRESS_BAR_WIDTH) // 2
-    bar_y = HEIGHT - 80
-    draw_progress_bar(screen, bar_x, bar_y, PROGRESS_BAR_WIDTH, PROGRESS_BAR_HEIGHT, progress)
-    
-    pygame.display.flip()
-    clock.tick(60)
+        bar_x = (width - PROGRESS_BAR_WIDTH) // 2
+        bar_y = height - 80
+        draw_progress_bar(screen, bar_x, bar_y, PROGRESS_BAR_WIDTH, PROGRESS_BAR_HEIGHT, progress)
 
-    if progress >= 1.0 and elapsed >= 10:
-        try:
-            mixer.music.load(SOUND_PATH)
-            mixer.music.play()
-            while mixer.music.get_busy():
-                pygame.time.delay(100)
-        except pygame.error as e:
-            print(f"Warning: Could not play startup sound: {e}")
-        running = False
-
-bg_error_shown = False
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-
-def load_background():
-    global bg_error_shown
-    bg_path = os.path.join(BACKGROUND_FOLDER, DEFAULT_BG)
-    if os.path.exists(bg_path):
-        return pygame.image.load(bg_path).convert()
-    else:
-        if not bg_error_shown:
-            print(f"Error: Background file not found: {bg_path}")
-            bg_error_shown = True
-        return None
+        pygame.display.flip()
 
-bg_image = load_background()
-if bg_image is None:
-    bg_image = pygame.Surface((WIDTH, HEIGHT))
-
-launcher_button_rect = pygame.Rect(5, 2, 26, 26)
-try:
-    launcher_icon = pygame.image.load(LAUNCHER_ICON_PATH).convert_alpha()
-    launcher_icon_scaled = pygame.transform.smoothscale(launcher_icon, (launcher_button_rect.width, launcher_button_rect.height))
-except pygame.error as e:
-    print(f"Warning: Launcher icon not found: {e}")
-    launcher_icon_scaled = pygame.Surface((launcher_button_rect.width, launcher_button_rect.height), pygame.SRCALPHA)
-
-filemgr_button_rect = pygame.Rect(35, 2, 26, 26) 
-try:
-    filemgr_icon = pygame.image.load(FILEMGR_ICON_PATH).convert_alpha()
-    filemgr_icon_scaled = pygame.transform.smoothscale(filemgr_icon, (filemgr_button_rect.width, filemgr_button_rect.height))
-    filemgr_icon_available = True
-except pygame.error:
-    print(f"Warning: File manager icon not found at {FILEMGR_ICON_PATH}")
-    filemgr_icon_available = False
-
-browser_button_rect = pygame.Rect(65, 2, 26, 26)
-try:
-    browser_icon = pygame.image.load(BROWSER_ICON_PATH).convert_alpha()
-    browser_icon_scaled = pygame.transform.smoothscale(browser_icon, (browser_button_rect.width, browser_button_rect.height))
-    browser_icon_available = True
-except pygame.error:
-    print(f"Warning: ShellOS Browser icon not found at {BROWSER_ICON_PATH}")
-    browser_icon_available = False
-
-terminal_button_rect = pygame.Rect(95, 2, 26, 26) 
-try:
-    terminal_icon = pygame.image.load(TERMINAL_ICON_PATH).convert_alpha()
-    terminal_icon_scaled = pygame.transform.smoothscale(terminal_icon, (terminal_button_rect.width, terminal_button_rect.height))
-    terminal_icon_available = True
-except pygame.error:
-    print(f"Warning: Terminal icon not found at {TERMINAL_ICON_PATH}")
-    terminal_icon_available = False
+        if completed >= len(tasks):
+            return width, height
 
-TASKBAR_COLOR_RGB = (15, 6, 27)
-TASKBAR_ALPHA = 200
+        name, task = tasks[completed]
+        task()
+        completed += 1
 
-START_MENU_COLOR_RGB = (10, 4, 18)
-START_MENU_ALPHA = 220
+def play_startup_sound():
+    # music plays on its own in the mixer's thread, nothing waits for it to finish
+    try:
+        mixer.music.load(SOUND_PATH)
+        mixer.music.play()
+    except pygame.error as e:
+        print(f"Warning: Could not play startup sound: {e}")
+
+def draw_panel(surface, cache, rect, color_rgb, alpha, radius=0):
+    """Blits a translucent (optionally rounded) panel, reusing the cached surface for its size and colour."""
+    surface.blit(cache.panel(rect.size, color_rgb, alpha, radius), rect.topleft)
+
+class Desktop:
+    menu_item_height = 28
+    menu_width = 200
+    max_visible_items = 10
+    special_menu_items = ["Shutdown", "About ShellOS", "Settings Panel", "Task Manager"]
+    special_menu_item_height = 25
+    special_menu_width = 160
+
+    def __init__(self, screen, width, height, cache_dir=CACHE_DIR):
+        self.screen = screen
+        self.cache_dir = cache_dir
+        # F3 shows frame times, Shift+F3 saves them as a Chrome trace
+        self.profiler = FrameProfiler()
+        self.compositor = Compositor(screen, self.profiler)
+        self.surfaces = SurfaceCache()
+        self.current_width, self.current_height = width, height
+        self.running = True
+
+        self.launcher_button_rect = pygame.Rect(5, 2, 26, 26)
+        self.filemgr_button_rect = pygame.Rect(35, 2, 26, 26)
+        self.browser_button_rect = pygame.Rect(65, 2, 26, 26)
+        self.terminal_button_rect = pygame.Rect(95, 2, 26, 26)
+
+        # starts decoding now so it overlaps the other startup tasks
+        self.wallpaper = WallpaperService(
+            os.path.join(BACKGROUND_FOLDER, DEFAULT_BG), os.path.join(cache_dir, "wallpapers"), ready_event=WALLPAPER_READY_EVENT
+        )
+        self.wallpaper.start((width, height))
+        self.icons = IconService(os.path.join(cache_dir, "icons"), ready_event=ICONS_READY_EVENT)
+        self.icons.request(TASKBAR_ICON_SIZE, {
+            "launcher": LAUNCHER_ICON_PATH,
+            "filemgr": FILEMGR_ICON_PATH,
+            "browser": BROWSER_ICON_PATH,
+            "terminal": TERMINAL_ICON_PATH,
+        })
+
+        families = [f.strip() for f in ShlOSConfig.get_str("Launcher", "warm_toolkits", "tk, qt, pygame").split(",") if f.strip()]
+        self.launcher = ZygotePool(
+            families=families,
+            pool_size=ShlOSConfig.get_int("Launcher", "pool_size", 1),
+            idle_timeout=ShlOSConfig.get_int("Launcher", "idle_timeout", 600),
+        )
+        self.processes = ProcessRegistry(sample_interval=ShlOSConfig.get_float("TaskManager", "sample_interval", 2.0))
+        self.task_manager = None
+        self.polling_processes = False
+        self.programs = ProgramRegistry(PROGRAM_DIRS, os.path.join(cache_dir, "programs.json"))
+        self.launch_counts = LaunchCounts(os.path.join(cache_dir, "launch_counts.json"))
+        self.program_index = ProgramIndex(counts=self.launch_counts)
+
+        # filled in by the startup tasks
+        self.bg_image_scaled = None
+        self.font = None
+        self.clock_font = None
+        self.menu_items = []
+
+        self.clock_widget = None
+        self.clock_label_x = width
+        self.dots_menu_rect = pygame.Rect(0, 0, 0, 0)
+
+        # whatever the mouse is over: "filemgr", "browser", "terminal", "dots" or ("menu", index)
+        self.mouse_pos = (-1, -1)
+        self.hover = None
+        # any input since the last clock tick keeps the login session from locking
+        self.had_input = False
+
+        self.menu_visible = False
+        self.scroll_offset = 0
+        self.search_query = ""
+
+        self.special_menu_open = False
+
+    def startup_tasks(self):
+        """The work that has to happen before the first desktop frame, in order."""
+        return [
+            ("Scaling icons", self.load_icons),
+            ("Loading fonts", self.load_fonts),
+            ("Finding programs", self.load_programs),
+            ("Decoding wallpaper", self.load_wallpaper),
+        ]
+
+    def prepare(self):
+        """Runs every startup task right away, for when there's no splash screen."""
+        for name, task in self.startup_tasks():
+            task()
+
+    def load_wallpaper(self):
+        self.bg_image_scaled = self.wallpaper.get((self.current_width, self.current_height))
+
+    def load_icons(self):
+        # the taskbar icons were requested in __init__, the first frame shouldn't go without them
+        self.icons.wait(TASKBAR_ICON_SIZE)
+
+    def load_fonts(self):
+        self.font = pygame.font.SysFont(None, 24)
+        self.clock_font = pygame.font.SysFont(None, 24)
+        # render once so the first frame doesn't pay for glyph rasterizing
+        for label in self.special_menu_items:
+            self.surfaces.text(self.font, label, WHITE)
+        self.task_manager = TaskManagerPanel(self.processes, self.font, self.surfaces)
+        self.lock_screen = LockScreen(self.font, self.surfaces)
+        self.clock_widget = ClockWidget(self.clock_font, WHITE, CLOCK_TICK_EVENT)
+        self.update_clock()
+
+    def load_programs(self):
+        self.programs.load()
+        self.launch_counts.load()
+        self.set_menu_items(self.programs.names())
+
+    def set_menu_items(self, items):
+        self.program_index.build(items)
+        self.menu_items = self.program_index.search(self.search_query)
+        for item in items:
+            self.surfaces.text(self.font, item, WHITE)
+        # menu icons aren't waited for, rows are drawn without them until ICONS_READY_EVENT
+        program_icons = {program.name: program.icon for program in self.programs.programs if program.icon}
+        if program_icons:
+            self.icons.request(MENU_ICON_SIZE, program_icons)
+
+    # --- layout ---
+
+    def taskbar_rect(self):
+        return pygame.Rect(0, 0, self.current_width, TASKBAR_HEIGHT)
+
+    def layout_taskbar(self):
+        """Places the clock and the dots menu against the right edge of the taskbar."""
+        clock_width = self.clock_widget.get_width() if self.clock_widget else 0
+        self.clock_label_x = self.current_width - clock_width - 10
+
+        dots_menu_width = 20
+        dots_menu_height = 20
+        dots_menu_margin_right = 10
+        self.dots_menu_rect = pygame.Rect(self.clock_label_x - dots_menu_width - dots_menu_margin_right, 5, dots_menu_width, dots_menu_height)
+        self.task_manager.screen_width = self.current_width
+
+    def search_rect(self):
+        """The row showing what's been typed, only there while searching."""
+        height = self.menu_item_height if self.search_query else 0
+        return pygame.Rect(5, TASKBAR_HEIGHT, self.menu_width, height)
+
+    def menu_rows(self):
+        """The (rect, item index) of each start menu row on screen."""
+        top = self.search_rect().bottom
+        visible_items = self.menu_items[self.scroll_offset:self.scroll_offset + self.max_visible_items]
+        return [
+            (pygame.Rect(5, top + i * self.menu_item_height, self.menu_width, self.menu_item_height), self.scroll_offset + i)
+            for i in range(len(visible_items))
+        ]
+
+    def menu_rect(self):
+        rows = min(self.max_visible_items, len(self.menu_items))
+        search_rect = self.search_rect()
+        return pygame.Rect(5, TASKBAR_HEIGHT, self.menu_width, search_rect.height + rows * self.menu_item_height)
+
+    def special_menu_rows(self):
+        return [
+            (pygame.Rect(self.dots_menu_rect.x, self.dots_menu_rect.bottom + i * self.special_menu_item_height, self.special_menu_width, self.special_menu_item_height), label)
+            for i, label in enumerate(self.special_menu_items)
+        ]
+
+    def special_menu_rect(self):
+        return pygame.Rect(self.dots_menu_rect.x, self.dots_menu_rect.bottom,
+                           self.special_menu_width, len(self.special_menu_items) * self.special_menu_item_height)
+
+    def profiler_rect(self):
+        return self.profiler.overlay_rect(self.current_width, self.current_height, self.font)
+
+    def hover_rect(self, hover):
+        if hover == "filemgr":
+            return self.filemgr_button_rect
+        if hover == "browser":
+            return self.browser_button_rect
+        if hover == "terminal":
+            return self.terminal_button_rect
+        if hover == "dots":
+            return self.dots_menu_rect
+        if isinstance(hover, tuple):
+            for rect, index in self.menu_rows():
+                if index == hover[1]:
+                    return rect
+        return None
 
-WHITE = (255, 255, 255)
+    def hit_test(self, pos):
+        if self.filemgr_button_rect.collidepoint(pos):
+            return "filemgr"
+        if self.browser_button_rect.collidepoint(pos):
+            return "browser"
+        if self.terminal_button_rect.collidepoint(pos):
+            return "terminal"
+        if self.dots_menu_rect.collidepoint(pos):
+            return "dots"
+        if self.menu_visible:
+            for rect, index in self.menu_rows():
+                if rect.collidepoint(pos):
+                    return ("menu", index)
+        return None
 
-font = pygame.font.SysFont(None, 24)
-clock_font = pygame.font.SysFont(None, 24)
-
-menu_visible = False
-menu_items = list(programs.keys())
-menu_items.sort()
-menu_item_height = 28
-menu_width = 200
-max_visible_items = 10
-scroll_offset = 0
-
-special_menu_open = False
-special_menu_items = ["Shutdown", "About ShellOS", "Settings Panel"]
-special_menu_rects = []
-
-def toggle_menu():
-    global menu_visible, scroll_offset
-    menu_visible = not menu_visible
-    if menu_visible:
-        scroll_offset = 0
-
-def launch_program(path):
-    full_path = os.path.join(SHELLOS_DIR, path)
-    if os.path.exists(full_path):
-        try:
-            subprocess.Popen([sys.executable, full_path])
-        except OSError as e:
-            print(f"Error launching program {full_path}: {e}")
-    else:
-        print(f"Error: Program not found: {full_path}")
-
-def resize_window(new_width, new_height):
-    global current_width, current_height, bg_image_scaled, WIDTH, HEIGHT
-    current_width, current_height = new_width, new_height
-    WIDTH, HEIGHT = new_width, new_height
-    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-    bg_image_scaled = pygame.transform.scale(bg_image, (new_width, new_height))
-
-def draw_transparent_taskbar(surface, rect, color, alpha):
-    taskbar_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    taskbar_surface.fill((*color, alpha))
-    surface.blit(taskbar_surface, rect.topleft)
-
-def draw_rounded_transparent_rect(surface, rect, color_rgb, alpha, radius):
-    s = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    s.fill((0, 0, 0, 0))
-    pygame.draw.rect(s, (*color_rgb, alpha), (0, 0, rect.width, rect.height), border_radius=radius)
-    surface.blit(s, rect.topleft)
-
-def get_current_time():
-    now = datetime.now()
-    return now.strftime("%H:%M %b %d, %Y")
-
-running = True
-clock = pygame.time.Clock()
-current_width, current_height = WIDTH, HEIGHT
-bg_image_scaled = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
-
-while running:
-    screen.blit(bg_image_scaled, (0, 0))
-
-    taskbar_rect = pygame.Rect(0, 0, current_width, TASKBAR_HEIGHT)
-    draw_transparent_taskbar(screen, taskbar_rect, TASKBAR_COLOR_RGB, TASKBAR_ALPHA)
-    
-    pygame.draw.rect(screen, (0, 0, 0), launcher_button_rect, border_radius=6)
-    screen.blit(launcher_icon_scaled, launcher_button_rect.topleft)
-
-    mouse_x, mouse_y = pygame.mouse.get_pos()
-
-    hovering_filemgr = filemgr_button_rect.collidepoint((mouse_x, mouse_y))
-    filemgr_bg_color = (40, 40, 40) if hovering_filemgr else (0, 0, 0)
-    pygame.draw.rect(screen, filemgr_bg_color, filemgr_button_rect, border_radius=6)
-    if filemgr_icon_available:
-        screen.blit(filemgr_icon_scaled, filemgr_button_rect.topleft)
-    else:
-        pygame.draw.rect(screen, (100, 100, 100), 
-                         (filemgr_button_rect.x + 4, filemgr_button_rect.y + 6, 18, 14), 
-                         border_radius=2)
-        pygame.draw.rect(screen, (80, 80, 80), 
-                         (filemgr_button_rect.x + 6, filemgr_button_rect.y + 4, 6, 4), 
-                         border_radius=1)
-
-    hovering_browser = browser_button_rect.collidepoint((mouse_x, mouse_y))
-    browser_bg_color = (40, 40, 40) if hovering_browser else (0, 0, 0)
-    pygame.draw.rect(screen, browser_bg_color, browser_button_rect, border_radius=6)
-    if browser_icon_available:
-        screen.blit(browser_icon_scaled, browser_button_rect.topleft)
-    else:
-        pygame.draw.circle(screen, (0, 150, 255), browser_button_rect.center, 10, 2)
-        pygame.draw.circle(screen, (255, 165, 0), browser_button_rect.center, 4)
-
-    hovering_terminal = terminal_button_rect.collidepoint((mouse_x, mouse_y))
-    terminal_bg_color = (40, 40, 40) if hovering_terminal else (0, 0, 0)
-    pygame.draw.rect(screen, terminal_bg_color, terminal_button_rect, border_radius=6)
-    if terminal_icon_available:
-        screen.blit(terminal_icon_scaled, terminal_button_rect.topleft)
-    else:
-        pygame.draw.rect(screen, (30, 30, 30), 
-                         (terminal_button_rect.x + 2, terminal_button_rect.y + 2, 22, 22), 
-                         border_radius=2)
-        pygame.draw.rect(screen, (0, 200, 0), 
-                         (terminal_button_rect.x + 4, terminal_button_rect.y + 4, 18, 2))
-        pygame.draw.rect(screen, (0, 200, 0), 
-                         (terminal_button_rect.x + 4, terminal_button_rect.y + 8, 10, 2))
-        pygame.draw.rect(screen, (0, 200, 0), 
-                         (terminal_button_rect.x + 4, terminal_button_rect.y + 12, 14, 2))
-
-    time_str = get_current_time()
-    clock_text = clock_font.render(time_str, True, WHITE)
-    clock_label_x = current_width - clock_text.get_width() - 10
-    screen.blit(clock_text, (clock_label_x, (TASKBAR_HEIGHT - clock_text.get_height()) // 2))
-
-    dots_menu_width = 20
-    dots_menu_height = 20
-    dots_menu_margin_right = 10
-    dots_menu_rect = pygame.Rect(clock_label_x - dots_menu_width - dots_menu_margin_right, 5, dots_menu_width, dots_menu_height)
-
-    hovering_dots = dots_menu_rect.collidepoint((mouse_x, mouse_y))
-    dots_menu_color = (55, 55, 55) if hovering_dots else (45, 45, 45)
-    pygame.draw.rect(screen, dots_menu_color, dots_menu_rect, border_radius=5)
-
-    pygame.draw.circle(screen, WHITE, (dots_menu_rect.centerx, dots_menu_rect.centery - 4), 2)
-    pygame.draw.circle(screen, WHITE, (dots_menu_rect.centerx, dots_menu_rect.centery), 2)
-    pygame.draw.circle(screen, WHITE, (dots_menu_rect.centerx, dots_menu_rect.centery + 4), 2)
-
-    if special_menu_open:
-        special_menu_rects = []
-        for i, label in enumerate(special_menu_items):
-            rect = pygame.Rect(dots_menu_rect.x, dots_menu_rect.bottom + i * 25, 160, 25)
-            special_menu_rects.append((rect, label))
-            draw_rounded_transparent_rect(screen, rect, START_MENU_COLOR_RGB, START_MENU_ALPHA, 6)
-            text = font.render(label, True, WHITE)
+    # --- state changes, each one marks what it touched as dirty ---
+
+    def invalidate(self, rect=None):
+        self.compositor.invalidate(rect)
+
+    def set_hover(self, hover):
+        if hover == self.hover:
+            return
+        for old_or_new in (self.hover, hover):
+            rect = self.hover_rect(old_or_new)
+            if rect is not None:
+                self.invalidate(rect)
+        self.hover = hover
+
+    def set_menu_visible(self, visible):
+        if visible != self.menu_visible:
+            self.invalidate(self.menu_rect())
+            self.menu_visible = visible
+            if not visible and self.search_query:
+                self.search_query = ""
+                self.menu_items = self.program_index.search("")
+            self.set_hover(self.hit_test(self.mouse_pos))
+
+    def set_special_menu_open(self, is_open):
+        if is_open != self.special_menu_open:
+            self.invalidate(self.special_menu_rect())
+            self.special_menu_open = is_open
+
+    def set_scroll_offset(self, offset):
+        offset = max(0, offset)
+        if offset != self.scroll_offset:
+            self.scroll_offset = offset
+            self.invalidate(self.menu_rect())
+            self.hover = self.hit_test(self.mouse_pos)
+
+    def set_search_query(self, query):
+        """Filters the start menu. Only the menu's own area is redrawn, it can shrink or grow."""
+        if query == self.search_query:
+            return
+        self.invalidate(self.menu_rect())
+        self.search_query = query
+        self.menu_items = self.program_index.search(query)
+        self.scroll_offset = 0
+        self.invalidate(self.menu_rect())
+        self.hover = self.hit_test(self.mouse_pos)
+
+    def update_clock(self):
+        if not self.clock_widget.update():
+            return
+        old_special_menu_rect = self.special_menu_rect()
+        self.layout_taskbar()
+        self.invalidate(self.taskbar_rect())
+        if self.special_menu_open:
+            self.invalidate(old_special_menu_rect)
+            self.invalidate(self.special_menu_rect())
+
+    def set_task_manager_visible(self, visible):
+        if visible != self.task_manager.visible:
+            self.invalidate(self.task_manager.rect())
+            self.task_manager.visible = visible
+            if visible:
+                self.processes.sample(force=True)
+
+    def update_processes(self):
+        """Reaps exited programs and, while the task manager is open, samples CPU and memory."""
+        old_rect = self.task_manager.rect()
+        exited = self.processes.reap()
+        sampled = self.task_manager.visible and self.processes.sample()
+        if self.task_manager.visible and (exited or sampled):
+            self.invalidate(old_rect)
+            self.invalidate(self.task_manager.rect())
+        if not self.processes and self.polling_processes:
+            pygame.time.set_timer(PROCESS_POLL_EVENT, 0)
+            self.polling_processes = False
+
+    def toggle_menu(self):
+        if not self.menu_visible and self.programs.refresh():
+            # something was installed or removed since the menu was last opened
+            self.set_menu_items(self.programs.names())
+        self.set_menu_visible(not self.menu_visible)
+        if self.menu_visible:
+            self.set_scroll_offset(0)
+
+    def resize_window(self, new_width, new_height):
+        self.current_width, self.current_height = new_width, new_height
+        self.screen = pygame.display.set_mode((new_width, new_height), pygame.RESIZABLE)
+        # a quick rough scale while the user is still dragging, the smooth one once they stop
+        self.bg_image_scaled = self.wallpaper.preview((new_width, new_height))
+        pygame.time.set_timer(WALLPAPER_SETTLE_EVENT, WALLPAPER_SETTLE_MS, 1)
+        # the taskbar panel is as wide as the window, old widths will never be drawn again
+        self.surfaces.clear("panel")
+        self.layout_taskbar()
+        self.compositor.set_screen(self.screen)
+
+    # --- painting ---
+
+    def paint(self, screen, area):
+        """Repaints everything that overlaps area. Drawing is already clipped to it."""
+        profiler = self.profiler
+        with profiler.section("background"):
+            screen.blit(self.bg_image_scaled, area, area)
+
+        if area.colliderect(self.taskbar_rect()):
+            with profiler.section("taskbar"):
+                self.paint_taskbar(screen)
+        with profiler.section("menus"):
+            if self.task_manager.visible and area.colliderect(self.task_manager.rect()):
+                self.task_manager.paint(screen)
+            if self.special_menu_open and area.colliderect(self.special_menu_rect()):
+                self.paint_special_menu(screen)
+            if self.menu_visible and area.colliderect(self.menu_rect()):
+                self.paint_menu(screen)
+        if self.lock_screen.locked:
+            self.lock_screen.screen_size = (self.current_width, self.current_height)
+            self.lock_screen.paint(screen)
+        if profiler.enabled:
+            overlay_rect = self.profiler_rect()
+            if area.colliderect(overlay_rect):
+                with profiler.section("overlay"):
+                    profiler.paint_overlay(screen, overlay_rect, self.font, self.surfaces)
+
+    def paint_taskbar(self, screen):
+        draw_panel(screen, self.surfaces, self.taskbar_rect(), TASKBAR_COLOR_RGB, TASKBAR_ALPHA)
+
+        pygame.draw.rect(screen, (0, 0, 0), self.launcher_button_rect, border_radius=6)
+        launcher_icon = self.icons.get(TASKBAR_ICON_SIZE, "launcher")
+        if launcher_icon is not None:
+            screen.blit(launcher_icon, self.launcher_button_rect.topleft)
+
+        filemgr_button_rect = self.filemgr_button_rect
+        filemgr_bg_color = (40, 40, 40) if self.hover == "filemgr" else (0, 0, 0)
+        pygame.draw.rect(screen, filemgr_bg_color, filemgr_button_rect, border_radius=6)
+        filemgr_icon = self.icons.get(TASKBAR_ICON_SIZE, "filemgr")
+        if filemgr_icon is not None:
+            screen.blit(filemgr_icon, filemgr_button_rect.topleft)
+        else:
+            pygame.draw.rect(screen, (100, 100, 100),
+                             (filemgr_button_rect.x + 4, filemgr_button_rect.y + 6, 18, 14),
+                             border_radius=2)
+            pygame.draw.rect(screen, (80, 80, 80),
+                             (filemgr_button_rect.x + 6, filemgr_button_rect.y + 4, 6, 4),
+                             border_radius=1)
+
+        browser_button_rect = self.browser_button_rect
+        browser_bg_color = (40, 40, 40) if self.hover == "browser" else (0, 0, 0)
+        pygame.draw.rect(screen, browser_bg_color, browser_button_rect, border_radius=6)
+        browser_icon = self.icons.get(TASKBAR_ICON_SIZE, "browser")
+        if browser_icon is not None:
+            screen.blit(browser_icon, browser_button_rect.topleft)
+        else:
+            pygame.draw.circle(screen, (0, 150, 255), browser_button_rect.center, 10, 2)
+            pygame.draw.circle(screen, (255, 165, 0), browser_button_rect.center, 4)
+
+        terminal_button_rect = self.terminal_button_rect
+        terminal_bg_color = (40, 40, 40) if self.hover == "terminal" else (0, 0, 0)
+        pygame.draw.rect(screen, terminal_bg_color, terminal_button_rect, border_radius=6)
+        terminal_icon = self.icons.get(TASKBAR_ICON_SIZE, "terminal")
+        if terminal_icon is not None:
+            screen.blit(terminal_icon, terminal_button_rect.topleft)
+        else:
+            pygame.draw.rect(screen, (30, 30, 30),
+                             (terminal_button_rect.x + 2, terminal_button_rect.y + 2, 22, 22),
+                             border_radius=2)
+            pygame.draw.rect(screen, (0, 200, 0),
+                             (terminal_button_rect.x + 4, terminal_button_rect.y + 4, 18, 2))
+            pygame.draw.rect(screen, (0, 200, 0),
+                             (terminal_button_rect.x + 4, terminal_button_rect.y + 8, 10, 2))
+            pygame.draw.rect(screen, (0, 200, 0),
+                             (terminal_button_rect.x + 4, terminal_button_rect.y + 12, 14, 2))
+
+        clock_widget = self.clock_widget
+        screen.blit(clock_widget.surface, (self.clock_label_x, (TASKBAR_HEIGHT - clock_widget.get_height()) // 2))
+
+        dots_menu_rect = self.dots_menu_rect
+        dots_menu_color = (55, 55, 55) if self.hover == "dots" else (45, 45, 45)
+        pygame.draw.rect(screen, dots_menu_color, dots_menu_rect, border_radius=5)
+
+        pygame.draw.circle(screen, WHITE, (dots_menu_rect.centerx, dots_menu_rect.centery - 4), 2)
+        pygame.draw.circle(screen, WHITE, (dots_menu_rect.centerx, dots_menu_rect.centery), 2)
+        pygame.draw.circle(screen, WHITE, (dots_menu_rect.centerx, dots_menu_rect.centery + 4), 2)
+
+    def paint_special_menu(self, screen):
+        for rect, label in self.special_menu_rows():
+            draw_panel(screen, self.surfaces, rect, START_MENU_COLOR_RGB, START_MENU_ALPHA, 6)
+            text = self.surfaces.text(self.font, label, WHITE)
             screen.blit(text, (rect.x + 5, rect.y + 4))
 
-    menu_rects = []
-    hovered_index = None
-    if menu_visible:
-        visible_items = menu_items[scroll_offset:scroll_offset + max_visible_items]
-        for i, item in enumerate(visible_items):
-            item_rect = pygame.Rect(5, TASKBAR_HEIGHT + i * menu_item_height, menu_width, menu_item_height)
-            menu_rects.append((item_rect, scroll_offset + i))
-            draw_rounded_transparent_rect(screen, item_rect, START_MENU_COLOR_RGB, START_MENU_ALPHA, 0)
-            item_text = font.render(item, True, WHITE)
-            screen.blit(item_text, (item_rect.x + 5, item_rect.y + 5))
-
-        for rect, index in menu_rects:
-            if rect.collidepoint((mouse_x, mouse_y)):
-                hovered_index = index
+    def paint_menu(self, screen):
+        if self.search_query:
+            search_rect = self.search_rect()
+            draw_panel(screen, self.surfaces, search_rect, START_MENU_COLOR_RGB, START_MENU_ALPHA)
+            # changes on every keystroke, not worth caching
+            label = self.search_query if self.menu_items else f"{self.search_query} - no programs found"
+            screen.blit(self.font.render(label, True, WHITE), (search_rect.x + 5, search_rect.y + 5))
+            pygame.draw.line(screen, (100, 40, 140), (search_rect.x, search_rect.bottom - 1), (search_rect.right - 1, search_rect.bottom - 1))
+
+        for item_rect, index in self.menu_rows():
+            draw_panel(screen, self.surfaces, item_rect, START_MENU_COLOR_RGB, START_MENU_ALPHA)
+            item_text = self.surfaces.text(self.font, self.menu_items[index], WHITE)
+            icon = self.icons.get(MENU_ICON_SIZE, self.menu_items[index])
+            if icon is not None:
+                screen.blit(icon, (item_rect.x + 5, item_rect.y + (self.menu_item_height - MENU_ICON_SIZE[1]) // 2))
+                screen.blit(item_text, (item_rect.x + MENU_ICON_SIZE[0] + 10, item_rect.y + 5))
+            else:
+                screen.blit(item_text, (item_rect.x + 5, item_rect.y + 5))
+
+            if self.hover == ("menu", index):
                 hover_color_rgb = (100, 40, 140)
                 hover_alpha = 100
-                draw_rounded_transparent_rect(screen, rect, hover_color_rgb, hover_alpha, 0)
-                pygame.draw.rect(screen, hover_color_rgb, rect, 2)
-
-    for event in pygame.event.get():
+                draw_panel(screen, self.surfaces, item_rect, hover_color_rgb, hover_alpha)
+                pygame.draw.rect(screen, hover_color_rgb, item_rect, 2)
+
+    # --- input ---
+
+    def launch_program(self, path, name=None, toolkit=None):
+        full_path = os.path.join(SHELLOS_DIR, path)
+        if os.path.exists(full_path):
+            try:
+                process = self.launcher.launch(full_path, family=toolkit)
+            except OSError as e:
+                print(f"Error launching program {full_path}: {e}")
+                return
+            old_rect = self.task_manager.rect()
+            self.processes.add(name or os.path.splitext(os.path.basename(full_path))[0], full_path, process)
+            if self.task_manager.visible:
+                self.invalidate(old_rect)
+                self.invalidate(self.task_manager.rect())
+            if not self.polling_processes:
+                pygame.time.set_timer(PROCESS_POLL_EVENT, PROCESS_POLL_MS)
+                self.polling_processes = True
+        else:
+            print(f"Error: Program not found: {full_path}")
+
+    def launch_menu_item(self, index):
+        program = self.programs.find(self.menu_items[index])
+        if program is not None:
+            self.launch_counts.record(program.name)
+            self.launch_program(program.path, program.name, program.toolkit)
+        self.set_menu_visible(False)
+
+    def close_menus(self):
+        self.set_menu_visible(False)
+        self.set_special_menu_open(False)
+
+    def handle_event(self, event):
+        if event.type in INPUT_EVENTS:
+            self.had_input = True
         if event.type == pygame.QUIT:
-            running = False
+            self.running = False
         elif event.type == pygame.VIDEORESIZE:
-            resize_window(event.w, event.h)
+            self.resize_window(event.w, event.h)
+        elif event.type == pygame.WINDOWEXPOSED:
+            self.invalidate()
+        elif event.type == PROCESS_POLL_EVENT:
+            self.update_processes()
+        elif event.type == ICONS_READY_EVENT:
+            if event.size == TASKBAR_ICON_SIZE:
+                self.invalidate(self.taskbar_rect())
+            elif self.menu_visible:
+                self.invalidate(self.menu_rect())
+        elif event.type == LAUNCHER_REAP_EVENT:
+            self.launcher.reap_idle()
+        elif event.type == WALLPAPER_SETTLE_EVENT:
+            # the smooth scale happens off the main thread, the rough one stays up until WALLPAPER_READY_EVENT
+            surface = self.wallpaper.request((self.current_width, self.current_height))
+            if surface is not None:
+                self.bg_image_scaled = surface
+                self.invalidate()
+        elif event.type == WALLPAPER_READY_EVENT:
+            if event.size != self.screen.get_size():
+                # a size the window went through during a resize, converting it would only
+                # push the one that's showing out of the cache
+                self.wallpaper.discard(event.size)
+            else:
+                self.bg_image_scaled = self.wallpaper.get(event.size)
+                self.invalidate()
+        elif event.type == CLOCK_TICK_EVENT:
+            self.update_clock()
+            self.clock_widget.schedule()
+            # checked before touch(), input just now doesn't make up for the idle time before it
+            lapsed = None if self.lock_screen.locked else ShlOSSession.check()
+            if lapsed is not None:
+                self.close_menus()
+                self.lock_screen.lock(*lapsed)
+                self.invalidate()
+            elif self.had_input:
+                ShlOSSession.touch()
+            self.had_input = False
+        elif self.lock_screen.locked:
+            # nothing on the desktop can be used until the password is typed
+            if event.type == pygame.KEYDOWN:
+                if self.lock_screen.key(event):
+                    self.invalidate()
+            elif event.type == pygame.TEXTINPUT:
+                self.lock_screen.text_input(event.text)
+                self.invalidate(self.lock_screen.field_rect())
+        elif event.type == pygame.MOUSEMOTION:
+            self.mouse_pos = event.pos
+            self.set_hover(self.hit_test(event.pos))
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
-                if launcher_button_rect.collidepoint(event.pos):
-                    toggle_menu()
-                    special_menu_open = False
-                elif filemgr_button_rect.collidepoint(event.pos):
-                    launch_program("System64/Programs/filemgr.py")
-                    menu_visible = False
-                    special_menu_open = False
-                elif browser_button_rect.collidepoint(event.pos):
-                    launch_program("System64/Programs/ShellOS-Browser/browser.py")
-                    menu_visible = False
-                    special_menu_open = False
-                elif terminal_button_rect.collidepoint(event.pos):
-                    launch_program("System64/Programs/terminal.py")
-                    menu_visible = False
-                    special_menu_open = False
-                elif dots_menu_rect.collidepoint(event.pos):
-                    special_menu_open = not special_menu_open
-                    menu_visible = False
-                elif special_menu_open:
-                    for rect, label in special_menu_rects:
+                if self.launcher_button_rect.collidepoint(event.pos):
+                    self.toggle_menu()
+                    self.set_special_menu_open(False)
+                elif self.filemgr_button_rect.collidepoint(event.pos):
+                    self.launch_program(FILEMGR_PROGRAM)
+                    self.close_menus()
+                elif self.browser_button_rect.collidepoint(event.pos):
+                    self.launch_program(BROWSER_PROGRAM)
+                    self.close_menus()
+                elif self.terminal_button_rect.collidepoint(event.pos):
+                    self.launch_program(TERMINAL_PROGRAM)
+                    self.close_menus()
+                elif self.dots_menu_rect.collidepoint(event.pos):
+                    self.set_special_menu_open(not self.special_menu_open)
+                    self.set_menu_visible(False)
+                elif (self.task_manager.visible and self.task_manager.rect().collidepoint(event.pos)
+                        and not (self.special_menu_open and self.special_menu_rect().collidepoint(event.pos))):
+                    old_rect = self.task_manager.rect()
+                    if self.task_manager.click(event.pos):
+                        self.invalidate(old_rect)
+                        self.invalidate(self.task_manager.rect())
+                elif self.special_menu_open:
+                    for rect, label in self.special_menu_rows():
                         if rect.collidepoint(event.pos):
                             if label == "Shutdown":
-                                running = False
+                                self.running = False
                             elif label == "About ShellOS":
-                                launch_program("System64/Programs/about.py")
+                                self.launch_program(ABOUT_PROGRAM)
                             elif label == "Settings Panel":
-                                launch_program("System64/Programs/settings.py")
-                            special_menu_open = False
+                                self.launch_program(SETTINGS_PROGRAM)
+                            elif label == "Task Manager":
+                                self.set_task_manager_visible(not self.task_manager.visible)
+                            self.set_special_menu_open(False)
                             break
-                elif menu_visible:
-                    for rect, index in menu_rects:
+                elif self.menu_visible:
+                    for rect, index in self.menu_rows():
                         if rect.collidepoint(event.pos):
-                            launch_program(programs[menu_items[index]])
-                            menu_visible = False
+                            self.launch_menu_item(index)
                             break
                 else:
-                    menu_visible = False
-                    special_menu_open = False
+                    self.close_menus()
         elif event.type == pygame.MOUSEWHEEL:
-            if menu_visible:
-                scroll_offset = max(0, min(scroll_offset - event.y, len(menu_items) - max_visible_items))
+            if self.menu_visible:
+                self.set_scroll_offset(min(self.scroll_offset - event.y, len(self.menu_items) - self.max_visible_items))
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            if event.mod & pygame.KMOD_SHIFT:
+                self.profiler.export(os.path.join(self.cache_dir, "traces", time.strftime("shell-%Y%m%d-%H%M%S.json")))
+            else:
+                self.invalidate(self.profiler_rect())
+                self.profiler.toggle()
         elif event.type == pygame.KEYDOWN:
-            if menu_visible:
+            if self.menu_visible:
                 if event.key == pygame.K_DOWN:
-                    scroll_offset = min(scroll_offset + 1, len(menu_items) - max_visible_items)
+                    self.set_scroll_offset(min(self.scroll_offset + 1, len(self.menu_items) - self.max_visible_items))
                 elif event.key == pygame.K_UP:
-                    scroll_offset = max(scroll_offset - 1, 0)
+                    self.set_scroll_offset(self.scroll_offset - 1)
+                elif event.key == pygame.K_BACKSPACE:
+                    self.set_search_query(self.search_query[:-1])
+                elif event.key == pygame.K_RETURN:
+                    if isinstance(self.hover, tuple):
+                        self.launch_menu_item(self.hover[1])
+                    elif self.search_query and self.menu_items:
+                        self.launch_menu_item(0)
                 elif event.key == pygame.K_ESCAPE:
-                    menu_visible = False
+                    # first Escape clears the search, the next one closes the menu
+                    if self.search_query:
+                        self.set_search_query("")
+                    else:
+                        self.set_menu_visible(False)
+        elif event.type == pygame.TEXTINPUT:
+            if self.menu_visible and event.text.isprintable():
+                self.set_search_query(self.search_query + event.text)
+
+    def frame(self, events):
+        """Handles a batch of events and repaints whatever they changed. Returns the rects that were updated."""
+        self.profiler.begin_frame()
+        with self.profiler.section("events"):
+            for event in events:
+                self.handle_event(event)
+        rects = self.compositor.flush(self.paint)
+        self.profiler.end_frame()
+        if self.profiler.enabled:
+            # the graph picks up this frame when the next one is drawn
+            self.invalidate(self.profiler_rect())
+        return rects
+
+    def run(self, on_ready=None):
+        """
+        Runs the desktop until Shutdown. Only the regions that changed get repainted,
+        and when nothing is happening the loop sleeps until the next event or the clock's next minute.
+        on_ready is called once the first frame is on screen.
+        """
+        self.layout_taskbar()
+        self.invalidate()
+        self.update_clock()
+        self.clock_widget.schedule()
+
+        self.compositor.flush(self.paint)
+        if on_ready is not None:
+            on_ready()
+        # warm up the launcher only once the desktop is showing so it doesn't slow the boot
+        self.launcher.start()
+        pygame.time.set_timer(LAUNCHER_REAP_EVENT, LAUNCHER_REAP_MS)
+
+        while self.running:
+            self.frame([pygame.event.wait()] + pygame.event.get())
+
+        self.clock_widget.stop()
+        pygame.time.set_timer(LAUNCHER_REAP_EVENT, 0)
+        pygame.time.set_timer(PROCESS_POLL_EVENT, 0)
+        self.launcher.shutdown()
+
+def main(on_ready=None):
+    pygame.init()
+    mixer.init()
 
-    pygame.display.update()
-    clock.tick(30)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("ShellOS")
+    set_window_icon()
+
+    desktop = Desktop(screen, WIDTH, HEIGHT)
+    size = run_splash(screen, WIDTH, HEIGHT, desktop.startup_tasks())
+    if size is not None:
+        if size != (desktop.current_width, desktop.current_height):
+            desktop.resize_window(*size)
+        play_startup_sound()
+        desktop.run(on_ready)
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
+    sys.exit()
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# runs on a box with no screen or sound card, this has to be set before pygame starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from GraphicalShell import Desktop, TASKBAR_HEIGHT, WALLPAPER_SETTLE_EVENT
+
+# Drives the desktop's frame logic with scripted input and reports how long frames take.
+#   python benchmark.py                       all scenarios, 300 frames each
+#   python benchmark.py --json results.json   also save the numbers
+#   python benchmark.py --compare results.json --tolerance 0.25
+#                                             exit 1 if p99 got more than 25% worse than a saved run
+
+WARMUP_FRAMES = 10
+
+def motion(pos):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+def click(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+def key(k):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, mod=0, unicode="")
+
+# --- scenarios, each yields the events for one frame at a time ---
+
+def scenario_hover(desktop, frames):
+    """The mouse sweeping back and forth over the taskbar buttons."""
+    for i in range(frames):
+        x = i % 140 if (i // 140) % 2 == 0 else 139 - i % 140
+        yield [motion((x, TASKBAR_HEIGHT // 2))]
+
+def scenario_menu(desktop, frames):
+    """The start menu opening and closing."""
+    for i in range(frames):
+        yield [click(desktop.launcher_button_rect.center)]
+
+def scenario_scroll(desktop, frames):
+    """Scrolling through an open start menu, with the mouse over it."""
+    desktop.toggle_menu()
+    pos = (40, TASKBAR_HEIGHT + desktop.menu_item_height * 3)
+    yield [motion(pos)]
+    for i in range(frames - 1):
+        direction = -1 if (i // 20) % 2 == 0 else 1
+        yield [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=direction, flipped=False), motion(pos)]
+
+def scenario_search(desktop, frames):
+    """Typing a search into the start menu and deleting it again."""
+    desktop.toggle_menu()
+    query = "program 1"
+    for i in range(frames):
+        step = i % (len(query) * 2)
+        if step < len(query):
+            yield [pygame.event.Event(pygame.TEXTINPUT, text=query[step])]
+        else:
+            yield [key(pygame.K_BACKSPACE)]
+
+def scenario_resize(desktop, frames):
+    """Dragging the window edge, with the smooth wallpaper pass whenever the drag pauses."""
+    base_width, base_height = desktop.current_width, desktop.current_height
+    for i in range(frames):
+        if i % 10 == 9:
+            yield [pygame.event.Event(WALLPAPER_SETTLE_EVENT)]
+            continue
+        width = base_width - (i % 40) * 8
+        height = base_height - (i % 40) * 4
+        yield [pygame.event.Event(pygame.VIDEORESIZE, w=width, h=height, size=(width, height))]
+
+SCENARIOS = {
+    "hover": scenario_hover,
+    "menu": scenario_menu,
+    "scroll": scenario_scroll,
+    "search": scenario_search,
+    "resize": scenario_resize,
+}
+
+# --- running ---
+
+def make_desktop(width, height, extra_programs, cache_dir):
+    pygame.init()
+    screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+    desktop = Desktop(screen, width, height, cache_dir=cache_dir)
+    desktop.prepare()
+    if extra_programs:
+        # stand-ins for a machine with a lot of SPM packages installed
+        names = desktop.programs.names() + [f"Program {i:04d}" for i in range(extra_programs)]
+        desktop.set_menu_items(names)
+    desktop.layout_taskbar()
+    desktop.invalidate()
+    desktop.update_clock()
+    desktop.compositor.flush(desktop.paint)
+    return desktop
+
+def reset(desktop, width, height):
+    desktop.close_menus()
+    if (desktop.current_width, desktop.current_height) != (width, height):
+        desktop.resize_window(width, height)
+        desktop.bg_image_scaled = desktop.wallpaper.get((width, height))
+    desktop.compositor.flush(desktop.paint)
+    # timers the desktop set for itself, the scripts post what they need
+    pygame.event.clear()
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def time_scenario(desktop, scenario, frames):
+    times = []
+    for i, events in enumerate(scenario(desktop, frames + WARMUP_FRAMES)):
+        start = time.perf_counter()
+        desktop.frame(events)
+        if i >= WARMUP_FRAMES:
+            times.append(time.perf_counter() - start)
+    return times
+
+def measure_allocations(desktop, scenario, frames):
+    """Python-side allocations per frame: bytes allocated at the frame's peak, and blocks still alive after it."""
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    try:
+        for i, events in enumerate(scenario(desktop, frames + WARMUP_FRAMES)):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            blocks_before = sys.getallocatedblocks()
+            desktop.frame(events)
+            _, peak = tracemalloc.get_traced_memory()
+            if i >= WARMUP_FRAMES:
+                peaks.append(peak - before)
+                blocks.append(sys.getallocatedblocks() - blocks_before)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks), sum(blocks) / len(blocks)
+
+def run_benchmark(names, frames, width, height, extra_programs, cache_dir, allocations=True):
+    desktop = make_desktop(width, height, extra_programs, cache_dir)
+    results = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        reset(desktop, width, height)
+        times = time_scenario(desktop, scenario, frames)
+        total = sum(times)
+        result = {
+            "frames": len(times),
+            "fps": len(times) / total if total else 0.0,
+            "p50_ms": percentile(times, 0.50) * 1000,
+            "p99_ms": percentile(times, 0.99) * 1000,
+            "max_ms": max(times) * 1000,
+        }
+        if allocations:
+            reset(desktop, width, height)
+            alloc_bytes, alloc_blocks = measure_allocations(desktop, scenario, frames)
+            result["alloc_kb_per_frame"] = alloc_bytes / 1024
+            result["live_blocks_per_frame"] = alloc_blocks
+        results[name] = result
+    pygame.quit()
+    return results
+
+def print_results(results):
+    print(f"{'scenario':<10}{'fps':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'alloc KB':>10}{'blocks':>10}")
+    for name, result in results.items():
+        alloc = f"{result['alloc_kb_per_frame']:.1f}" if "alloc_kb_per_frame" in result else "-"
+        blocks = f"{result['live_blocks_per_frame']:.1f}" if "live_blocks_per_frame" in result else "-"
+        print(f"{name:<10}{result['fps']:>10.0f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{result['max_ms']:>10.3f}{alloc:>10}{blocks:>10}")
+
+def compare(results, baseline_path, tolerance):
+    """Returns the scenarios whose p99 frame time got worse than the baseline by more than tolerance."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if result["p99_ms"] > old["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {old['p99_ms']:.3f} ms -> {result['p99_ms']:.3f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark for the ShellOS desktop.")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run, all of them by default ({', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per scenario")
+    parser.add_argument("--size", default="1509x890", help="window size, WIDTHxHEIGHT")
+    parser.add_argument("--programs", type=int, default=200, help="extra made-up programs in the start menu")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the (slower) allocation pass")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p99 slowdown against --compare, 0.25 = 25%%")
+    parser.add_argument("--cache-dir", help="cache folder for the desktop, a throwaway one by default so SYSTEM/cache is left alone")
+    args = parser.parse_args()
+
+    width, height = (int(n) for n in args.size.lower().split("x"))
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name}, pick from {', '.join(SCENARIOS)}")
+    with tempfile.TemporaryDirectory(prefix="shellos-bench-") as temp_dir:
+        cache_dir = args.cache_dir or temp_dir
+        results = run_benchmark(names, args.frames, width, height, args.programs, cache_dir, allocations=not args.no_alloc)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "size": [width, height],
+                "frames": args.frames,
+                "programs": args.programs,
+                "python": sys.version.split()[0],
+                "pygame": pygame.version.ver,
+                "results": results,
+            }, f, indent=4)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print("Frame time regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
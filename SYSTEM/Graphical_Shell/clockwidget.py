@@ -0,0 +1,85 @@
+import pygame
+from datetime import datetime
+
+# everything except the month name comes out of these characters
+ATLAS_CHARS = "0123456789:, "
+
+class ClockWidget:
+    """
+    The taskbar clock. It only changes once a minute, so instead of rendering text
+    every frame it asks for a timer event on the next minute boundary and builds the
+    label from glyphs that were rendered once into a small atlas.
+    """
+    time_format = "%H:%M %b %d, %Y"
+
+    def __init__(self, font, color, tick_event):
+        self.font = font
+        self.color = color
+        self.tick_event = tick_event
+        self.time_str = ""
+        self.surface = None
+
+        self.glyph_rects = {}
+        self.extra_glyphs = {}
+        self.atlas = self.build_atlas()
+
+    def build_atlas(self):
+        glyphs = [(ch, self.font.render(ch, True, self.color)) for ch in ATLAS_CHARS]
+        width = sum(glyph.get_width() for ch, glyph in glyphs)
+        height = max(glyph.get_height() for ch, glyph in glyphs)
+
+        atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+        x = 0
+        for ch, glyph in glyphs:
+            atlas.blit(glyph, (x, 0))
+            self.glyph_rects[ch] = pygame.Rect(x, 0, glyph.get_width(), glyph.get_height())
+            x += glyph.get_width()
+        return atlas
+
+    def glyph(self, ch):
+        """Returns (source surface, area) for one character."""
+        rect = self.glyph_rects.get(ch)
+        if rect is not None:
+            return self.atlas, rect
+        # month letters, rendered the first time they're needed
+        surface = self.extra_glyphs.get(ch)
+        if surface is None:
+            surface = self.font.render(ch, True, self.color)
+            self.extra_glyphs[ch] = surface
+        return surface, surface.get_rect()
+
+    def compose(self, text):
+        parts = [self.glyph(ch) for ch in text]
+        width = sum(area.width for source, area in parts)
+        height = max([area.height for source, area in parts] + [self.atlas.get_height()])
+
+        surface = pygame.Surface((max(1, width), height), pygame.SRCALPHA)
+        x = 0
+        for source, area in parts:
+            surface.blit(source, (x, 0), area)
+            x += area.width
+        return surface
+
+    def update(self, now=None):
+        """Rebuilds the label if the displayed time changed. Returns True if it did."""
+        time_str = (now or datetime.now()).strftime(self.time_format)
+        if time_str == self.time_str:
+            return False
+        self.time_str = time_str
+        self.surface = self.compose(time_str)
+        return True
+
+    def schedule(self, now=None):
+        """Asks for one tick_event just after the next minute starts."""
+        now = now or datetime.now()
+        seconds_left = 60 - now.second - now.microsecond / 1_000_000
+        pygame.time.set_timer(self.tick_event, int(seconds_left * 1000) + 50, 1)
+
+    def stop(self):
+        pygame.time.set_timer(self.tick_event, 0)
+
+    def get_width(self):
+        return self.surface.get_width() if self.surface else 0
+
+    def get_height(self):
+        return self.surface.get_height() if self.surface else 0
@@ -0,0 +1,63 @@
+import pygame
+
+class Compositor:
+    """
+    Keeps track of which parts of the screen are out of date ("dirty") and
+    repaints only those, then pushes just those rectangles to the display.
+    """
+
+    def __init__(self, screen, profiler=None):
+        self.screen = screen
+        self.dirty = []
+        self.profiler = profiler
+
+    def set_screen(self, screen):
+        """Switches to a new display surface (after a resize) and marks all of it dirty."""
+        self.screen = screen
+        self.dirty = []
+        self.invalidate()
+
+    def invalidate(self, rect=None):
+        """Marks rect as needing a repaint. No rect means the whole screen."""
+        screen_rect = self.screen.get_rect()
+        rect = screen_rect if rect is None else pygame.Rect(rect).clip(screen_rect)
+        if rect.width > 0 and rect.height > 0:
+            self.dirty.append(rect)
+
+    def has_damage(self):
+        return bool(self.dirty)
+
+    def merged_dirty_rects(self):
+        """Folds overlapping dirty rects together so nothing gets painted twice."""
+        merged = []
+        for rect in self.dirty:
+            rect = rect.copy()
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def flush(self, paint):
+        """
+        Calls paint(screen, rect) once per dirty region with drawing clipped to it,
+        then updates only those regions of the display. Returns the rects that were updated.
+        """
+        if not self.dirty:
+            return []
+
+        rects = self.merged_dirty_rects()
+        self.dirty = []
+
+        for rect in rects:
+            self.screen.set_clip(rect)
+            paint(self.screen, rect)
+        self.screen.set_clip(None)
+
+        if self.profiler is not None:
+            with self.profiler.section("display update"):
+                pygame.display.update(rects)
+        else:
+            pygame.display.update(rects)
+        return rects
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import pygame
+
+WHITE = (255, 255, 255)
+PANEL_COLOR_RGB = (10, 4, 18)
+PANEL_ALPHA = 220
+BUDGET_COLOR = (200, 60, 60)
+
+# stacked in this order in the graph
+SECTION_COLORS = {
+    "events": (90, 160, 255),
+    "background": (120, 120, 120),
+    "taskbar": (170, 90, 220),
+    "menus": (240, 170, 60),
+    "overlay": (80, 80, 80),
+    "display update": (80, 200, 120),
+}
+OTHER_COLOR = (200, 200, 200)
+
+_disabled = nullcontext()
+
+class Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter())
+        return False
+
+class FrameProfiler:
+    """
+    Times each frame of the desktop loop, split into named sections, and keeps the
+    last few hundred for the on-screen graph. Every section is also kept as a
+    Chrome trace event so a run can be opened in chrome://tracing or Perfetto.
+    While disabled, section() hands back a shared do-nothing context manager.
+    """
+
+    graph_width = 240
+    graph_height = 60
+    # the graph's top line, anything slower is clipped
+    graph_max_ms = 50.0
+    budget_ms = 1000 / 60
+
+    def __init__(self, history=240, max_trace_events=200000):
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self.trace = deque(maxlen=max_trace_events)
+        self.origin = time.perf_counter()
+        self.frame_start = None
+        self.sections = None
+        self.pid = os.getpid()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+        self.sections = None
+        return self.enabled
+
+    # --- recording ---
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = time.perf_counter()
+        self.sections = {}
+
+    def section(self, name):
+        if self.sections is None:
+            return _disabled
+        return Section(self, name)
+
+    def add(self, name, start, end):
+        if self.sections is None:
+            return
+        # sections run once per dirty region, so a frame can have several of the same name
+        self.sections[name] = self.sections.get(name, 0.0) + (end - start)
+        self.trace.append(self.trace_event(name, start, end - start, "section"))
+
+    def end_frame(self):
+        if self.sections is None:
+            return
+        end = time.perf_counter()
+        total = end - self.frame_start
+        self.frames.append((total, self.sections))
+        self.trace.append(self.trace_event("frame", self.frame_start, total, "frame"))
+        self.frame_start = None
+        self.sections = None
+
+    def trace_event(self, name, start, duration, category):
+        return {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": 1,
+        }
+
+    def stats(self):
+        """(last, average, worst) frame time in milliseconds over the kept history."""
+        if not self.frames:
+            return 0.0, 0.0, 0.0
+        times = [total * 1000 for total, sections in self.frames]
+        return times[-1], sum(times) / len(times), max(times)
+
+    def export(self, path):
+        """Writes everything recorded so far as a Chrome trace JSON file."""
+        trace = {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "ShellOS desktop"}},
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": 1, "args": {"name": "render loop"}},
+            ] + list(self.trace),
+            "displayTimeUnit": "ms",
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace, f)
+        except OSError as e:
+            print(f"Error: Could not write frame trace: {e}")
+            return False
+        print(f"Frame trace written to {path} ({len(self.trace)} events)")
+        return True
+
+    # --- overlay ---
+
+    def overlay_rect(self, screen_width, screen_height, font):
+        height = self.graph_height + font.get_linesize() + 12
+        return pygame.Rect(screen_width - self.graph_width - 18, screen_height - height - 10, self.graph_width + 8, height)
+
+    def paint_overlay(self, screen, rect, font, surfaces):
+        screen.blit(surfaces.panel(rect.size, PANEL_COLOR_RGB, PANEL_ALPHA, 6), rect.topleft)
+
+        last, average, worst = self.stats()
+        label = f"frame {last:.1f} ms  avg {average:.1f}  max {worst:.1f}"
+        screen.blit(font.render(label, True, WHITE), (rect.x + 4, rect.y + 4))
+
+        graph = pygame.Rect(rect.x + 4, rect.bottom - self.graph_height - 4, self.graph_width, self.graph_height)
+        scale = graph.height / self.graph_max_ms
+        budget_y = graph.bottom - int(self.budget_ms * scale)
+        pygame.draw.line(screen, BUDGET_COLOR, (graph.x, budget_y), (graph.right - 1, budget_y))
+
+        # one 2px column per frame, newest on the right, sections stacked bottom up
+        frames = list(self.frames)[-(graph.width // 2):]
+        x = graph.right - len(frames) * 2
+        for total, sections in frames:
+            y = graph.bottom
+            accounted = 0.0
+            for name, color in SECTION_COLORS.items():
+                duration = sections.get(name, 0.0)
+                if duration:
+                    accounted += duration
+                    y = self.draw_bar(screen, color, x, y, duration * 1000 * scale, graph.y)
+            self.draw_bar(screen, OTHER_COLOR, x, y, (total - accounted) * 1000 * scale, graph.y)
+            x += 2
+
+    def draw_bar(self, screen, color, x, bottom, height, top_limit):
+        height = int(round(height))
+        top = max(top_limit, bottom - height)
+        if bottom - top > 0:
+            pygame.draw.rect(screen, color, (x, top, 2, bottom - top))
+        return top
@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+import threading
+
+import pygame
+
+ATLAS_COLUMNS = 16
+
+class IconAtlas:
+    """Every icon of one size packed into a single surface. slots maps an icon's key to its rect in the sheet."""
+
+    def __init__(self, size, sheet, slots):
+        self.size = size
+        self.sheet = sheet
+        self.slots = slots
+        self.converted = False
+        self.icons = {}
+
+    def get(self, key):
+        rect = self.slots.get(key)
+        if rect is None:
+            return None
+        if not self.converted:
+            # the loader thread can't convert, there may be no display yet
+            self.sheet = self.sheet.convert_alpha()
+            self.converted = True
+        icon = self.icons.get(key)
+        if icon is None:
+            icon = self.sheet.subsurface(rect)
+            self.icons[key] = icon
+        return icon
+
+class IconService:
+    """
+    Loads icons on a background thread and packs each target size into one atlas.
+    The packed pixels are saved to the cache folder keyed by the source files' mtimes,
+    so a start-up where no icon changed reads one file instead of decoding every PNG/ICO.
+    When ready_event is given it's posted once an atlas becomes available.
+    """
+
+    def __init__(self, cache_dir, ready_event=None):
+        self.cache_dir = cache_dir
+        self.ready_event = ready_event
+        self.atlases = {}
+        self.loaders = {}
+        self.lock = threading.Lock()
+
+    def request(self, size, icons):
+        """Starts building the atlas for size from icons, a dict of key -> image path."""
+        size = tuple(size)
+        loader = threading.Thread(target=self._build, args=(size, dict(icons)), daemon=True)
+        self.loaders[size] = loader
+        loader.start()
+
+    def wait(self, size):
+        loader = self.loaders.pop(tuple(size), None)
+        if loader is not None:
+            loader.join()
+
+    def get(self, size, key):
+        """The icon for key at size, or None while the atlas is still loading or if the icon couldn't be loaded."""
+        with self.lock:
+            atlas = self.atlases.get(tuple(size))
+        return atlas.get(key) if atlas is not None else None
+
+    # --- building ---
+
+    def source_key(self, size, icons):
+        parts = [f"{size[0]}x{size[1]}"]
+        for key in sorted(icons):
+            path = icons[key]
+            try:
+                st = os.stat(path)
+                parts.append(f"{key}|{path}|{st.st_mtime_ns}|{st.st_size}")
+            except OSError:
+                parts.append(f"{key}|{path}|missing")
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()[:12]
+
+    def atlas_path(self, size, source_key):
+        return os.path.join(self.cache_dir, f"icons-{size[0]}x{size[1]}-{source_key}")
+
+    def _build(self, size, icons):
+        source_key = self.source_key(size, icons)
+        atlas = self.read_atlas(size, source_key)
+        if atlas is None:
+            atlas = self.pack(size, icons)
+            self.save_atlas(atlas, source_key)
+
+        with self.lock:
+            self.atlases[size] = atlas
+        if self.ready_event is not None:
+            try:
+                pygame.event.post(pygame.event.Event(self.ready_event, size=size))
+            except pygame.error:
+                pass
+
+    def pack(self, size, icons):
+        keys = sorted(icons)
+        columns = max(1, min(ATLAS_COLUMNS, len(keys)))
+        rows = max(1, -(-len(keys) // columns))
+        sheet = pygame.Surface((columns * size[0], rows * size[1]), pygame.SRCALPHA)
+
+        slots = {}
+        for i, key in enumerate(keys):
+            path = icons[key]
+            try:
+                image = pygame.image.load(path)
+            except (pygame.error, FileNotFoundError):
+                print(f"Warning: {key} icon not found at {path}")
+                continue
+            # smoothscale wants 32 bit pixels, and convert_alpha() needs a display this thread can't count on
+            rgba = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+            rgba.blit(image, (0, 0))
+            rect = pygame.Rect((i % columns) * size[0], (i // columns) * size[1], size[0], size[1])
+            sheet.blit(pygame.transform.smoothscale(rgba, size), rect)
+            slots[key] = rect
+        return IconAtlas(size, sheet, slots)
+
+    # --- disk cache ---
+
+    def read_atlas(self, size, source_key):
+        path = self.atlas_path(size, source_key)
+        try:
+            with open(path + ".json", "r") as f:
+                meta = json.load(f)
+            with open(path + ".raw", "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+
+        sheet_size = tuple(meta["sheet"])
+        if len(data) != sheet_size[0] * sheet_size[1] * 4:
+            return None
+        sheet = pygame.image.frombytes(data, sheet_size, "RGBA")
+        slots = {key: pygame.Rect(rect) for key, rect in meta["slots"].items()}
+        return IconAtlas(size, sheet, slots)
+
+    def save_atlas(self, atlas, source_key):
+        path = self.atlas_path(atlas.size, source_key)
+        meta = {
+            "sheet": list(atlas.sheet.get_size()),
+            "slots": {key: list(rect) for key, rect in atlas.slots.items()},
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # pixels first, the metadata is what makes the pair count as written
+            with open(path + ".raw.tmp", "wb") as f:
+                f.write(pygame.image.tobytes(atlas.sheet, "RGBA"))
+            os.replace(path + ".raw.tmp", path + ".raw")
+            with open(path + ".json.tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(path + ".json.tmp", path + ".json")
+            self.prune(atlas.size, source_key)
+        except OSError as e:
+            print(f"Warning: Could not save icon atlas: {e}")
+
+    def prune(self, size, source_key):
+        """Drops atlases of this size built from older versions of the icons."""
+        prefix = f"icons-{size[0]}x{size[1]}-"
+        keep = prefix + source_key + "."
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(prefix) and not entry.name.startswith(keep):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
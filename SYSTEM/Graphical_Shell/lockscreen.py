@@ -0,0 +1,96 @@
+import pygame
+
+import ShlOSAccounts
+import ShlOSSession
+
+WHITE = (255, 255, 255)
+GREY = (170, 170, 170)
+ERROR_COLOR = (240, 110, 110)
+SHADE_RGB = (0, 0, 0)
+SHADE_ALPHA = 200
+PANEL_COLOR_RGB = (10, 4, 18)
+PANEL_ALPHA = 240
+FIELD_COLOR = (45, 45, 45)
+
+MESSAGES = {
+    "expired": "Your session expired, log in again.",
+    "idle": "Locked after being idle.",
+}
+
+class LockScreen:
+    """
+    Covers the desktop when the login session runs out while it's up, either
+    because it expired or because nobody touched anything for too long. The
+    programs keep running underneath; typing the password of the user who was
+    logged in starts a new session and takes the lock away.
+    """
+    width = 380
+    height = 130
+    padding = 16
+
+    def __init__(self, font, surfaces):
+        self.font = font
+        self.surfaces = surfaces
+        self.locked = False
+        self.user = None
+        self.message = ""
+        self.error = ""
+        self.password = ""
+        self.screen_size = (0, 0)
+
+    def lock(self, user, reason):
+        self.locked = True
+        self.user = user
+        self.message = MESSAGES.get(reason, "Locked.")
+        self.error = ""
+        self.password = ""
+
+    def rect(self):
+        width, height = self.screen_size
+        return pygame.Rect((width - self.width) // 2, (height - self.height) // 2, self.width, self.height)
+
+    def field_rect(self):
+        rect = self.rect()
+        return pygame.Rect(rect.x + self.padding, rect.bottom - self.padding - 28, rect.width - self.padding * 2, 28)
+
+    def paint(self, screen):
+        screen.blit(self.surfaces.panel(self.screen_size, SHADE_RGB, SHADE_ALPHA), (0, 0))
+        rect = self.rect()
+        screen.blit(self.surfaces.panel(rect.size, PANEL_COLOR_RGB, PANEL_ALPHA, 8), rect.topleft)
+
+        screen.blit(self.surfaces.text(self.font, self.user, WHITE), (rect.x + self.padding, rect.y + self.padding))
+        note, color = (self.error, ERROR_COLOR) if self.error else (self.message, GREY)
+        screen.blit(self.surfaces.text(self.font, note, color), (rect.x + self.padding, rect.y + self.padding + 26))
+
+        field = self.field_rect()
+        pygame.draw.rect(screen, FIELD_COLOR, field, border_radius=4)
+        # changes with every key, not worth caching
+        shown = "*" * len(self.password) if self.password else "Password"
+        screen.blit(self.font.render(shown, True, WHITE if self.password else GREY), (field.x + 8, field.y + 6))
+
+    def key(self, event):
+        """Handles a KEYDOWN while locked. Returns True if the lock screen has to be redrawn."""
+        if event.key == pygame.K_RETURN:
+            self.unlock()
+        elif event.key == pygame.K_BACKSPACE:
+            self.password = self.password[:-1]
+        elif event.key == pygame.K_ESCAPE:
+            self.password = ""
+        else:
+            return False
+        return True
+
+    def text_input(self, text):
+        if text.isprintable():
+            self.password += text
+
+    def unlock(self):
+        # loaded now rather than kept, the account may have changed since the lock went up
+        store = ShlOSAccounts.AccountStore().load()
+        if not store.verify(self.user, self.password):
+            self.error = "Incorrect password. Try again."
+            self.password = ""
+            return
+        ShlOSSession.issue(self.user)
+        self.locked = False
+        self.password = ""
@@ -0,0 +1,181 @@
+import os
+import json
+
+# per-folder overrides for standalone scripts, keyed by file name
+FOLDER_MANIFEST = "programs.json"
+# describes a program that lives in its own folder (what SPM extracts zips into)
+APP_MANIFEST = "manifest.json"
+
+class Program:
+    def __init__(self, name, path, toolkit=None, icon=None):
+        self.name = name
+        self.path = path
+        self.toolkit = toolkit
+        self.icon = icon
+
+    def to_dict(self):
+        return {"name": self.name, "path": self.path, "toolkit": self.toolkit, "icon": self.icon}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["path"], data.get("toolkit"), data.get("icon"))
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read {path}: {e}")
+        return {}
+
+def mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def scan_program_dir(directory):
+    """
+    Finds the programs in one folder. Returns (programs, deps) where deps maps every
+    path the result depends on to its mtime, so the scan can be skipped while none change.
+    """
+    programs = []
+    deps = {directory: mtime_ns(directory)}
+
+    folder_manifest_path = os.path.join(directory, FOLDER_MANIFEST)
+    deps[folder_manifest_path] = mtime_ns(folder_manifest_path)
+    overrides = read_json(folder_manifest_path)
+
+    try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name.lower())
+    except OSError as e:
+        print(f"Warning: Could not scan programs folder {directory}: {e}")
+        return programs, deps
+
+    for entry in entries:
+        if entry.is_file() and entry.name.endswith(".py"):
+            info = overrides.get(entry.name, {})
+            if info.get("hidden", False):
+                continue
+            icon = info.get("icon")
+            programs.append(Program(
+                info.get("name", os.path.splitext(entry.name)[0]),
+                entry.path,
+                info.get("toolkit"),
+                os.path.join(directory, icon) if icon else None,
+            ))
+        elif entry.is_dir() and not entry.name.startswith((".", "_")):
+            program = scan_app_dir(entry.path, deps)
+            if program is not None:
+                programs.append(program)
+
+    return programs, deps
+
+def scan_app_dir(app_dir, deps):
+    """A program in its own folder: described by manifest.json, or a <folder>.py / main.py entry point."""
+    deps[app_dir] = mtime_ns(app_dir)
+    manifest_path = os.path.join(app_dir, APP_MANIFEST)
+    deps[manifest_path] = mtime_ns(manifest_path)
+    manifest = read_json(manifest_path)
+    if manifest.get("hidden", False):
+        return None
+
+    folder_name = os.path.basename(app_dir)
+    candidates = [manifest["entry"]] if "entry" in manifest else [f"{folder_name}.py", "main.py", "__main__.py"]
+    for candidate in candidates:
+        entry_path = os.path.join(app_dir, candidate)
+        if os.path.isfile(entry_path):
+            icon = manifest.get("icon")
+            return Program(
+                manifest.get("name", folder_name),
+                entry_path,
+                manifest.get("toolkit"),
+                os.path.join(app_dir, icon) if icon else None,
+            )
+    return None
+
+class ProgramRegistry:
+    """
+    The programs shown in the start menu, found by scanning the programs folders.
+    Scan results are cached per folder together with the mtimes they depend on, so
+    a boot where nothing changed just stats a handful of paths, and refresh() picks
+    up newly installed programs by rescanning only the folders that changed.
+    """
+
+    def __init__(self, program_dirs, cache_file):
+        self.program_dirs = program_dirs
+        self.cache_file = cache_file
+        self.folders = {}
+        self.programs = []
+
+    def load(self):
+        """Loads the cached scan from disk, then refreshes whatever is out of date."""
+        cache = read_json(self.cache_file)
+        for directory, folder in cache.get("folders", {}).items():
+            if directory in self.program_dirs:
+                self.folders[directory] = {
+                    "deps": folder.get("deps", {}),
+                    "programs": [Program.from_dict(data) for data in folder.get("programs", [])],
+                }
+        changed = self.refresh(save=False)
+        if changed or not os.path.exists(self.cache_file):
+            self.save()
+        return self.programs
+
+    def is_stale(self, directory):
+        folder = self.folders.get(directory)
+        if folder is None:
+            return True
+        return any(mtime_ns(path) != mtime for path, mtime in folder["deps"].items())
+
+    def refresh(self, save=True):
+        """Rescans folders whose contents changed. Returns True if the program list changed."""
+        changed = False
+        for directory in self.program_dirs:
+            if not self.is_stale(directory):
+                continue
+            programs, deps = scan_program_dir(directory)
+            old = self.folders.get(directory)
+            if old is None or [p.to_dict() for p in old["programs"]] != [p.to_dict() for p in programs]:
+                changed = True
+            self.folders[directory] = {"deps": deps, "programs": programs}
+
+        if changed or not self.programs:
+            merged = {}
+            for directory in self.program_dirs:
+                for program in self.folders.get(directory, {}).get("programs", []):
+                    merged.setdefault(program.name, program)
+            self.programs = sorted(merged.values(), key=lambda program: program.name.lower())
+        if changed and save:
+            self.save()
+        return changed
+
+    def save(self):
+        cache = {
+            "folders": {
+                directory: {
+                    "deps": folder["deps"],
+                    "programs": [program.to_dict() for program in folder["programs"]],
+                }
+                for directory, folder in self.folders.items()
+            }
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = self.cache_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=4)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Warning: Could not save program cache: {e}")
+
+    def names(self):
+        return [program.name for program in self.programs]
+
+    def find(self, name):
+        for program in self.programs:
+            if program.name == name:
+                return program
+        return None
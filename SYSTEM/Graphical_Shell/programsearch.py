@@ -0,0 +1,98 @@
+import os
+import json
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class LaunchCounts:
+    """How many times each program was started from the start menu, kept between sessions."""
+
+    def __init__(self, path):
+        self.path = path
+        self.counts = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.counts = json.load(f)
+        except FileNotFoundError:
+            self.counts = {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read launch counts: {e}")
+            self.counts = {}
+
+    def get(self, name):
+        return self.counts.get(name, 0)
+
+    def record(self, name):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.counts, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save launch counts: {e}")
+
+class ProgramIndex:
+    """
+    Finds program names for the start menu's type-ahead. Short queries are looked up
+    in a table of word prefixes, longer ones narrow the candidates with a trigram
+    index before checking for the substring, so a keystroke never scans every name.
+    """
+
+    # queries shorter than a trigram are answered from the word prefixes
+    max_prefix = 2
+
+    def __init__(self, names=(), counts=None):
+        self.counts = counts
+        self.build(names)
+
+    def build(self, names):
+        self.names = list(names)
+        self.prefixes = {}
+        self.grams = {}
+        for name in self.names:
+            lowered = name.lower()
+            for word in lowered.split():
+                for length in range(1, min(len(word), self.max_prefix) + 1):
+                    self.prefixes.setdefault(word[:length], set()).add(name)
+            for gram in trigrams(lowered):
+                self.grams.setdefault(gram, set()).add(name)
+
+    def candidates(self, query):
+        if len(query) <= self.max_prefix and " " not in query:
+            return self.prefixes.get(query, set())
+        grams = trigrams(query)
+        if not grams:
+            return set(self.names)
+        sets = sorted((self.grams.get(gram, set()) for gram in grams), key=len)
+        found = set(sets[0])
+        for other in sets[1:]:
+            found &= other
+            if not found:
+                break
+        return found
+
+    def search(self, query):
+        """Names matching query, best first: whole-name prefix, then word prefix, then anywhere, most launched first within each."""
+        query = query.strip().lower()
+        if not query:
+            return list(self.names)
+
+        results = []
+        for name in self.candidates(query):
+            lowered = name.lower()
+            if lowered.startswith(query):
+                rank = 0
+            elif any(word.startswith(query) for word in lowered.split()):
+                rank = 1
+            elif query in lowered:
+                rank = 2
+            else:
+                continue
+            launches = self.counts.get(name) if self.counts is not None else 0
+            results.append((rank, -launches, lowered, name))
+        results.sort()
+        return [name for rank, launches, lowered, name in results]
@@ -0,0 +1,54 @@
+import pygame
+
+class SurfaceCache:
+    """
+    Keeps pre-composited surfaces (translucent panels, rendered labels) around
+    between frames so drawing the desktop doesn't allocate new surfaces.
+    Keys include everything that affects the pixels, so a hit is always correct;
+    clear() only exists to free surfaces that can't be hit anymore.
+    """
+
+    def __init__(self):
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = build()
+            self.surfaces[key] = surface
+        else:
+            self.hits += 1
+        return surface
+
+    def panel(self, size, color_rgb, alpha, radius=0):
+        """A translucent, optionally rounded, rectangle of the given size."""
+        def build():
+            s = pygame.Surface(size, pygame.SRCALPHA)
+            s.fill((0, 0, 0, 0))
+            if radius:
+                pygame.draw.rect(s, (*color_rgb, alpha), (0, 0, *size), border_radius=radius)
+            else:
+                s.fill((*color_rgb, alpha))
+            return s
+        return self.get(("panel", tuple(size), tuple(color_rgb), alpha, radius), build)
+
+    def text(self, font, text, color):
+        """text rendered with font, antialiased."""
+        return self.get(("text", font, text, tuple(color)), lambda: font.render(text, True, color))
+
+    def clear(self, kind=None):
+        """Drops every cached surface, or only those of one kind ("panel" or "text")."""
+        if kind is None:
+            self.surfaces.clear()
+        else:
+            self.surfaces = {key: s for key, s in self.surfaces.items() if key[0] != kind}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "surfaces": len(self.surfaces)}
@@ -0,0 +1,204 @@
+import time
+
+import psutil
+import pygame
+
+WHITE = (255, 255, 255)
+GREY = (170, 170, 170)
+PANEL_COLOR_RGB = (10, 4, 18)
+PANEL_ALPHA = 230
+BUTTON_COLOR = (45, 45, 45)
+END_BUTTON_COLOR = (120, 30, 40)
+
+PRIORITY_LEVELS = ["Low", "Normal", "High"]
+
+if psutil.WINDOWS:
+    PRIORITY_VALUES = {
+        "Low": psutil.BELOW_NORMAL_PRIORITY_CLASS,
+        "Normal": psutil.NORMAL_PRIORITY_CLASS,
+        "High": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+    }
+else:
+    # raising priority above normal needs root on most unix systems
+    PRIORITY_VALUES = {"Low": 10, "Normal": 0, "High": -5}
+
+class ProcessEntry:
+    def __init__(self, name, path, process):
+        self.name = name
+        self.path = path
+        self.process = process
+        self.pid = process.pid
+        self.started = time.time()
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.priority = "Normal"
+        self.stopping = False
+        try:
+            self.ps = psutil.Process(self.pid)
+            self.ps.cpu_percent(None)
+        except psutil.Error:
+            self.ps = None
+
+    def uptime(self):
+        return time.time() - self.started
+
+class ProcessRegistry:
+    """
+    Every program the shell launched, with its Popen handle so it can be reaped,
+    stopped, or re-prioritised. CPU and memory are sampled for all of them in one
+    pass, at most once per sample_interval seconds.
+    """
+
+    def __init__(self, sample_interval=2.0):
+        self.sample_interval = sample_interval
+        self.entries = {}
+        self.last_sample = 0.0
+
+    def add(self, name, path, process):
+        entry = ProcessEntry(name, path, process)
+        self.entries[entry.pid] = entry
+        return entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def list(self):
+        return sorted(self.entries.values(), key=lambda entry: entry.started)
+
+    def reap(self):
+        """Collects programs that have exited. Returns their entries."""
+        exited = [entry for entry in self.entries.values() if entry.process.poll() is not None]
+        for entry in exited:
+            del self.entries[entry.pid]
+        return exited
+
+    def sample(self, force=False):
+        """Refreshes CPU and memory for every process. Returns False if it was too soon to sample again."""
+        now = time.time()
+        if not force and now - self.last_sample < self.sample_interval:
+            return False
+        self.last_sample = now
+
+        for entry in self.entries.values():
+            if entry.ps is None:
+                continue
+            try:
+                with entry.ps.oneshot():
+                    entry.cpu_percent = entry.ps.cpu_percent(None)
+                    entry.rss = entry.ps.memory_info().rss
+            except psutil.Error:
+                entry.cpu_percent = 0.0
+        return True
+
+    def kill(self, pid):
+        entry = self.entries.get(pid)
+        if entry is None:
+            return
+        try:
+            # ask nicely first, a second End on a program that ignored it kills it outright.
+            # no waiting here, reap() picks up the exit on the next process poll
+            if entry.stopping:
+                entry.process.kill()
+            else:
+                entry.process.terminate()
+                entry.stopping = True
+        except OSError as e:
+            print(f"Error stopping {entry.name}: {e}")
+
+    def set_priority(self, pid, level):
+        entry = self.entries.get(pid)
+        if entry is None or entry.ps is None:
+            return
+        try:
+            entry.ps.nice(PRIORITY_VALUES[level])
+            entry.priority = level
+        except (psutil.Error, OSError) as e:
+            print(f"Warning: Could not set {entry.name} to {level} priority: {e}")
+
+class TaskManagerPanel:
+    """The task manager window drawn on the desktop, listing what the registry tracks."""
+    width = 560
+    row_height = 24
+    header_height = 30
+    padding = 8
+
+    def __init__(self, registry, font, surfaces):
+        self.registry = registry
+        self.font = font
+        self.surfaces = surfaces
+        self.visible = False
+        self.screen_width = 0
+
+    def rect(self):
+        rows = max(1, len(self.registry))
+        height = self.header_height + self.row_height * (rows + 1) + self.padding
+        return pygame.Rect(self.screen_width - self.width - 10, 40, self.width, height)
+
+    def close_rect(self):
+        rect = self.rect()
+        return pygame.Rect(rect.right - 26, rect.y + 5, 20, 20)
+
+    def rows(self):
+        """(entry, row rect, priority button rect, end button rect) for each process."""
+        rect = self.rect()
+        rows = []
+        y = rect.y + self.header_height + self.row_height
+        for entry in self.registry.list():
+            row = pygame.Rect(rect.x + self.padding, y, rect.width - self.padding * 2, self.row_height)
+            priority_rect = pygame.Rect(row.right - 130, y + 2, 70, self.row_height - 4)
+            end_rect = pygame.Rect(row.right - 55, y + 2, 55, self.row_height - 4)
+            rows.append((entry, row, priority_rect, end_rect))
+            y += self.row_height
+        return rows
+
+    def paint(self, screen):
+        rect = self.rect()
+        screen.blit(self.surfaces.panel(rect.size, PANEL_COLOR_RGB, PANEL_ALPHA, 8), rect.topleft)
+
+        screen.blit(self.surfaces.text(self.font, "Task Manager", WHITE), (rect.x + self.padding, rect.y + 7))
+        close_rect = self.close_rect()
+        pygame.draw.rect(screen, BUTTON_COLOR, close_rect, border_radius=4)
+        screen.blit(self.surfaces.text(self.font, "x", WHITE), (close_rect.x + 6, close_rect.y + 1))
+
+        columns = [("Name", 0), ("PID", 190), ("CPU", 250), ("Memory", 310)]
+        header_y = rect.y + self.header_height
+        for label, x in columns:
+            screen.blit(self.surfaces.text(self.font, label, GREY), (rect.x + self.padding + x, header_y + 4))
+
+        entries = self.rows()
+        if not entries:
+            screen.blit(self.surfaces.text(self.font, "No programs running", GREY),
+                        (rect.x + self.padding, header_y + self.row_height + 4))
+
+        for entry, row, priority_rect, end_rect in entries:
+            name = entry.name if len(entry.name) <= 20 else entry.name[:19] + "…"
+            cells = [
+                (name, 0),
+                (str(entry.pid), 190),
+                (f"{entry.cpu_percent:.0f}%", 250),
+                (f"{entry.rss / (1024 ** 2):.0f} MB", 310),
+            ]
+            for text, x in cells:
+                # these change on every sample, so they aren't worth caching
+                screen.blit(self.font.render(text, True, WHITE), (row.x + x, row.y + 4))
+
+            pygame.draw.rect(screen, BUTTON_COLOR, priority_rect, border_radius=4)
+            screen.blit(self.surfaces.text(self.font, entry.priority, WHITE), (priority_rect.x + 6, priority_rect.y + 1))
+            pygame.draw.rect(screen, END_BUTTON_COLOR, end_rect, border_radius=4)
+            screen.blit(self.surfaces.text(self.font, "End", WHITE), (end_rect.x + 12, end_rect.y + 1))
+
+    def click(self, pos):
+        """Handles a click inside the panel. Returns True if the process list changed."""
+        if self.close_rect().collidepoint(pos):
+            self.visible = False
+            return True
+        for entry, row, priority_rect, end_rect in self.rows():
+            if end_rect.collidepoint(pos):
+                self.registry.kill(entry.pid)
+                self.registry.reap()
+                return True
+            if priority_rect.collidepoint(pos):
+                next_level = PRIORITY_LEVELS[(PRIORITY_LEVELS.index(entry.priority) + 1) % len(PRIORITY_LEVELS)]
+                self.registry.set_priority(entry.pid, next_level)
+                return True
+        return False
@@ -0,0 +1,234 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pygame
+
+class WallpaperService:
+    """
+    Loads the desktop wallpaper and hands out copies scaled to the window size.
+
+    The big PNG is decoded on a background thread. Scaled variants are kept in a
+    small LRU keyed by window size and also written to the cache folder as raw
+    pixels, so the next boot at the same size doesn't need to decode the PNG at all.
+    request() does the scaling for a new size on a background thread as well and
+    posts ready_event (when given) once it's done, so a resize never stalls the desktop.
+    """
+
+    def __init__(self, path, cache_dir, max_variants=4, max_saved_variants=8, ready_event=None):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.max_variants = max_variants
+        self.max_saved_variants = max_saved_variants
+        self.ready_event = ready_event
+
+        self.source = None
+        self.missing = False
+        self.variants = OrderedDict()
+        # size -> surface scaled by a background thread, not converted yet
+        self.scaled = {}
+        self.scaling = set()
+
+        self.loader = None
+        self.prefetched = None
+        # set once the loader has the saved variant or has finished with the PNG
+        self.first_ready = threading.Event()
+        self.lock = threading.Lock()
+        self.source_key = self.make_source_key()
+
+    def make_source_key(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return hashlib.sha1(f"{self.path}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()[:12]
+
+    def variant_prefix(self):
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        return f"{stem}-{self.source_key}-"
+
+    def variant_path(self, size):
+        return os.path.join(self.cache_dir, f"{self.variant_prefix()}{size[0]}x{size[1]}.raw")
+
+    # --- loading ---
+
+    def start(self, size=None):
+        """Starts loading in the background: the saved variant for size if there is one, then the PNG."""
+        with self.lock:
+            if self.loader is not None:
+                return
+            self.loader = threading.Thread(target=self._load, args=(tuple(size) if size else None,), daemon=True)
+            self.loader.start()
+
+    def _load(self, size):
+        data = self.read_variant(size) if size is not None else None
+        if data is not None:
+            self.prefetched = (size, data)
+            self.first_ready.set()
+        # the first resize will want the PNG, better to decode it now than when it happens
+        self.decode()
+        self.first_ready.set()
+
+    def decode(self):
+        if not os.path.exists(self.path):
+            print(f"Error: Background file not found: {self.path}")
+            self.missing = True
+            return
+        try:
+            self.source = pygame.image.load(self.path)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Error: Could not load background {self.path}: {e}")
+            self.missing = True
+
+    def wait_source(self):
+        """Blocks until the PNG has been decoded (or turned out to be missing)."""
+        self.start()
+        self.loader.join()
+
+    def read_variant(self, size):
+        if self.source_key is None:
+            return None
+        try:
+            with open(self.variant_path(size), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # a truncated file from a crash mid-write is just a miss
+        return data if len(data) == size[0] * size[1] * 3 else None
+
+    # --- scaled variants ---
+
+    def get(self, size):
+        """The wallpaper smoothscaled to size, from memory, from disk, or scaled from the PNG. Blocks until it has it."""
+        size = tuple(size)
+        surface = self.variants.get(size)
+        if surface is not None:
+            self.variants.move_to_end(size)
+            return surface
+
+        with self.lock:
+            surface = self.scaled.pop(size, None)
+        if surface is None:
+            surface = self.make_variant(size)
+        if surface is None:
+            return pygame.Surface(size)
+
+        # converting needs the display, so it only happens here on the main thread
+        surface = surface.convert()
+        self.variants[size] = surface
+        while len(self.variants) > self.max_variants:
+            self.variants.popitem(last=False)
+        return surface
+
+    def request(self, size):
+        """
+        The wallpaper for size if it's already in memory, otherwise None: it gets
+        made on a background thread and ready_event is posted with its size once
+        get() can return it straight away.
+        """
+        size = tuple(size)
+        if size in self.variants:
+            return self.get(size)
+        with self.lock:
+            if size in self.scaled:
+                done = True
+            elif size in self.scaling:
+                return None
+            else:
+                done = False
+                self.scaling.add(size)
+        if done:
+            return self.get(size)
+        threading.Thread(target=self._scale, args=(size,), daemon=True).start()
+        return None
+
+    def discard(self, size):
+        """Drops what request() made for size without converting it, for a size that isn't wanted any more."""
+        with self.lock:
+            self.scaled.pop(tuple(size), None)
+
+    def _scale(self, size):
+        surface = self.make_variant(size)
+        with self.lock:
+            self.scaling.discard(size)
+            if surface is not None:
+                self.scaled[size] = surface
+        if self.ready_event is not None:
+            try:
+                pygame.event.post(pygame.event.Event(self.ready_event, size=size))
+            except pygame.error:
+                pass
+
+    def make_variant(self, size):
+        """An unconverted surface for size, from the prefetch, the disk cache or the PNG. None if there's no wallpaper."""
+        if self.loader is not None:
+            self.first_ready.wait()
+        with self.lock:
+            prefetched, self.prefetched = self.prefetched, None
+        if prefetched is not None and prefetched[0] == size:
+            data = prefetched[1]
+        else:
+            data = self.read_variant(size)
+        if data is not None:
+            return pygame.image.frombytes(data, size, "RGB")
+
+        self.wait_source()
+        if self.source is None:
+            return None
+        surface = pygame.transform.smoothscale(self.source, size)
+        self.save_variant(size, surface)
+        return surface
+
+    def preview(self, size):
+        """A rough, fast scale for live resizing, made from whatever version is already in memory."""
+        size = tuple(size)
+        if size in self.variants:
+            return self.get(size)
+        base = next(reversed(self.variants.values()), None)
+        if base is None:
+            base = self.source
+        if base is None:
+            # nothing loaded yet, black until the smooth one is ready
+            return pygame.Surface(size)
+        return pygame.transform.scale(base, size)
+
+    def save_variant(self, size, surface):
+        if self.source_key is None:
+            return
+        data = pygame.image.tobytes(surface, "RGB")
+        threading.Thread(target=self._write_variant, args=(size, data), daemon=True).start()
+
+    def _write_variant(self, size, data):
+        path = self.variant_path(size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.prune_saved_variants()
+        except OSError as e:
+            print(f"Warning: Could not save scaled wallpaper: {e}")
+
+    def prune_saved_variants(self):
+        """Keeps the most recently written variants of this wallpaper and drops ones from older versions of it."""
+        prefix = self.variant_prefix()
+        stem = os.path.splitext(os.path.basename(self.path))[0] + "-"
+        ours = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".raw") or not entry.name.startswith(stem):
+                continue
+            if entry.name.startswith(prefix):
+                ours.append(entry)
+            else:
+                self.remove_file(entry.path)
+        ours.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in ours[self.max_saved_variants:]:
+            self.remove_file(entry.path)
+
+    def remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,218 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+import subprocess
+from collections import deque
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zygote_worker.py")
+
+# which toolkit family a program belongs to, judged by its imports
+TOOLKIT_PATTERNS = [
+    ("qt", re.compile(r"^\s*(from|import)\s+PyQt5", re.MULTILINE)),
+    ("pygame", re.compile(r"^\s*(from|import)\s+pygame", re.MULTILINE)),
+    ("tk", re.compile(r"^\s*(from|import)\s+tkinter", re.MULTILINE)),
+]
+
+_toolkit_cache = {}
+
+def detect_toolkit(path):
+    """Guesses "tk", "qt" or "pygame" from a program's imports. None if it uses none of them."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _toolkit_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            source = f.read(64 * 1024)
+    except OSError:
+        return None
+    family = None
+    for name, pattern in TOOLKIT_PATTERNS:
+        if pattern.search(source):
+            family = name
+            break
+    _toolkit_cache[path] = (mtime, family)
+    return family
+
+def pass_fd(fd, passed):
+    """The argument that names fd in the worker (a handle on Windows). passed collects what Popen has to let through."""
+    if sys.platform == "win32":
+        import msvcrt
+        handle = msvcrt.get_osfhandle(fd)
+        os.set_handle_inheritable(handle, True)
+        passed.append(handle)
+        return str(handle)
+    passed.append(fd)
+    return str(fd)
+
+class Worker:
+    def __init__(self, family):
+        self.family = family
+        self.spawned = time.time()
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+        # the request goes in and the reports come back on pipes of their own, so
+        # the program gets the shell's stdin, stdout and stderr like a plain Popen
+        report_read, report_write = os.pipe()
+        request_read, request_write = os.pipe()
+        try:
+            passed = []
+            channels = [pass_fd(report_write, passed), pass_fd(request_read, passed)]
+            options = {"close_fds": False} if sys.platform == "win32" else {"pass_fds": tuple(passed)}
+            self.process = subprocess.Popen([sys.executable, WORKER_SCRIPT, family] + channels, env=env, **options)
+        except OSError:
+            os.close(report_read)
+            os.close(request_write)
+            raise
+        finally:
+            os.close(report_write)
+            os.close(request_read)
+        self.reports = os.fdopen(report_read, "r")
+        self.requests = os.fdopen(request_write, "w")
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def stop(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        self.reports.close()
+        try:
+            self.requests.close()
+        except OSError:
+            # it never read what was written
+            pass
+
+class LaunchRecord:
+    """Timing for one launch. latency is click to first window, once the program shows one."""
+
+    def __init__(self, path, family, warm):
+        self.path = path
+        self.family = family
+        self.warm = warm
+        self.clicked = time.time()
+        self.started = None
+        self.latency = None
+
+class ZygotePool:
+    """
+    Keeps a few interpreters per toolkit family running with the toolkit already
+    imported. Launching a program hands its path to one of them, so the program
+    skips interpreter start-up and the heavy imports. Programs that don't use a
+    known toolkit, or a launch when the pool is empty, get a fresh worker instead,
+    so cold launches report their first window too and the two can be compared.
+    """
+
+    def __init__(self, families=("tk", "qt", "pygame"), pool_size=1, idle_timeout=600):
+        self.families = list(families)
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.idle = {family: [] for family in self.families}
+        self.launches = deque(maxlen=200)
+        self.lock = threading.Lock()
+
+    def start(self):
+        for family in self.families:
+            self.refill(family)
+
+    def refill(self, family):
+        if self.pool_size <= 0:
+            return
+        with self.lock:
+            workers = self.idle.setdefault(family, [])
+            workers[:] = [worker for worker in workers if worker.alive()]
+            while len(workers) < self.pool_size:
+                try:
+                    workers.append(Worker(family))
+                except OSError as e:
+                    print(f"Warning: Could not start a {family} launcher worker: {e}")
+                    break
+
+    def take_worker(self, family):
+        with self.lock:
+            workers = self.idle.get(family, [])
+            while workers:
+                worker = workers.pop(0)
+                if worker.alive():
+                    return worker
+        return None
+
+    def launch(self, path, args=(), family=None):
+        """Starts the program at path and returns its process handle right away. Raises OSError if it can't."""
+        if family is None:
+            family = detect_toolkit(path)
+        worker = self.take_worker(family) if family in self.families else None
+        record = LaunchRecord(path, family, warm=worker is not None)
+        if worker is None:
+            # nothing warm for it: a worker started now is no quicker than a plain
+            # Popen, but the program reports its first window the same way
+            worker = Worker(family or "")
+
+        process = worker.process
+        try:
+            worker.requests.write(json.dumps({"path": path, "args": list(args)}) + "\n")
+            worker.requests.close()
+        except OSError:
+            worker.stop()
+            if not record.warm:
+                raise
+            return self.launch(path, args, family)
+        threading.Thread(target=self.watch_reports, args=(worker, record), daemon=True).start()
+        if family in self.families:
+            threading.Thread(target=self.refill, args=(family,), daemon=True).start()
+
+        self.launches.append(record)
+        return process
+
+    def watch_reports(self, worker, record):
+        with worker.reports:
+            for line in worker.reports:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get("event") == "started":
+                    record.started = message["time"] - record.clicked
+                elif message.get("event") == "window" and record.latency is None:
+                    record.latency = message["time"] - record.clicked
+                    kind = "warm" if record.warm else "cold"
+                    print(f"Launched {os.path.basename(record.path)} in {record.latency * 1000:.0f} ms ({kind} {record.family or 'plain'} worker)")
+
+    def reap_idle(self):
+        """Stops idle workers that have been waiting longer than idle_timeout seconds."""
+        if self.idle_timeout <= 0:
+            return
+        now = time.time()
+        with self.lock:
+            for family, workers in self.idle.items():
+                keep = []
+                for worker in workers:
+                    if now - worker.spawned > self.idle_timeout or not worker.alive():
+                        worker.stop()
+                    else:
+                        keep.append(worker)
+                workers[:] = keep
+
+    def latency_stats(self):
+        """Average click-to-window time in seconds per (family, warm), for launches that showed a window."""
+        totals = {}
+        for record in self.launches:
+            if record.latency is None:
+                continue
+            count, total = totals.get((record.family, record.warm), (0, 0.0))
+            totals[(record.family, record.warm)] = (count + 1, total + record.latency)
+        return {key: total / count for key, (count, total) in totals.items()}
+
+    def shutdown(self):
+        with self.lock:
+            for workers in self.idle.values():
+                for worker in workers:
+                    worker.stop()
+                workers.clear()
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import time
+import runpy
+import importlib
+import traceback
+
+# a warm interpreter for the shell's launcher pool (see zygote.py). it imports a
+# toolkit up front, then waits for the program it should become. the shell talks
+# to it over two pipes named by fd (a handle on Windows) in the arguments: reports
+# go back on the first, the request comes in on the second. stdin, stdout and
+# stderr are the shell's, passed on untouched to the program.
+
+TOOLKIT_MODULES = {
+    "tk": ["tkinter", "tkinter.ttk", "tkinter.messagebox", "tkinter.filedialog", "PIL.Image", "PIL.ImageTk"],
+    "qt": ["PyQt5.QtCore", "PyQt5.QtGui", "PyQt5.QtWidgets", "PyQt5.QtWebEngineWidgets"],
+    "pygame": ["pygame"],
+}
+
+report_channel = None
+
+def report(event, **fields):
+    if report_channel is None:
+        return
+    fields.update({"event": event, "time": time.time(), "pid": os.getpid()})
+    try:
+        report_channel.write(json.dumps(fields) + "\n")
+        report_channel.flush()
+    except (OSError, ValueError):
+        pass
+
+def preload(family):
+    for module in TOOLKIT_MODULES.get(family, []):
+        try:
+            importlib.import_module(module)
+        except Exception:
+            # the program will hit the same error itself and report it properly
+            pass
+
+def report_first_window():
+    """Patches whatever toolkit got loaded so we hear about the first window the program shows."""
+    reported = []
+
+    def window_shown():
+        if not reported:
+            reported.append(True)
+            report("window")
+
+    tkinter = sys.modules.get("tkinter")
+    if tkinter is not None:
+        original_tk_init = tkinter.Tk.__init__
+
+        def tk_init(self, *args, **kwargs):
+            original_tk_init(self, *args, **kwargs)
+            self.after(0, window_shown)
+        tkinter.Tk.__init__ = tk_init
+
+    pygame = sys.modules.get("pygame")
+    if pygame is not None:
+        original_set_mode = pygame.display.set_mode
+
+        def set_mode(*args, **kwargs):
+            surface = original_set_mode(*args, **kwargs)
+            window_shown()
+            return surface
+        pygame.display.set_mode = set_mode
+
+    qt_widgets = sys.modules.get("PyQt5.QtWidgets")
+    if qt_widgets is not None:
+        from PyQt5.QtCore import QTimer
+        for name in ("exec_", "exec"):
+            original_exec = getattr(qt_widgets.QApplication, name, None)
+            if original_exec is None:
+                continue
+
+            def app_exec(*args, _original=original_exec, **kwargs):
+                QTimer.singleShot(0, window_shown)
+                return _original(*args, **kwargs)
+            setattr(qt_widgets.QApplication, name, staticmethod(app_exec))
+
+def open_channel(name, mode):
+    channel = int(name)
+    if sys.platform == "win32":
+        import msvcrt
+        os.set_handle_inheritable(channel, False)
+        channel = msvcrt.open_osfhandle(channel, os.O_WRONLY if mode == "w" else os.O_RDONLY)
+    else:
+        # programs started by the program shouldn't hold the pipe open after it exits
+        os.set_inheritable(channel, False)
+    return os.fdopen(channel, mode)
+
+def main():
+    global report_channel
+    family = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if len(sys.argv) < 4:
+        print("Usage: zygote_worker.py family report_fd request_fd", file=sys.stderr)
+        sys.exit(2)
+    report_channel = open_channel(sys.argv[2], "w")
+    request_channel = open_channel(sys.argv[3], "r")
+
+    preload(family)
+    report("ready", family=family)
+
+    with request_channel:
+        line = request_channel.readline()
+    if not line:
+        return
+    request = json.loads(line)
+    path = request["path"]
+
+    report_first_window()
+    sys.argv = [path] + list(request.get("args", []))
+    sys.path.insert(0, os.path.dirname(path))
+    report("started", path=path)
+
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException:
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import os
+import json
+import hmac
+import time
+import hashlib
+import secrets
+
+import ShlOSConfig
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+ACCOUNTS_FILE = os.path.join(script_dir, "accounts.json")
+
+KDF_NAME = "pbkdf2_sha256"
+SALT_BYTES = 16
+
+def hash_password(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations).hex()
+
+def fsync_dir(path):
+    # makes a rename inside the folder durable, not something windows supports
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class AccountStore:
+    """
+    The user accounts, indexed by name.
+
+    accounts.json is a snapshot. Changes since the last snapshot are appended to
+    accounts.journal, one JSON line each, so creating an account never rewrites
+    the whole file. Loading replays the journal over the snapshot. Once the
+    journal grows past compact_after entries it's folded into a new snapshot that
+    replaces the old one atomically.
+
+    Passwords are kept as salted PBKDF2 hashes. The iteration count comes from
+    shellos.ini and is stored with each hash, so raising it upgrades a password
+    the next time it's used. Old plaintext entries are hashed when the store loads.
+    """
+
+    def __init__(self, path=ACCOUNTS_FILE, iterations=None, compact_after=None):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        self.iterations = iterations or ShlOSConfig.get_int("Accounts", "kdf_iterations", 200000)
+        self.compact_after = compact_after or ShlOSConfig.get_int("Accounts", "compact_after", 64)
+        self.accounts = {}
+        self.journal_entries = 0
+        # set when the snapshot couldn't be read and is still in place, compacting would overwrite it
+        self.degraded = False
+
+    # --- loading ---
+
+    def load(self):
+        self.accounts = {}
+        self.journal_entries = 0
+        self.degraded = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for account in json.load(f):
+                    self.accounts[account["name"]] = account
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Error: Could not read {self.path}: {e}")
+            self.accounts = {}
+            self.set_aside_snapshot()
+        except OSError as e:
+            print(f"Error: Could not read {self.path}: {e}")
+            self.degraded = True
+
+        torn = self.replay_journal()
+
+        legacy = [account for account in self.accounts.values() if "password" in account]
+        for account in legacy:
+            self.hash_into(account, account.pop("password"))
+        if legacy or torn or self.journal_entries >= self.compact_after:
+            self.compact()
+        return self
+
+    def set_aside_snapshot(self):
+        """Moves a damaged snapshot out of the way, so the next compact() can't replace it and lose the accounts in it."""
+        corrupt_path = f"{self.path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+        try:
+            os.replace(self.path, corrupt_path)
+        except OSError as e:
+            print(f"Error: Could not move {self.path} aside, accounts won't be saved until it's fixed: {e}")
+            self.degraded = True
+            return
+        print(f"Warning: The damaged accounts file was kept as {corrupt_path}.")
+
+    def replay_journal(self):
+        """Applies the journal to the loaded snapshot. Returns True if it had a damaged line."""
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Error: Could not read {self.journal_path}: {e}")
+            return False
+
+        torn = False
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+            if not self.valid_entry(entry):
+                # a line cut short by a crash mid-append, or one that's been mangled. everything
+                # else still counts, and load() compacts straight away so the bad line goes
+                torn = True
+                continue
+            if entry["op"] == "put":
+                account = entry["account"]
+                self.accounts[account["name"]] = account
+            else:
+                self.accounts.pop(entry["name"], None)
+            self.journal_entries += 1
+        return torn
+
+    def valid_entry(self, entry):
+        if not isinstance(entry, dict):
+            return False
+        if entry.get("op") == "put":
+            account = entry.get("account")
+            return isinstance(account, dict) and isinstance(account.get("name"), str)
+        if entry.get("op") == "delete":
+            return isinstance(entry.get("name"), str)
+        return False
+
+    # --- lookups ---
+
+    def get(self, name):
+        return self.accounts.get(name)
+
+    def visible(self):
+        return [account for account in self.accounts.values() if not account.get("hidden", False)]
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def verify(self, name, password):
+        account = self.accounts.get(name)
+        if account is None or "hash" not in account:
+            return False
+        salt = bytes.fromhex(account["salt"])
+        expected = hash_password(password, salt, account["iterations"])
+        if not hmac.compare_digest(expected, account["hash"]):
+            return False
+        if account["iterations"] != self.iterations:
+            self.set_password(name, password)
+        return True
+
+    # --- changes ---
+
+    def hash_into(self, account, password):
+        salt = secrets.token_bytes(SALT_BYTES)
+        account.update({
+            "kdf": KDF_NAME,
+            "iterations": self.iterations,
+            "salt": salt.hex(),
+            "hash": hash_password(password, salt, self.iterations),
+        })
+
+    def create(self, name, password, hidden=False):
+        """Adds an account. Returns it, or None if the name is empty or taken."""
+        if not name:
+            print("Error: Account name can't be empty.")
+            return None
+        if name in self.accounts:
+            print(f"Error: An account named '{name}' already exists.")
+            return None
+        account = {"name": name, "hidden": hidden}
+        self.hash_into(account, password)
+        self.accounts[name] = account
+        self.append({"op": "put", "account": account})
+        return account
+
+    def set_password(self, name, password):
+        account = self.accounts.get(name)
+        if account is None:
+            return False
+        self.hash_into(account, password)
+        self.append({"op": "put", "account": account})
+        return True
+
+    def delete(self, name):
+        if self.accounts.pop(name, None) is None:
+            return False
+        self.append({"op": "delete", "name": name})
+        return True
+
+    # --- disk ---
+
+    def append(self, entry):
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Error: Could not save account change: {e}")
+            return
+        self.journal_entries += 1
+        if self.journal_entries >= self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """Writes every account to a fresh snapshot and empties the journal."""
+        if self.degraded:
+            # changes stay in the journal, nothing is lost until the snapshot can be read again
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(self.accounts.values()), f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            fsync_dir(os.path.dirname(self.path))
+            # replaying a journal over a snapshot that already has its changes is harmless,
+            # so a crash before this line loses nothing
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        except OSError as e:
+            print(f"Error: Could not save accounts: {e}")
+            return
+        self.journal_entries = 0
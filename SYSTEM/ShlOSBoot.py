@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+
+# boots shellos in a single python process instead of one interpreter per stage
+SYSTEM_DIR = os.path.dirname(os.path.abspath(__file__))
+GRAPHICAL_SHELL_DIR = os.path.join(SYSTEM_DIR, "Graphical_Shell")
+for path in (SYSTEM_DIR, GRAPHICAL_SHELL_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from version import __version__
+import ShlOSConfig
+
+class BootTimer:
+    """Records how long each boot stage took and when the desktop first appeared."""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.stage_times = []
+        self.current_stage = None
+        self.stage_start = None
+        self.desktop_time = None
+
+    def begin(self, name):
+        self.current_stage = name
+        self.stage_start = time.perf_counter()
+
+    def end(self):
+        if self.current_stage is not None:
+            self.stage_times.append((self.current_stage, time.perf_counter() - self.stage_start))
+            self.current_stage = None
+
+    def desktop_ready(self):
+        """Called by the graphical shell once its first frame is on screen."""
+        if self.desktop_time is not None:
+            return
+        self.desktop_time = time.perf_counter() - self.start_time
+        self.end()
+        self.report()
+
+    def report(self):
+        print("\nBoot timings:")
+        for name, elapsed in self.stage_times:
+            print(f"  {name:<20} {elapsed:8.3f} s")
+        if self.desktop_time is not None:
+            print(f"Time to desktop: {self.desktop_time:.3f} s\n")
+
+# each stage imports what it needs so import time is charged to the stage that uses it
+def stage_verify_os(timer):
+    import ShlOSStart
+    ShlOSStart.verify_os()
+
+def stage_verify_hardware(timer):
+    import ShlOSStart
+    ShlOSStart.verify_hardware()
+
+def stage_login(timer):
+    import ShlOSSession
+    import ShlOSAccounts
+    user = ShlOSSession.resume()
+    # loaded once, both the resume check and the login screen use it
+    store = ShlOSAccounts.AccountStore().load()
+    # a session for an account that's since been deleted doesn't count
+    if user is not None and store.get(user) is not None:
+        print(f"Welcome back, {user}.")
+        return
+
+    import shloslogon
+    user = shloslogon.login_screen(store=store)
+    ShlOSSession.issue(user)
+
+def stage_shell(timer):
+    import GraphicalShell
+    GraphicalShell.main(on_ready=timer.desktop_ready)
+
+BOOT_STAGES = [
+    ("Verify OS", stage_verify_os),
+    ("Verify hardware", stage_verify_hardware),
+    ("Login", stage_login),
+    ("Shell", stage_shell),
+]
+
+# what ShlOSCore runs once the system checks have passed
+SESSION_STAGES = BOOT_STAGES[2:]
+
+def boot(stages=BOOT_STAGES):
+    timer = BootTimer()
+    for name, stage in stages:
+        timer.begin(name)
+        stage(timer)
+        timer.end()
+    if timer.desktop_time is None:
+        timer.report()
+    return timer
+
+def main():
+    print(f"Starting ShellOS {__version__}")
+    splash_delay = ShlOSConfig.get_float("Boot", "splash_delay", 0)
+    if splash_delay > 0:
+        time.sleep(splash_delay)
+    boot()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import configparser
+
+# system wide settings live in SYSTEM/shellos.ini, anything missing falls back to the caller's default
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shellos.ini")
+
+_config = None
+
+def load_config():
+    global _config
+    if _config is None:
+        _config = configparser.ConfigParser()
+        try:
+            _config.read(CONFIG_FILE)
+        except configparser.Error as e:
+            print(f"Warning: Could not read {CONFIG_FILE}: {e}")
+    return _config
+
+def get_str(section, key, fallback=None):
+    return load_config().get(section, key, fallback=fallback)
+
+def get_int(section, key, fallback=0):
+    try:
+        return load_config().getint(section, key, fallback=fallback)
+    except ValueError:
+        print(f"Warning: [{section}] {key} in shellos.ini is not a number, using {fallback}")
+        return fallback
+
+def get_float(section, key, fallback=0.0):
+    try:
+        return load_config().getfloat(section, key, fallback=fallback)
+    except ValueError:
+        print(f"Warning: [{section}] {key} in shellos.ini is not a number, using {fallback}")
+        return fallback
+
+def get_bool(section, key, fallback=False):
+    try:
+        return load_config().getboolean(section, key, fallback=fallback)
+    except ValueError:
+        print(f"Warning: [{section}] {key} in shellos.ini is not true/false, using {fallback}")
+        return fallback
@@ -1,16 +1,16 @@
 import os
-import subprocess
+import sys
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-login_script = os.path.join(script_dir, "shloslogon.py")
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+import ShlOSBoot
 
 def run_shellos():
-    # runs shit that lets you log into your user account to actually access shellos
-    if os.path.exists(login_script):
-        subprocess.run(["python", login_script])
-    else:
-        print(f"Error: {login_script} not found.")
-        return
+    # runs shit that lets you log into your user account to actually access shellos,
+    # or goes straight to the desktop if there's still a valid session from last time
+    ShlOSBoot.boot(ShlOSBoot.SESSION_STAGES)
 
 if __name__ == "__main__":
     run_shellos()
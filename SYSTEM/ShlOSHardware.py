@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+SYSTEM_DIR = os.path.dirname(os.path.abspath(__file__))
+HARDWARE_CACHE_FILE = os.path.join(SYSTEM_DIR, "cache", "hardware.json")
+
+# facts that only change if the machine itself changes, these get cached between boots.
+# the cpu frequency isn't one of them, it's the current clock and moves with load and power saving
+STATIC_KEYS = ("cpu_arch", "cpu_name", "cpu_cores", "ram_total")
+
+def machine_identity():
+    """Returns a short id for this machine, used to tell whether the hardware cache still applies."""
+    parts = [platform.node(), platform.system(), platform.release(), platform.machine()]
+    for path in ("/etc/machine-id", "/var/lib/dbus/machine-id"):
+        try:
+            with open(path, "r") as f:
+                parts.append(f.read().strip())
+            break
+        except OSError:
+            continue
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+def load_cached_static():
+    try:
+        with open(HARDWARE_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("identity") != machine_identity():
+        return None
+    static = cache.get("static", {})
+    if not all(key in static for key in STATIC_KEYS):
+        return None
+    return static
+
+def save_static(hardware):
+    """Remembers the static facts of a machine that passed verification."""
+    cache = {
+        "identity": machine_identity(),
+        "static": {key: hardware[key] for key in STATIC_KEYS},
+    }
+    try:
+        os.makedirs(os.path.dirname(HARDWARE_CACHE_FILE), exist_ok=True)
+        with open(HARDWARE_CACHE_FILE, "w") as f:
+            json.dump(cache, f, indent=4)
+    except OSError as e:
+        print(f"Warning: Could not save hardware cache: {e}")
+
+def _cpu_freq():
+    freq = psutil.cpu_freq()
+    return freq.current if freq else 0
+
+def _cpu_cores():
+    return psutil.cpu_count(logical=False) or psutil.cpu_count() or 0
+
+def probe_hardware():
+    """
+    Probes the hardware, running the independent probes at the same time.
+    Static facts come from the boot cache when it matches this machine; free RAM,
+    free storage and the CPU frequency are always read fresh. The result has "cached" set to True
+    when the static facts came from the cache and were already validated.
+    """
+    static = load_cached_static()
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        memory = pool.submit(psutil.virtual_memory)
+        storage = pool.submit(psutil.disk_usage, '/')
+        cpu_freq = pool.submit(_cpu_freq)
+        if static is None:
+            cpu_name = pool.submit(platform.processor)
+            cpu_cores = pool.submit(_cpu_cores)
+
+        memory = memory.result()
+        hardware = {
+            "ram_available": memory.available / (1024 ** 2),  # Convert to MB
+            "storage_free": storage.result().free / (1024 ** 2),  # Convert to MB
+        }
+
+        if static is None:
+            hardware.update({
+                "cpu_arch": platform.machine().lower(),
+                "cpu_name": cpu_name.result(),
+                "cpu_cores": cpu_cores.result(),
+                "ram_total": memory.total / (1024 ** 2),  # Convert to MB
+                "cached": False,
+            })
+        else:
+            hardware.update({key: static[key] for key in STATIC_KEYS})
+            hardware["cached"] = True
+        hardware["cpu_freq"] = cpu_freq.result()
+
+    return hardware
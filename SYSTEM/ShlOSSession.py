@@ -0,0 +1,163 @@
+import os
+import json
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+
+import ShlOSConfig
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# clearing the cache folder just means logging in again
+SESSION_FILE = os.path.join(script_dir, "cache", "session.token")
+KEY_FILE = os.path.join(script_dir, "cache", "session.key")
+
+# Keeps the logged-in user across shell restarts and crashes. The token is
+# base64(JSON).signature, signed with a key only this machine has, so editing the
+# user or the expiry in the file makes it invalid. Both files are readable by
+# their owner only (on windows that's up to the folder's ACLs).
+
+def write_private(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    # the mode above only applies if the file didn't exist already
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+def load_key():
+    try:
+        with open(KEY_FILE, "rb") as f:
+            key = f.read()
+        if len(key) >= 32:
+            return key
+    except FileNotFoundError:
+        pass
+    key = secrets.token_bytes(32)
+    write_private(KEY_FILE, key)
+    return key
+
+def sign(key, payload):
+    return hmac.new(key, payload, hashlib.sha256).hexdigest()
+
+def lifetime():
+    return ShlOSConfig.get_float("Session", "lifetime_hours", 12) * 3600
+
+def idle_lock():
+    return ShlOSConfig.get_float("Session", "idle_lock_minutes", 30) * 60
+
+def save(session):
+    """Writes session out. Returns False if it couldn't, the user then just logs in again next boot."""
+    payload = base64.urlsafe_b64encode(json.dumps(session).encode("utf-8"))
+    try:
+        # making or reading the key can fail the same way writing the token can
+        token = payload + b"." + sign(load_key(), payload).encode("ascii")
+        write_private(SESSION_FILE, token)
+    except OSError as e:
+        print(f"Warning: Could not save session: {e}")
+        return False
+    return True
+
+def issue(user):
+    """Starts a session for user after a successful login."""
+    if lifetime() <= 0:
+        return None
+    now = time.time()
+    session = {
+        "user": user,
+        "issued": now,
+        "expires": now + lifetime(),
+        "last_active": now,
+        "id": secrets.token_hex(16),
+    }
+    if not save(session):
+        return None
+    return session
+
+def load():
+    """The saved session if its signature checks out, None otherwise. Doesn't look at the clock."""
+    try:
+        with open(SESSION_FILE, "rb") as f:
+            token = f.read().strip()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"Warning: Could not read session: {e}")
+        return None
+
+    payload, _, signature = token.rpartition(b".")
+    try:
+        key = load_key()
+    except OSError:
+        return None
+    if not payload or not hmac.compare_digest(sign(key, payload), signature.decode("ascii", "replace")):
+        print("Warning: Saved session has a bad signature, ignoring it.")
+        end()
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except ValueError:
+        return None
+
+def lapsed(session, now=None):
+    """"expired" or "idle" if session can't be used any more, None while it's still good."""
+    now = now or time.time()
+    if now >= session["expires"]:
+        return "expired"
+    if idle_lock() > 0 and now - session["last_active"] > idle_lock():
+        return "idle"
+    return None
+
+def resume():
+    """Returns the user of a saved session that's still valid, or None if they have to log in."""
+    session = load()
+    if session is None:
+        return None
+
+    now = time.time()
+    reason = lapsed(session, now)
+    if reason == "expired":
+        print("Session expired, please log in again.")
+    elif reason == "idle":
+        print("Session locked after being idle, please log in again.")
+    if reason is not None:
+        end()
+        return None
+
+    session["last_active"] = now
+    save(session)
+    return session["user"]
+
+def check():
+    """
+    For the desktop, once a minute while it's up: ends the saved session if it
+    has expired or gone idle too long and returns (user, "expired" or "idle").
+    None while it's still good, or when there's no session at all.
+    """
+    session = load()
+    if session is None:
+        return None
+    reason = lapsed(session)
+    if reason is None:
+        return None
+    end()
+    return session["user"], reason
+
+def touch():
+    """Marks the current session as in use, so it doesn't lock while someone's at the desktop."""
+    session = load()
+    if session is None or time.time() >= session["expires"]:
+        return
+    session["last_active"] = time.time()
+    save(session)
+
+def end():
+    try:
+        os.remove(SESSION_FILE)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Warning: Could not remove session: {e}")
@@ -1,14 +1,12 @@
-import subprocess
 import os
-import time
 import sys
 import platform
-import psutil
 
 sys.path.append(os.path.join(os.getcwd(), 'SYSTEM'))
 
 # this tells the script what version of shellos this shit is
 from version import __version__  
+import ShlOSHardware
 
 def verify_os():
     os_release = platform.release()
@@ -45,47 +43,41 @@ def verify_hardware():
         print("Error: ShellOS requires Python Interpreter version 3.12.6 or later.")
         sys.exit(1)
 
-    cpu_name = platform.processor()
-    cpu_freq = psutil.cpu_freq().current if psutil.cpu_freq() else 0
-    cpu_cores = psutil.cpu_count(logical=False)
-
-    ram_total = psutil.virtual_memory().total / (1024 ** 2)  # Convert to MB
-    storage_info = psutil.disk_usage('/')
-    storage_free = storage_info.free / (1024 ** 2)  # Convert to MB
+    hardware = ShlOSHardware.probe_hardware()
 
     print("\nDetected Hardware:")
-    print(f"CPU: {cpu_name}")
+    print(f"CPU: {hardware['cpu_name']}")
     print(f"CPU Architecture: {cpu_arch}")
-    print(f"CPU Frequency: {cpu_freq:.2f} MHz")
-    print(f"CPU Cores: {cpu_cores}")
-    print(f"Total RAM: {ram_total:.2f} MB")
-    print(f"Free Storage on Primary Device: {storage_free:.2f} MB\n")
-
-    if cpu_freq < 300:
-        print("Error: CPU frequency must be at least 300 MHz.")
-        sys.exit(1)
-    if cpu_cores < 1:
-        print("Error: CPU must have at least 1 core.")
-        sys.exit(1)
-    if ram_total < 256:
-        print("Error: System RAM must be at least 256 MB.")
-        sys.exit(1)
-    if storage_free < 256:
+    print(f"CPU Frequency: {hardware['cpu_freq']:.2f} MHz")
+    print(f"CPU Cores: {hardware['cpu_cores']}")
+    print(f"Total RAM: {hardware['ram_total']:.2f} MB")
+    print(f"Available RAM: {hardware['ram_available']:.2f} MB")
+    print(f"Free Storage on Primary Device: {hardware['storage_free']:.2f} MB\n")
+
+    # static facts from the boot cache already passed these checks on an earlier boot
+    if not hardware["cached"]:
+        if hardware["cpu_freq"] < 300:
+            print("Error: CPU frequency must be at least 300 MHz.")
+            sys.exit(1)
+        if hardware["cpu_cores"] < 1:
+            print("Error: CPU must have at least 1 core.")
+            sys.exit(1)
+        if hardware["ram_total"] < 256:
+            print("Error: System RAM must be at least 256 MB.")
+            sys.exit(1)
+    if hardware["storage_free"] < 256:
         print("Error: Free storage must be at least 256 MB.")
         sys.exit(1)
 
+    if not hardware["cached"]:
+        ShlOSHardware.save_static(hardware)
+
     print("Hardware requirements met.\n")
 
 def main():
-    print(f"Starting ShellOS {__version__}")
-    time.sleep(2)
-
-    verify_os()
-    verify_hardware()
-
-    shellos_script = os.path.join(os.getcwd(), 'SYSTEM', 'ShlOSCore.py')
-    process = subprocess.Popen([sys.executable, shellos_script])
-    process.wait()
+    # the stages themselves live in ShlOSBoot so the whole boot stays in this process
+    import ShlOSBoot
+    ShlOSBoot.main()
 
 if __name__ == "__main__":
     main()
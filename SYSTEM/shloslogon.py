@@ -1,9 +1,11 @@
-import json
 import os
 import sys
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-ACCOUNTS_FILE = os.path.join(script_dir, "accounts.json")
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+import ShlOSAccounts
 
 def get_password(prompt='Password: '):
     password = ''
@@ -55,42 +57,27 @@ def get_password(prompt='Password: '):
 
     return password
 
-def load_accounts():
-    if not os.path.exists(ACCOUNTS_FILE):
-        return []
-    with open(ACCOUNTS_FILE, "r") as f:
-        return json.load(f)
-
-def save_accounts(accounts):
-    with open(ACCOUNTS_FILE, "w") as f:
-        json.dump(accounts, f, indent=4)
-
-def list_visible_accounts(accounts):
-    return [acct for acct in accounts if not acct.get("hidden", False)]
-
-def create_account():
+def create_account(store):
     print("\n--- Create New Account ---")
     name = input("Enter username: ").strip()
     password = get_password("Enter password: ").strip()
-    new_account = {
-        "name": name,
-        "password": password,
-        "hidden": False
-    }
-    accounts = load_accounts()
-    accounts.append(new_account)
-    save_accounts(accounts)
-    print(f"Account '{name}' created successfully.\n")
+    new_account = store.create(name, password)
+    if new_account is not None:
+        print(f"Account '{name}' created successfully.\n")
     return new_account
 
-def login_screen():
+def login_screen(store=None):
+    """Asks for an account and its password. Returns the name of the account that logged in."""
+    # loaded once, every change after this goes through the store's journal
+    if store is None:
+        store = ShlOSAccounts.AccountStore().load()
+
     while True:
-        accounts = load_accounts()
-        visible_accounts = list_visible_accounts(accounts)
+        visible_accounts = store.visible()
 
         if not visible_accounts:
             print("No accounts found.")
-            create_account()
+            create_account(store)
             continue
 
         print("\nAccount List:")
@@ -108,23 +95,26 @@ def login_screen():
         if 1 <= choice <= len(visible_accounts):
             selected_account = visible_accounts[choice - 1]
             password = get_password(f"Enter password for {selected_account['name']}: ").strip()
-            if password == selected_account["password"]:
+            if store.verify(selected_account["name"], password):
                 print(f"\nLogged in as {selected_account['name']}.\n")
-                return
+                return selected_account["name"]
             else:
                 print("Incorrect password. Try again.\n")
         elif choice == len(visible_accounts) + 1:
-            create_account()
+            create_account(store)
         else:
             print("Invalid choice. Try again.\n")
 
 def run_shell():
-    GUI = os.path.join(script_dir, "Graphical_Shell", "GraphicalShell.py")
-    GUI = os.path.abspath(GUI)
-    if os.path.exists(GUI):
-        os.system(f'python "{GUI}"')
-    else:
-        print(f"Error: {GUI} not found.")
+    GUI = os.path.join(script_dir, "Graphical_Shell")
+    if GUI not in sys.path:
+        sys.path.append(GUI)
+    try:
+        import GraphicalShell
+    except ImportError as e:
+        print(f"Error: Could not load the graphical shell: {e}")
+        return
+    GraphicalShell.main()
 
 if __name__ == "__main__":
     login_screen()
@@ -1,34 +1,113 @@
 import subprocess
 import sys
 import os
+import re
+import json
+import hashlib
+import importlib.util
+
+CACHE_DIR = os.path.join(os.getcwd(), 'SYSTEM', 'cache')
+REQUIREMENTS_STATE_FILE = os.path.join(CACHE_DIR, 'requirements.json')
+
+# pip names that don't match the module they end up installing
+MODULE_NAMES = {
+    "opencv-python": "cv2",
+    "pillow": "PIL",
+    "py-cpuinfo": "cpuinfo",
+    "pyqtwebengine": "PyQt5.QtWebEngineWidgets",
+}
+
+def read_requirements(requirements_file):
+    """Returns the requirement lines from requirements.txt, without comments or blanks."""
+    requirements = []
+    with open(requirements_file, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                requirements.append(line)
+    return requirements
+
+def package_name(requirement):
+    match = re.match(r"[A-Za-z0-9._-]+", requirement)
+    return match.group(0) if match else requirement
+
+def is_package_installed(requirement):
+    """Check if a requirement is importable without actually importing it."""
+    name = package_name(requirement)
+    module = MODULE_NAMES.get(name.lower(), name)
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+def requirements_fingerprint(requirements_file):
+    """Hashes requirements.txt together with the interpreter it gets installed into."""
+    digest = hashlib.sha256()
+    with open(requirements_file, 'rb') as f:
+        digest.update(f.read())
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    return digest.hexdigest()
+
+def load_requirements_state():
+    try:
+        with open(REQUIREMENTS_STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_requirements_state(fingerprint, requirements):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(REQUIREMENTS_STATE_FILE, 'w') as f:
+            json.dump({"fingerprint": fingerprint, "requirements": requirements}, f, indent=4)
+    except OSError as e:
+        print(f"Warning: Could not save requirements state: {e}")
 
 def install_requirements():
-    """Installs required packages from requirements.txt."""
+    """Installs required packages from requirements.txt, skipping pip when nothing changed."""
     requirements_file = os.path.join(os.getcwd(), 'requirements.txt')
     if os.path.isfile(requirements_file):
-        try:
-            print("Installing required packages...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", requirements_file])
-            print("All required packages installed successfully.")
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to install required packages: {e}")
-            sys.exit(1)
+        requirements = read_requirements(requirements_file)
+        fingerprint = requirements_fingerprint(requirements_file)
+        state = load_requirements_state()
+
+        to_install = [req for req in requirements if not is_package_installed(req)]
+        if state and state.get("fingerprint") != fingerprint:
+            # a changed line (e.g. a new version pin) needs pip even if the module imports
+            previous = set(state.get("requirements", []))
+            to_install += [req for req in requirements if req not in previous and req not in to_install]
+
+        if to_install:
+            try:
+                print(f"Installing required packages: {', '.join(to_install)}")
+                subprocess.check_call([sys.executable, "-m", "pip", "install"] + to_install)
+                print("All required packages installed successfully.")
+            except subprocess.CalledProcessError as e:
+                print(f"Failed to install required packages: {e}")
+                sys.exit(1)
+        else:
+            print("All required packages are already installed.")
+
+        if to_install or state.get("fingerprint") != fingerprint:
+            save_requirements_state(fingerprint, requirements)
     else:
         print("requirements.txt file not found.")
         sys.exit(1)
 
-    try:
-        print("Running ShlOSStart.py...")
-        shlos_start_path = os.path.join(os.getcwd(), 'SYSTEM', 'ShlOSStart.py')
-        if os.path.isfile(shlos_start_path):
-            subprocess.check_call([sys.executable, shlos_start_path])
-            print("ShlOSStart.py ran successfully.")
-        else:
-            print("ShlOSStart.py not found.")
-            sys.exit(1)
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to run ShlOSStart.py: {e}")
+def boot_shellos():
+    """Boots ShellOS in this interpreter instead of spawning ShlOSStart.py."""
+    system_path = os.path.join(os.getcwd(), 'SYSTEM')
+    if not os.path.isfile(os.path.join(system_path, 'ShlOSBoot.py')):
+        print("ShlOSBoot.py not found.")
         sys.exit(1)
+    if system_path not in sys.path:
+        sys.path.append(system_path)
+
+    # imported here so it runs after any packages it needs have been installed
+    import ShlOSBoot
+    ShlOSBoot.main()
 
 if __name__ == "__main__":
     install_requirements()
+    boot_shellos()
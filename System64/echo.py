@@ -1,10 +1,13 @@
 import sys
 
-def echo():
-    if len(sys.argv) > 1:
-        print(" ".join(sys.argv[1:]))
+def echo(args):
+    if len(args) > 0:
+        print(" ".join(args))
     else:
         print("Usage: python script.py [message]")
 
+def cmdlet(ctx):
+    echo(ctx.args)
+
 if __name__ == "__main__":
-    echo()
+    echo(sys.argv[1:])
@@ -0,0 +1,47 @@
+import re
+import sys
+
+def grep(regex, lines, invert=False):
+    """Prints the lines that match regex, a compiled pattern. Returns how many did."""
+    matched = 0
+    for line in lines:
+        if bool(regex.search(line)) != invert:
+            print(line.rstrip("\n"))
+            matched += 1
+    return matched
+
+def run(args, stdin, open_file):
+    flags = [arg for arg in args if arg in ("-i", "-v")]
+    rest = [arg for arg in args if arg not in ("-i", "-v")]
+    if not rest:
+        print("Usage: grep [-i] [-v] pattern [file ...]")
+        return 2
+    pattern, files = rest[0], rest[1:]
+    try:
+        regex = re.compile(pattern, re.IGNORECASE if "-i" in flags else 0)
+    except re.error as e:
+        # 2 like grep, so a typo in the pattern isn't mistaken for "nothing matched"
+        print(f"Error: Bad pattern '{pattern}': {e}", file=sys.stderr)
+        return 2
+    matched = 0
+    failed = False
+    if not files:
+        matched = grep(regex, stdin, "-v" in flags)
+    for name in files:
+        try:
+            with open_file(name) as f:
+                matched += grep(regex, f, "-v" in flags)
+        except OSError as e:
+            print(f"Error: Could not read '{name}': {e}", file=sys.stderr)
+            failed = True
+    # like grep, 0 means something matched, so it works with &&, and 2 means something
+    # went wrong, even if another file matched
+    if failed:
+        return 2
+    return 0 if matched else 1
+
+def cmdlet(ctx):
+    return run(ctx.args, ctx.stdin, lambda name: open(ctx.path(name), "r", encoding="utf-8", errors="replace"))
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:], sys.stdin, lambda name: open(name, "r", encoding="utf-8", errors="replace")))
@@ -1,8 +1,23 @@
-print("Commands")
-print("Help                  Displays this, Duh.")
-print("Sysfetch              Fetches Device Info.")
-print("About                 Displays Info about ShellOS.")
-print("Echo                  Prints text into the Terminal.")
-print("Ls                    Lists the contents of the current directory")
-print("Shl-Get Install       Installs a Package from either an offical ShellOS Repo or a Custom Link ")
-print("Shl-Get Uninstall     Uninstalls a Package")
\ No newline at end of file
+def show_help():
+    print("Commands")
+    print("Help                  Displays this, Duh.")
+    print("Sysfetch              Fetches Device Info.")
+    print("About                 Displays Info about ShellOS.")
+    print("Echo                  Prints text into the Terminal.")
+    print("Ls                    Lists the contents of the current directory")
+    print("Grep                  Shows the lines that match a pattern, from files or piped in")
+    print("Jobs                  Lists background jobs (Terminal only, end a command with & to start one)")
+    print("Fg / Bg               Brings a job back to the front, or lets a stopped one carry on in the background")
+    print("Kill                  Stops a job (%1) or a process (by PID)")
+    print("Rehash                Looks for new or removed commands (Terminal only)")
+    print("Hash                  Shows how often each command was run and lookup stats (Terminal only)")
+    print("Shl-Get Install       Installs a Package from either an offical ShellOS Repo or a Custom Link ")
+    print("Shl-Get Uninstall     Uninstalls a Package")
+    print("")
+    print("Commands can be chained: a | b pipes, > and >> write to a file, < reads one, ; and && run the next")
+
+def cmdlet(ctx):
+    show_help()
+
+if __name__ == "__main__":
+    show_help()
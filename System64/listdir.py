@@ -1,8 +1,15 @@
 import os
 
-# Get the list of files and directories in the current directory
-files_and_dirs = os.listdir()
+def list_dir(path="."):
+    # Get the list of files and directories in the directory
+    files_and_dirs = os.listdir(path)
 
-# Print the list
-for item in files_and_dirs:
-    print(item)
+    # Print the list
+    for item in files_and_dirs:
+        print(item)
+
+def cmdlet(ctx):
+    list_dir(ctx.cwd)
+
+if __name__ == "__main__":
+    list_dir()
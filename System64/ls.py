@@ -48,6 +48,11 @@ def list_directory_contents(path="."):
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def cmdlet(ctx):
+    # relative paths are relative to the Terminal's folder, not this process's
+    target_path = ctx.path(ctx.args[0]) if ctx.args else ctx.cwd
+    list_directory_contents(target_path)
+
 if __name__ == "__main__":
     # Check if a path argument was provided
     if len(sys.argv) > 1:
@@ -12,9 +12,6 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # So if SCRIPT_DIR is /path/to/ShellOS/System64, SHELLOS_ROOT will be /path/to/ShellOS
 SHELLOS_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
 
-print(f"ShellOS Root Directory: {SHELLOS_ROOT}")
-print(f"Script Directory: {SCRIPT_DIR}")
-
 # --- Helper Function for Path Validation ---
 def is_within_shellos(target_path: str) -> bool:
     """
@@ -119,6 +116,9 @@ def main():
         print("  python mk_rm_cmd.py rm file old_document.txt")
         sys.exit(1)
 
+    print(f"ShellOS Root Directory: {SHELLOS_ROOT}")
+    print(f"Script Directory: {SCRIPT_DIR}")
+
     command = sys.argv[1].lower()
     item_type = sys.argv[2].lower()
     path = sys.argv[3]
@@ -131,5 +131,25 @@ def main():
         print(f"Error: Unknown command '{command}'. Use 'mk' or 'rm'.")
         sys.exit(1)
 
+def cmdlet(ctx):
+    """Same as main(), with the arguments and current folder from the Terminal."""
+    if len(ctx.args) < 3:
+        print("Usage: mk <command> <type> <path>")
+        print("Commands: mk (make), rm (remove)")
+        print("Types: file, dir")
+        return 1
+
+    command = ctx.args[0].lower()
+    item_type = ctx.args[1].lower()
+    path = ctx.path(ctx.args[2])
+
+    if command == 'mk':
+        mk_command(item_type, path)
+    elif command == 'rm':
+        rm_command(item_type, path)
+    else:
+        print(f"Error: Unknown command '{command}'. Use 'mk' or 'rm'.")
+        return 1
+
 if __name__ == "__main__":
     main()
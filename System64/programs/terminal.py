@@ -1,11 +1,30 @@
 import os
+import re
 import sys
+import atexit
 import tkinter as tk
-from tkinter import scrolledtext
-import subprocess
+import queue
+import signal
 import threading
 import importlib.util
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "termlib"))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "SYSTEM")))
+from cmdlets import CmdletRuntime
+from output import OutputQueue, coalesce
+from resolver import CommandResolver
+from pipeline import PipelineRun, Stage
+from jobs import Job, JobOutput, JobTable
+from history import CommandHistory
+from view import TerminalView
+import cmdline
+import ShlOSConfig
+
+# handled by the Terminal itself, they change its own state
+BUILTINS = ("cd", "clear", "rehash", "hash", "jobs", "fg", "bg", "kill")
+# these wait on or manage other jobs, so they only work as a command of their own
+JOB_BUILTINS = ("jobs", "fg", "bg", "kill")
+
 class TerminalApp:
     def __init__(self, root):
         self.root = root
@@ -20,6 +39,33 @@ class TerminalApp:
             self.shellos_root = os.getcwd()
 
         self.cwd = self.shellos_root
+        # cmdlet-aware commands run in this process instead of a new interpreter each time
+        self.cmdlets = CmdletRuntime()
+        # ShellOS commands by name, searched in this order
+        self.resolver = CommandResolver([
+            os.path.join(self.shellos_root, "System64"),
+            os.path.join(self.shellos_root, "System64", "programs"),
+            os.path.join(self.shellos_root, "System64", "programs", "games"),
+        ])
+        # the Job Ctrl+C interrupts and Ctrl+Z stops
+        self.foreground = None
+        self.jobs = JobTable()
+        # lines entered while something is still running wait their turn here
+        self.commands = queue.Queue()
+
+        self.history = CommandHistory(
+            os.path.join(self.shellos_root, "SYSTEM", "cache", "terminal_history"),
+            max_entries=max(1, ShlOSConfig.get_int("Terminal", "history_size", 10000)),
+        )
+        # a long history takes a moment to index, the window doesn't wait for it
+        self.history.start_loading()
+        atexit.register(self.history.close)
+        # Up/Down walk through history_matches, the commands starting with what was typed
+        self.history_matches = None
+        self.history_prefix = ""
+        self.history_position = -1
+        # Ctrl+R state while a reverse search is going
+        self.search = None
 
         # --- New code to get the version ---
         self.shell_version = self.get_shellos_ver()
@@ -32,21 +78,35 @@ class TerminalApp:
         else:
             print(f"Warning: Icon file not found at {icon_path}")
 
-        self.terminal = scrolledtext.ScrolledText(
-            root, wrap=tk.WORD, bg="black", fg="white",
-            insertbackground="white", font=("Consolas", 12),
-            undo=True
-        )
-        self.terminal.pack(expand=True, fill=tk.BOTH)
+        # the widget only ever holds a screenful, the scrollback lives in the view's ring buffer
+        self.view = TerminalView(root, max(100, ShlOSConfig.get_int("Terminal", "scrollback_lines", 5000)), font=("Consolas", 12))
+        self.terminal = self.view.text
+        # only shown during Ctrl+R
+        self.search_label = tk.Label(root, bg="black", fg="white", anchor="w", font=("Consolas", 12))
 
         self.terminal.bind("<Return>", self.process_command)
         self.terminal.bind("<BackSpace>", self.prevent_backspace)
         self.terminal.bind("<Key>", self.prevent_edit_before_prompt)
+        self.terminal.bind("<Control-c>", self.interrupt_foreground)
+        self.terminal.bind("<Control-z>", self.suspend_foreground)
+        self.terminal.bind("<Up>", self.history_up)
+        self.terminal.bind("<Down>", self.history_down)
+        self.terminal.bind("<Control-r>", self.reverse_search)
+        self.terminal.bind("<Tab>", self.complete_command)
+        self.terminal.bind("<<Paste>>", lambda event: self.view.remember_input("replace"))
+        self.terminal.bind("<<Cut>>", lambda event: self.view.remember_input("replace"))
 
         self.terminal.tag_config("prompt", foreground="white")
+        self.terminal.tag_config("shlos_purple", foreground="#b57edc")
+        self.prompt_shown = False
+
+        # worker threads never touch the widget, they queue output and the UI thread
+        # writes it in blocks every drain_interval ms
+        self.output = OutputQueue(root, self.write_batch, interval_ms=max(1, ShlOSConfig.get_int("Terminal", "drain_interval", 16)))
 
         self.display_banner()
         self.insert_prompt()
+        threading.Thread(target=self.command_loop, daemon=True).start()
 
     def get_shellos_ver(self):
         version_file_path = os.path.join(self.shellos_root, "SYSTEM", "version.py")
@@ -59,8 +119,8 @@ class TerminalApp:
 
     def display_banner(self):
         banner_text = f"ShellOS {self.shell_version}\n"
-        self.terminal.insert(tk.END, banner_text)
-        self.terminal.insert(tk.END, "\n")
+        self.view.write(banner_text)
+        self.view.write("\n")
 
     def resolve_path(self, relative_path):
         if hasattr(self, 'shellos_root') and self.shellos_root:
@@ -73,85 +133,448 @@ class TerminalApp:
 
     def insert_prompt(self):
         prompt = f"{self.cwd}>"
+        # anything typed ahead but not entered yet goes back after the prompt
+        typed = self.terminal.get("live_start", "end-1c")
+        self.terminal.delete("live_start", tk.END)
         self.terminal.insert(tk.END, prompt, "prompt")
+        # a mark rather than a fixed index, so it stays put when the view redraws above it
+        self.terminal.mark_set("prompt_end", "end-1c")
+        self.terminal.mark_gravity("prompt_end", tk.LEFT)
+        self.prompt_index = "prompt_end"
+        self.terminal.insert(tk.END, typed)
         self.terminal.mark_set("insert", tk.END)
-        self.prompt_index = self.terminal.index("insert")
+        self.prompt_shown = True
+        self.view.follow()
+        self.terminal.see(tk.END)
 
-    def process_command(self, event):
-        line_start = self.terminal.index("insert linestart")
-        line_end = self.terminal.index("insert lineend")
-        line_text = self.terminal.get(line_start, line_end).strip()
+    def commit_input(self, suffix=""):
+        """Moves the prompt line into the scrollback, once it's been entered or interrupted."""
+        self.view.commit_live(suffix)
+        self.terminal.mark_set("prompt_end", "live_start")
+        self.prompt_shown = False
 
-        if ">" in line_text:
-            command_text = line_text.split(">", 1)[-1].strip()
+    # --- output from worker threads ---
+
+    def emit(self, text, tag=None):
+        self.output.put("text", text, tag)
+
+    def emit_line(self, line):
+        # >>label: lines need their own tags, everything else can be merged into one insert
+        if line.startswith(">>"):
+            self.output.put("colored", line)
         else:
-            command_text = line_text.strip()
+            self.output.put("text", line)
+
+    def emit_call(self, func):
+        """Runs func on the UI thread once everything queued before it has been written."""
+        self.output.put("call", func)
+
+    def finish_command(self):
+        # background jobs that ended since the last prompt, like a shell reports them
+        for job in self.jobs.reap():
+            self.emit(job.describe() + "\n")
+        self.emit_call(self.insert_prompt)
+
+    def write_batch(self, batch):
+        for kind, payload, tag in coalesce(batch):
+            if kind == "text":
+                self.view.write(payload, tag)
+            elif kind == "colored":
+                self.insert_colored_line(payload)
+            else:
+                payload()
+        self.view.render()
 
-        self.terminal.insert(tk.END, "\n")
-        threading.Thread(target=self.execute_command, args=(command_text,), daemon=True).start()
+    def process_command(self, event):
+        self.end_search()
+        self.history_matches = None
+        # prompt_end is where input starts, with or without a prompt in front (typed
+        # while the last command was still running)
+        command_text = self.terminal.get(self.prompt_index, "end-1c").strip()
+
+        self.commit_input()
+        self.history.add(command_text)
+        self.commands.put(command_text)
         return "break"
 
     def prevent_backspace(self, event):
+        if self.search is not None:
+            self.search["query"] = self.search["query"][:-1]
+            self.update_search()
+            return "break"
+        self.history_matches = None
         if self.terminal.compare("insert", "<=", self.prompt_index):
             return "break"
+        self.view.remember_input("delete")
         return None
 
+    def interrupt_foreground(self, event):
+        # with text selected Ctrl+C is still copy
+        if self.terminal.tag_ranges("sel"):
+            return None
+        if self.search is not None:
+            self.end_search(cancel=True)
+            return "break"
+        foreground = self.foreground
+        self.commit_input("^C")
+        if foreground is None:
+            self.insert_prompt()
+        else:
+            foreground.interrupt()
+        return "break"
+
+    def suspend_foreground(self, event):
+        foreground = self.foreground
+        # nothing running, Ctrl+Z is undo for the input line
+        if foreground is None:
+            self.view.undo_input()
+            return "break"
+        self.commit_input("^Z")
+        foreground.stop()
+        return "break"
+
     def prevent_edit_before_prompt(self, event):
+        if self.search is not None:
+            return self.search_key(event)
+        self.history_matches = None
+        if event.char:
+            self.view.follow()
+            # the lines above the live region are redrawn all the time, typing goes on the input line
+            if self.terminal.compare("insert", "<", "live_start"):
+                self.terminal.mark_set("insert", tk.END)
         if event.keysym in ("Left", "BackSpace") and self.terminal.compare("insert", "<=", self.prompt_index):
             return "break"
+        if event.keysym == "Delete":
+            self.view.remember_input("delete")
+        elif event.char and event.char.isprintable():
+            self.view.remember_input("space" if event.char.isspace() else "type")
         return None
 
-    def execute_command(self, command_text):
-        parts = command_text.split()
-        command = parts[0].lower() if parts else ""
-        args = parts[1:]
+    # --- history and completion ---
 
-        if command == "cd":
-            self.root.after(0, lambda: self.change_directory(args))
-            self.root.after(0, self.insert_prompt)
-            return
-        elif command == "clear":
-            self.root.after(0, lambda: self.terminal.delete("1.0", tk.END))
-            self.root.after(0, self.insert_prompt)
+    def at_prompt(self):
+        """True when the cursor is on the prompt line and nothing has been printed below it."""
+        return self.prompt_shown and (self.terminal.compare("insert linestart", "==", f"{self.prompt_index} linestart")
+                and self.terminal.compare(f"{self.prompt_index} linestart", "==", "end-1c linestart"))
+
+    def get_input(self):
+        return self.terminal.get(self.prompt_index, "end-1c")
+
+    def set_input(self, text):
+        self.view.remember_input("replace")
+        self.terminal.delete(self.prompt_index, "end-1c")
+        self.terminal.insert(tk.END, text)
+        self.terminal.mark_set("insert", tk.END)
+        self.view.follow()
+        self.terminal.see(tk.END)
+
+    def history_up(self, event):
+        if not self.at_prompt():
+            return None
+        self.end_search()
+        if self.history_matches is None:
+            self.history_prefix = self.get_input()
+            self.history_matches = self.history.prefix_matches(self.history_prefix)
+            self.history_position = -1
+        if self.history_position + 1 < len(self.history_matches):
+            self.history_position += 1
+            self.set_input(self.history_matches[self.history_position])
+        else:
+            self.terminal.bell()
+        return "break"
+
+    def history_down(self, event):
+        if not self.at_prompt():
+            return None
+        self.end_search()
+        if self.history_matches is None:
+            return "break"
+        if self.history_position > 0:
+            self.history_position -= 1
+            self.set_input(self.history_matches[self.history_position])
+        else:
+            self.history_position = -1
+            self.set_input(self.history_prefix)
+        return "break"
+
+    def reverse_search(self, event):
+        if not self.at_prompt():
+            return "break"
+        if self.search is None:
+            self.history_matches = None
+            self.search = {"query": "", "seq": None, "original": self.get_input()}
+            self.search_label.pack(side=tk.BOTTOM, fill=tk.X, before=self.view.scrollbar)
+            self.update_search()
+        else:
+            # Ctrl+R again, the next older match
+            self.update_search(older=True)
+        return "break"
+
+    def update_search(self, older=False):
+        search = self.search
+        found = None
+        if search["query"]:
+            if older or search["seq"] is None:
+                before = search["seq"]
+            else:
+                # typing more keeps the current match if it still fits
+                before = search["seq"] + 1
+            found = self.history.search(search["query"], before)
+        if found is not None:
+            search["seq"], text = found
+            self.set_input(text)
+        elif not search["query"]:
+            search["seq"] = None
+            self.set_input(search["original"])
+        failed = search["query"] and found is None
+        self.search_label.config(text=f"({'failed ' if failed else ''}reverse-i-search)`{search['query']}'")
+
+    def search_key(self, event):
+        if event.char == "\x07":
+            # Ctrl+G, like readline
+            self.end_search(cancel=True)
+            return "break"
+        if event.keysym == "Escape":
+            self.end_search()
+            return "break"
+        if event.keysym in ("Left", "Right", "Home", "End"):
+            self.end_search()
+            return None
+        if len(event.char) == 1 and event.char.isprintable():
+            self.search["query"] += event.char
+            self.update_search()
+        return "break"
+
+    def end_search(self, cancel=False):
+        """Leaves Ctrl+R, keeping the match in the input (or putting back what was there with cancel)."""
+        if self.search is None:
             return
+        if cancel:
+            self.set_input(self.search["original"])
+        self.search = None
+        self.search_label.pack_forget()
+
+    def complete_command(self, event):
+        if not self.at_prompt():
+            return "break"
+        self.end_search()
+        self.history_matches = None
+        before = self.terminal.get(self.prompt_index, "insert")
+        word = re.split(r"[\s|;&<>]", before)[-1]
+        head = before[:len(before) - len(word)].rstrip()
+        # only command names are completed, from the same table commands are run from
+        if head and head[-1] not in "|;&":
+            return "break"
+        matches = [name for name in sorted(set(self.resolver.names()) | set(BUILTINS)) if name.startswith(word.lower())]
+        if not matches:
+            self.terminal.bell()
+        elif len(matches) == 1:
+            self.terminal.insert("insert", matches[0][len(word):] + " ")
         else:
-            command_found_and_executed = False
-
-            # --- MODIFIED CODE START ---
-            shellos_executable_dirs = [
-                os.path.join(self.shellos_root, "System64"),
-                os.path.join(self.shellos_root, "System64", "Programs"),
-                os.path.join(self.shellos_root, "System64", "Programs", "games"), # Added this line
-                os.path.join(self.shellos_root, "System64", "Cmdlets")
-            ]
-            # --- MODIFIED CODE END ---
-
-            for directory in shellos_executable_dirs:
-                possible_py_file = os.path.join(directory, command + ".py")
-                if os.path.isfile(possible_py_file):
-                    self.run_file(possible_py_file, args)
-                    command_found_and_executed = True
-                    break
-
-            if command_found_and_executed:
-                return
+            common = os.path.commonprefix(matches)
+            if len(common) > len(word):
+                self.terminal.insert("insert", common[len(word):])
+            else:
+                # nothing more in common, list them and give the line back under a new prompt
+                current = self.get_input()
+                self.commit_input()
+                self.view.write("  ".join(matches) + "\n")
+                self.insert_prompt()
+                self.set_input(current)
+        return "break"
 
+    def command_loop(self):
+        # one command line at a time, in the order they were entered, so a prompt
+        # never turns up in the middle of the previous command's output
+        while True:
+            command_text = self.commands.get()
             try:
-                process = subprocess.Popen(
-                    command_text, shell=True, cwd=self.cwd,
-                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
-                    env=os.environ
-                )
-                for line in process.stdout:
-                    self.root.after(0, lambda line=line: self.insert_colored_line(line))
-                process.wait()
+                self.execute_command(command_text)
             except Exception as e:
-                self.root.after(0, lambda: self.terminal.insert(tk.END, f"Shell error: {str(e)}\n"))
-            finally:
-                self.root.after(0, self.insert_prompt)
-                self.root.after(0, lambda: self.terminal.see(tk.END))
+                self.emit(f"Error: {str(e)}\n")
+            self.finish_command()
+
+    def is_shellos_command(self, name):
+        return name.lower() in BUILTINS or self.resolver.lookup(name, record=False) is not None
+
+    def execute_command(self, command_text):
+        try:
+            pipelines = cmdline.parse(command_text)
+        except cmdline.ParseError as e:
+            words = command_text.split()
+            if words and self.is_shellos_command(words[0]):
+                self.emit(f"Error: {e}\n")
+            else:
+                # not one of ours, the host shell may well understand it
+                self.run_host_shell(command_text)
+            return
+        if not pipelines:
+            return
 
-    def change_directory(self, args):
+        # a line with no ShellOS commands in it goes to the host shell untouched and
+        # keeps its own syntax ($VARS, 2>&1, ...), unless it wants a job of ours
+        if not any(pipeline.background for pipeline in pipelines) and not any(
+                self.is_shellos_command(command.argv[0]) for pipeline in pipelines for command in pipeline.commands):
+            self.run_host_shell(command_text)
+            return
+
+        for part in self.split_parts(pipelines):
+            command = part[0].commands[0]
+            name = command.argv[0].lower()
+            if (len(part) == 1 and len(part[0].commands) == 1 and not part[0].background
+                    and name in BUILTINS and command.stdin is None and command.stdout is None):
+                # on its own, a builtin runs right here; fg/bg/jobs/kill have to
+                output = JobOutput(self.emit_line)
+                self.run_builtin(name, command.argv[1:], output)
+                output.close()
+                continue
+
+            job = Job(cmdline.unparse(part), JobOutput(self.emit_line), background=part[0].background)
+            job.start(lambda job, part=part: self.run_part(job, part))
+            if job.background:
+                self.jobs.add(job)
+                self.emit(f"[{job.id}] {job.text}\n")
+            else:
+                self.wait_job(job)
+
+    def split_parts(self, pipelines):
+        """Splits the line at ; and &, each part becomes one job."""
+        parts = []
+        for pipeline in pipelines:
+            if not parts or pipeline.connector != "&&":
+                parts.append([])
+            parts[-1].append(pipeline)
+        return parts
+
+    def run_host_shell(self, command_text):
+        output = JobOutput(self.emit_line)
+        job = Job(command_text, output)
+        job.start(lambda job: self.run_stages(job, [Stage("shell", command_text, on_stderr=output.write)]))
+        self.wait_job(job)
+
+    def wait_job(self, job):
+        """Waits for a foreground job, or until Ctrl+Z sends it to the background."""
+        self.foreground = job
+        try:
+            finished = job.wait_foreground()
+        finally:
+            self.foreground = None
+        if finished:
+            self.jobs.discard(job)
+        else:
+            self.jobs.add(job)
+            self.emit(job.describe() + "\n")
+        return job.status or 0
+
+    def run_part(self, job, part):
+        """Runs on the job's thread."""
+        status = 0
+        for pipeline in part:
+            job.wait_while_stopped()
+            if job.killed:
+                return 130
+            if pipeline.connector == "&&" and status != 0:
+                continue
+            stages = [self.resolve_stage(command, job.output) for command in pipeline.commands]
+            if stages[0].kind != "builtin":
+                status = self.run_stages(job, stages)
+            elif len(stages) > 1 or stages[0].stdin_path or stages[0].stdout_path:
+                job.output.write(f"Error: {stages[0].target} can't be piped or redirected\n")
+                status = 1
+            elif stages[0].target in JOB_BUILTINS:
+                job.output.write(f"Error: {stages[0].target} can only be used on its own\n")
+                status = 1
+            else:
+                status = self.run_builtin(stages[0].target, stages[0].args, job.output)
+        return status
+
+    def resolve_stage(self, command, output):
+        name = command.argv[0]
+        args = command.argv[1:]
+        redirects = dict(stdin_path=command.stdin, stdout_path=command.stdout, append=command.append)
+        if name.lower() in BUILTINS:
+            return Stage("builtin", name.lower(), args, **redirects)
+
+        path = self.resolver.lookup(name)
+        if path is None:
+            return Stage("shell", cmdline.shell_join(command.argv, sys.platform == "win32"), on_stderr=output.write, **redirects)
+        if path.endswith(".py"):
+            if self.cmdlets.kind(path) == "cmdlet":
+                return Stage("cmdlet", path, args, on_stderr=output.write, **redirects)
+            target = [sys.executable, path]
+        elif path.endswith(".bat"):
+            target = [path]
+        else:
+            target = ["bash", path]
+        return Stage("process", target, args, on_stderr=output.error, **redirects)
+
+    def run_stages(self, job, stages):
+        # no time limit, output shows up as it's printed and Ctrl+C stops it
+        try:
+            return job.run_pipeline(PipelineRun(stages, self.cwd, self.cmdlets, job.output.write))
+        except OSError as e:
+            job.output.error(f"{e}\n")
+            return 1
+
+    def run_builtin(self, name, args, output):
+        if name == "cd":
+            return 0 if self.change_directory(args, output) else 1
+        elif name == "clear":
+            self.emit_call(self.view.clear)
+        elif name == "rehash":
+            count = self.resolver.rehash()
+            output.write(f"{count} commands in {len(self.resolver.directories)} directories\n")
+        elif name == "hash":
+            self.show_hash_table(output)
+        elif name == "jobs":
+            for job in self.jobs.list():
+                output.write(job.describe() + "\n")
+                if job.state == "done":
+                    self.jobs.discard(job)
+        elif name in ("fg", "bg"):
+            job = self.jobs.get(args[0] if args else None)
+            if job is None:
+                output.write(f"{name}: no such job\n")
+                return 1
+            job.resume()
+            if name == "bg":
+                output.write(f"[{job.id}] {job.text} &\n")
+                return 0
+            output.write(job.text + "\n")
+            output.close()
+            return self.wait_job(job)
+        elif name == "kill":
+            return self.kill(args, output)
+        return 0
+
+    def kill(self, args, output):
+        if not args:
+            output.write("Usage: kill %job|pid ...\n")
+            return 2
+        status = 0
+        for arg in args:
+            if arg.startswith("%"):
+                job = self.jobs.get(arg)
+                if job is None:
+                    output.write(f"kill: {arg}: no such job\n")
+                    status = 1
+                else:
+                    job.kill()
+                continue
+            try:
+                os.kill(int(arg), signal.SIGTERM)
+            except (ValueError, OSError) as e:
+                output.write(f"kill: {arg}: {e}\n")
+                status = 1
+        return status
+
+    def show_hash_table(self, output):
+        for name, count in sorted(self.resolver.hits.items()):
+            output.write(f"{count:>6}  {name:<16}{self.resolver.table.get(name, '')}\n")
+        stats = self.resolver.stats()
+        output.write(f"{stats['commands']} commands, {stats['hits']} hits, {stats['misses']} misses, {stats['rebuilds']} rebuilds\n")
+
+    def change_directory(self, args, output):
         if not args:
             self.cwd = os.path.expanduser("~")
         else:
@@ -159,58 +582,19 @@ class TerminalApp:
             if os.path.isdir(new_path):
                 self.cwd = new_path
             else:
-                self.terminal.insert(tk.END, f"cd: no such directory: {new_path}\n")
+                output.write(f"cd: no such directory: {new_path}\n")
+                return False
+        return True
 
     def insert_colored_line(self, line):
         if line.startswith(">>"):
             parts = line[2:].split(":", 1)
             if len(parts) == 2:
                 label, value = parts
-                self.terminal.insert(tk.END, f"{label.strip()}:", "shlos_purple")
-                self.terminal.insert(tk.END, f"{value}\n")
+                self.view.write(f"{label.strip()}:", "shlos_purple")
+                self.view.write(f"{value}\n")
                 return
-        self.terminal.insert(tk.END, line)
-
-    def run_file(self, file_path, args):
-        if not os.path.isfile(file_path):
-            self.root.after(0, lambda: self.terminal.insert(tk.END, f"Error: File '{file_path}' not found.\n"))
-            self.root.after(0, self.insert_prompt)
-            return
-
-        def task():
-            try:
-                if file_path.endswith(".py"):
-                    cmd = [sys.executable, file_path] + args
-                elif sys.platform == "win32" and file_path.endswith(".bat"):
-                    cmd = [file_path] + args
-                elif not sys.platform == "win32" and file_path.endswith(".sh"):
-                    cmd = ["bash", file_path] + args
-                else:
-                    self.root.after(0, lambda: self.terminal.insert(tk.END, "Error: Unsupported file type or platform mismatch.\n"))
-                    self.root.after(0, self.insert_prompt)
-                    return
-
-                result = subprocess.run(
-                    cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                    text=True, cwd=self.cwd, shell=False, timeout=60,
-                    env=os.environ
-                )
-
-                if result.stdout:
-                    for line in result.stdout.splitlines():
-                        self.root.after(0, lambda line=line: self.insert_colored_line(line + "\n"))
-                if result.stderr:
-                    self.root.after(0, lambda: self.terminal.insert(tk.END, f"Error: {result.stderr}\n"))
-
-            except subprocess.TimeoutExpired:
-                self.root.after(0, lambda: self.terminal.insert(tk.END, "Error: Process timed out.\n"))
-            except Exception as e:
-                self.root.after(0, lambda: self.terminal.insert(tk.END, f"Error: {str(e)}\n"))
-
-            self.root.after(0, self.insert_prompt)
-            self.root.after(0, lambda: self.terminal.see(tk.END))
-
-        threading.Thread(target=task, daemon=True).start()
+        self.view.write(line)
 
 if __name__ == "__main__":
     root = tk.Tk()
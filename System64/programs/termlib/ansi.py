@@ -0,0 +1,155 @@
+import re
+
+# Turns text with ANSI escape codes in it into (text, tags) runs for the Terminal
+# view. Only SGR (ESC[...m: colours, bold, underline, inverse) means anything here,
+# every other escape sequence is dropped so it doesn't show up as garbage.
+
+DEFAULT_FG = "#ffffff"
+DEFAULT_BG = "#000000"
+
+# the 16 basic colours, normal then bright
+BASE_COLORS = [
+    "#000000", "#cd3131", "#0dbc79", "#e5e510", "#2472c8", "#bc3fbc", "#11a8cd", "#e5e5e5",
+    "#666666", "#f14c4c", "#23d18b", "#f5f543", "#3b8eea", "#d670d6", "#29b8db", "#ffffff",
+]
+
+def xterm_color(index):
+    """The hex colour for an entry of the 256 colour palette."""
+    if index < 16:
+        return BASE_COLORS[index]
+    if index < 232:
+        index -= 16
+        levels = (0, 95, 135, 175, 215, 255)
+        r, g, b = levels[index // 36], levels[index // 6 % 6], levels[index % 6]
+        return f"#{r:02x}{g:02x}{b:02x}"
+    gray = 8 + (index - 232) * 10
+    return f"#{gray:02x}{gray:02x}{gray:02x}"
+
+# CSI (ESC [ params final), OSC (ESC ] ... BEL or ESC \), charset selection
+# (ESC ( B and friends, tput sgr0 sends one) and the two-character escapes
+ESCAPE = re.compile(r"\x1b(?:\[([0-9;:?<=>]*)[ -/]*([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()*+][ -~]|[ -Z\\-~])")
+# the start of one of those, at the very end of a chunk
+PARTIAL = re.compile(r"\x1b(?:\[[0-9;:?<=>]*[ -/]*|\][^\x07\x1b]{0,256}|[()*+])?$")
+# control characters that don't print. tab and newline are kept, and carriage
+# return too, the view uses it to write over the current line
+CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1a\x1c-\x1f\x7f]")
+
+class AnsiParser:
+    """
+    Keeps the current SGR state between calls, so a colour set on one line
+    carries on to the next like in a real terminal, and holds on to an escape
+    sequence that got cut off at the end of a chunk until the rest arrives.
+    """
+
+    def __init__(self):
+        self.reset()
+        self.pending = ""
+
+    def reset(self):
+        self.fg = None
+        self.bg = None
+        self.bold = False
+        self.underline = False
+        self.inverse = False
+        self.tags = ()
+
+    def update_tags(self):
+        fg, bg = self.fg, self.bg
+        if self.inverse:
+            fg, bg = (bg or DEFAULT_BG), (fg or DEFAULT_FG)
+        tags = []
+        if fg:
+            tags.append("ansi_fg_" + fg)
+        if bg:
+            tags.append("ansi_bg_" + bg)
+        if self.bold:
+            tags.append("ansi_bold")
+        if self.underline:
+            tags.append("ansi_underline")
+        self.tags = tuple(tags)
+
+    def feed(self, text):
+        """Returns the runs for text, a list of (text, tags) with tags a tuple of tag names."""
+        if self.pending:
+            text, self.pending = self.pending + text, ""
+        if "\x1b" not in text:
+            if CONTROL.search(text):
+                text = CONTROL.sub("", text)
+            return [(text, self.tags)] if text else []
+
+        # an escape sequence that got cut off is finished by the next chunk
+        cut = text.rfind("\x1b")
+        if PARTIAL.match(text, cut):
+            text, self.pending = text[:cut], text[cut:]
+
+        runs = []
+        position = 0
+        for match in ESCAPE.finditer(text):
+            if match.start() > position:
+                self.add_run(runs, text[position:match.start()])
+            position = match.end()
+            if match.group(2) == "m":
+                self.apply(match.group(1))
+        if position < len(text):
+            self.add_run(runs, text[position:])
+        return runs
+
+    def add_run(self, runs, text):
+        text = CONTROL.sub("", text.replace("\x1b", ""))
+        if not text:
+            return
+        if runs and runs[-1][1] == self.tags:
+            runs[-1] = (runs[-1][0] + text, self.tags)
+        else:
+            runs.append((text, self.tags))
+
+    def apply(self, params):
+        codes = [int(code) if code.isdigit() else 0 for code in re.split("[;:]", params)] if params else [0]
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code == 0:
+                self.reset()
+            elif code == 1:
+                self.bold = True
+            elif code == 22:
+                self.bold = False
+            elif code == 4:
+                self.underline = True
+            elif code == 24:
+                self.underline = False
+            elif code == 7:
+                self.inverse = True
+            elif code == 27:
+                self.inverse = False
+            elif 30 <= code <= 37:
+                self.fg = BASE_COLORS[code - 30]
+            elif 90 <= code <= 97:
+                self.fg = BASE_COLORS[code - 90 + 8]
+            elif code == 39:
+                self.fg = None
+            elif 40 <= code <= 47:
+                self.bg = BASE_COLORS[code - 40]
+            elif 100 <= code <= 107:
+                self.bg = BASE_COLORS[code - 100 + 8]
+            elif code == 49:
+                self.bg = None
+            elif code in (38, 48):
+                color, used = self.extended_color(codes[i + 1:])
+                if color is not None:
+                    if code == 38:
+                        self.fg = color
+                    else:
+                        self.bg = color
+                i += used
+            i += 1
+        self.update_tags()
+
+    def extended_color(self, rest):
+        """38;5;n and 38;2;r;g;b. Returns (colour, how many codes it used)."""
+        if len(rest) >= 2 and rest[0] == 5:
+            return xterm_color(min(rest[1], 255)), 2
+        if len(rest) >= 4 and rest[0] == 2:
+            r, g, b = (min(value, 255) for value in rest[1:4])
+            return f"#{r:02x}{g:02x}{b:02x}", 4
+        return None, len(rest)
@@ -0,0 +1,196 @@
+import io
+import os
+import re
+import sys
+import threading
+import traceback
+import importlib.util
+
+# A cmdlet is a ShellOS command script that defines a top level
+#
+#     def cmdlet(ctx):
+#         ...
+#
+# The Terminal imports it once and calls cmdlet() on a worker thread instead of
+# starting a new interpreter for every run. print() and input() inside it go to
+# ctx.stdout / ctx.stdin. Anything else the script does at import time still
+# happens, so keep the rest under if __name__ == "__main__".
+#
+# A cmdlet that's heavy or does things that would hurt the Terminal (os.chdir,
+# GUI toolkits, long blocking C calls) can set CMDLET_ISOLATED = True to keep
+# getting its own process.
+
+CMDLET_PATTERN = re.compile(r"^def cmdlet\(", re.MULTILINE)
+ISOLATED_PATTERN = re.compile(r"^CMDLET_ISOLATED\s*=\s*True", re.MULTILINE)
+
+class ThreadRouter(io.TextIOBase):
+    """
+    Stands in for sys.stdout/stderr/stdin. Each thread can point it at its own
+    stream, threads that didn't fall through to the original one.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def set(self, stream):
+        self.local.stream = stream
+
+    def target(self):
+        return getattr(self.local, "stream", None) or self.fallback
+
+    def write(self, text):
+        return self.target().write(text)
+
+    def flush(self):
+        self.target().flush()
+
+    def read(self, size=-1):
+        return self.target().read(size)
+
+    def readline(self, size=-1):
+        return self.target().readline(size)
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    @property
+    def encoding(self):
+        return getattr(self.fallback, "encoding", "utf-8")
+
+class LineWriter(io.TextIOBase):
+    """A text stream that hands every complete line to on_line. What's left over goes out on flush()/close()."""
+
+    def __init__(self, on_line):
+        self.on_line = on_line
+        self.pending = ""
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            self.pending += text
+            *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.on_line(line + "\n")
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            rest, self.pending = self.pending, ""
+        if rest:
+            self.on_line(rest)
+
+    def close(self):
+        self.flush()
+        super().close()
+
+    def writable(self):
+        return True
+
+class CmdletContext:
+    """What a cmdlet gets called with."""
+
+    def __init__(self, args, cwd, stdin=None, stdout=None, stderr=None, env=None):
+        self.args = list(args)
+        self.cwd = cwd
+        self.stdin = stdin if stdin is not None else io.StringIO()
+        self.stdout = stdout if stdout is not None else sys.__stdout__
+        self.stderr = stderr if stderr is not None else sys.__stderr__
+        self.env = env if env is not None else dict(os.environ)
+
+    def path(self, path):
+        """path resolved against the Terminal's current folder, since the process's own cwd isn't it."""
+        return os.path.abspath(os.path.join(self.cwd, os.path.expanduser(path)))
+
+class CmdletRuntime:
+    """Loads cmdlet modules once, reloading one only when its file changes, and runs them in-process."""
+
+    def __init__(self):
+        self.modules = {}
+        self.kinds = {}
+        self.lock = threading.Lock()
+        self.stdout = self.install("stdout")
+        self.stderr = self.install("stderr")
+        self.stdin = self.install("stdin")
+
+    def install(self, name):
+        current = getattr(sys, name)
+        if not isinstance(current, ThreadRouter):
+            current = ThreadRouter(current)
+            setattr(sys, name, current)
+        return current
+
+    def kind(self, path):
+        """"cmdlet", "isolated" (a cmdlet that wants its own process) or "script". Judged from the source, not by importing it."""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return "script"
+        cached = self.kinds.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                source = f.read(256 * 1024)
+        except OSError:
+            return "script"
+        if not CMDLET_PATTERN.search(source):
+            kind = "script"
+        elif ISOLATED_PATTERN.search(source):
+            kind = "isolated"
+        else:
+            kind = "cmdlet"
+        self.kinds[path] = (mtime, kind)
+        return kind
+
+    def load(self, path):
+        mtime = os.path.getmtime(path)
+        with self.lock:
+            cached = self.modules.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            name = "shellos_cmdlet_" + re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.modules[path] = (mtime, module)
+            return module
+
+    def run(self, path, ctx):
+        """Runs the cmdlet at path on the calling thread. Returns its exit code."""
+        self.stdout.set(ctx.stdout)
+        self.stderr.set(ctx.stderr)
+        self.stdin.set(ctx.stdin)
+        try:
+            module = self.load(path)
+            result = module.cmdlet(ctx)
+            return result if isinstance(result, int) else 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code, file=ctx.stderr)
+            return 1
+        except KeyboardInterrupt:
+            return 130
+        except BrokenPipeError:
+            # whatever it was writing to stopped reading, same as SIGPIPE in a real shell
+            return 1
+        except Exception:
+            traceback.print_exc(file=ctx.stderr)
+            return 1
+        finally:
+            for stream in (ctx.stdout, ctx.stderr):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+            self.stdout.set(None)
+            self.stderr.set(None)
+            self.stdin.set(None)
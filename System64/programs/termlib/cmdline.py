@@ -0,0 +1,189 @@
+# the Terminal's little command language:
+#
+#     ls | grep .py > out.txt ; echo "done here" && mk notes.txt ; spm update &
+#
+# | pipes one command into the next, > and >> send the last one's output to a file,
+# < feeds the first one from a file, ; runs the next pipeline regardless and &&
+# only if the one before it worked. & ends a part of the line like ; does, but that
+# part runs in the background as a job. Single quotes are taken literally, double
+# quotes allow \" and \\, and a backslash outside quotes escapes a space, quote or
+# operator character (any other backslash is left alone so Windows paths still work).
+
+OPERATORS = ("&&", ">>", "|", ">", "<", ";", "&")
+SPECIAL = set("|><;&'\" \t\\")
+
+class ParseError(Exception):
+    pass
+
+class Command:
+    def __init__(self, argv):
+        self.argv = argv
+        self.stdin = None
+        self.stdout = None
+        self.append = False
+
+    def __repr__(self):
+        return f"Command({self.argv!r}, stdin={self.stdin!r}, stdout={self.stdout!r}, append={self.append})"
+
+class Pipeline:
+    def __init__(self, commands, connector=";"):
+        self.commands = commands
+        # how this pipeline follows the previous one: ";" always runs, "&&" only after a success
+        self.connector = connector
+        # ended by &, and so is every pipeline &&-ed to it before that
+        self.background = False
+
+    def __repr__(self):
+        return f"Pipeline({self.commands!r}, connector={self.connector!r}, background={self.background})"
+
+def tokenize(line):
+    """Splits line into ("word", text) and ("op", operator) tokens."""
+    tokens = []
+    word = []
+    in_word = False
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char in " \t":
+            if in_word:
+                tokens.append(("word", "".join(word)))
+                word, in_word = [], False
+            i += 1
+        elif char == "'":
+            end = line.find("'", i + 1)
+            if end == -1:
+                raise ParseError("missing closing '")
+            word.append(line[i + 1:end])
+            in_word = True
+            i = end + 1
+        elif char == '"':
+            i += 1
+            while True:
+                if i >= len(line):
+                    raise ParseError('missing closing "')
+                if line[i] == '"':
+                    break
+                if line[i] == "\\" and i + 1 < len(line) and line[i + 1] in '"\\':
+                    i += 1
+                word.append(line[i])
+                i += 1
+            in_word = True
+            i += 1
+        elif char == "\\" and i + 1 < len(line) and line[i + 1] in SPECIAL:
+            word.append(line[i + 1])
+            in_word = True
+            i += 2
+        else:
+            operator = next((op for op in OPERATORS if line.startswith(op, i)), None)
+            if operator is None:
+                word.append(char)
+                in_word = True
+                i += 1
+                continue
+            if in_word:
+                tokens.append(("word", "".join(word)))
+                word, in_word = [], False
+            tokens.append(("op", operator))
+            i += len(operator)
+    if in_word:
+        tokens.append(("word", "".join(word)))
+    return tokens
+
+def parse(line):
+    """Parses line into a list of Pipelines. An empty line gives an empty list."""
+    pipelines = []
+    commands = []
+    command = None
+    connector = ";"
+    # where the current ; / & separated part of the line started in pipelines
+    part_start = 0
+    tokens = tokenize(line)
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == "word":
+            if command is None:
+                command = Command([])
+                commands.append(command)
+            command.argv.append(value)
+        elif value in (">", ">>", "<"):
+            if i + 1 >= len(tokens) or tokens[i + 1][0] != "word":
+                raise ParseError(f"missing file name after {value}")
+            if command is None:
+                command = Command([])
+                commands.append(command)
+            if value == "<":
+                command.stdin = tokens[i + 1][1]
+            else:
+                command.stdout = tokens[i + 1][1]
+                command.append = value == ">>"
+            i += 1
+        elif value == "|":
+            if command is None or not command.argv:
+                raise ParseError("missing command before |")
+            command = None
+        else:
+            # ;, && or &
+            if command is None or not command.argv:
+                if value != ";" or commands:
+                    raise ParseError(f"missing command before {value}")
+            else:
+                pipelines.append(finish_pipeline(commands, connector))
+            commands, command = [], None
+            if value == "&":
+                for pipeline in pipelines[part_start:]:
+                    pipeline.background = True
+            if value != "&&":
+                part_start = len(pipelines)
+            connector = ";" if value == "&" else value
+        i += 1
+
+    if commands:
+        if command is None or not command.argv:
+            raise ParseError("missing command at the end")
+        pipelines.append(finish_pipeline(commands, connector))
+    elif connector == "&&":
+        raise ParseError("missing command after &&")
+    return pipelines
+
+def finish_pipeline(commands, connector):
+    for index, command in enumerate(commands):
+        if not command.argv:
+            raise ParseError("redirection without a command")
+        if command.stdin is not None and index > 0:
+            raise ParseError("only the first command of a pipeline can read from a file")
+        if command.stdout is not None and index < len(commands) - 1:
+            raise ParseError("only the last command of a pipeline can write to a file")
+    return Pipeline(commands, connector)
+
+def unparse(pipelines):
+    """Writes pipelines back out as a command line, for showing in the jobs list."""
+    parts = []
+    for index, pipeline in enumerate(pipelines):
+        commands = []
+        for command in pipeline.commands:
+            text = shell_join(command.argv)
+            if command.stdin is not None:
+                text += " < " + shell_join([command.stdin])
+            if command.stdout is not None:
+                text += (" >> " if command.append else " > ") + shell_join([command.stdout])
+            commands.append(text)
+        if index:
+            parts.append(pipeline.connector)
+        parts.append(" | ".join(commands))
+    return " ".join(parts)
+
+# left alone when handing a command to the host shell, so wildcards still expand there
+SHELL_SAFE = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_./:=+,@%*?[]~")
+
+def shell_join(argv, windows=False):
+    """Turns argv back into a command line for the host shell, quoting only the words that need it."""
+    words = []
+    for word in argv:
+        if word and all(char in SHELL_SAFE or (windows and char == "\\") for char in word):
+            words.append(word)
+        elif windows:
+            words.append('"' + word.replace('"', '\\"') + '"')
+        else:
+            words.append("'" + word.replace("'", "'\"'\"'") + "'")
+    return " ".join(words)
@@ -0,0 +1,255 @@
+import os
+import time
+import bisect
+import threading
+
+class CommandHistory:
+    """
+    The Terminal's command history, kept across restarts. Entering a command
+    that's already in there moves it to the newest spot instead of keeping both,
+    and once there are more than max_entries the oldest go.
+
+    On disk it's one command per line, only ever appended to; fsync happens once
+    every sync_every commands (or sync_interval seconds) rather than per command,
+    and load() rewrites the file when duplicates and dropped entries have made it
+    much bigger than what's kept. start_loading() does the loading on a thread of
+    its own; until it's done the history only has what was added meanwhile.
+
+    In memory every entry has a sequence number (higher is newer). A sorted list
+    answers prefix lookups with a binary search, and an index from trigrams (and
+    the pairs and single characters in them) to the sorted seqs containing them
+    lets Ctrl+R walk back from the newest candidate and stop at the first real match.
+    """
+
+    def __init__(self, path, max_entries=10000, sync_every=16, sync_interval=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        # seq -> command, oldest first since re-entered commands are moved to the end
+        self.entries = {}
+        self.seqs = {}
+        self.next_seq = 0
+        self.sorted = []
+        self.postings = {}
+        self.file = None
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.loader = None
+        # commands entered before the loader finished, they go on top of what it read
+        self.added_while_loading = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    # --- the in-memory index ---
+
+    def keys(self, text):
+        """What text is indexed under: its trigrams, plus pairs and single characters for shorter queries."""
+        text = text.lower()
+        keys = set(text)
+        for size in (2, 3):
+            keys.update(text[i:i + size] for i in range(len(text) - size + 1))
+        return keys
+
+    def query_keys(self, query):
+        if len(query) > 3:
+            return {query[i:i + 3] for i in range(len(query) - 2)}
+        return {query}
+
+    def insert(self, text):
+        if text in self.seqs:
+            self.remove(text)
+        seq = self.next_seq
+        self.next_seq += 1
+        self.entries[seq] = text
+        self.seqs[text] = seq
+        bisect.insort(self.sorted, text)
+        # seqs only grow, so appending keeps every posting list sorted
+        for key in self.keys(text):
+            self.postings.setdefault(key, []).append(seq)
+        while len(self.entries) > self.max_entries:
+            self.remove(self.entries[next(iter(self.entries))])
+
+    def rebuild(self, texts):
+        """Indexes texts (oldest first) from scratch, much quicker than insert() one by one for a whole file."""
+        kept = {}
+        for text in texts:
+            kept.pop(text, None)
+            kept[text] = None
+        kept = list(kept)[-self.max_entries:]
+        self.entries = dict(enumerate(kept))
+        self.seqs = {text: seq for seq, text in self.entries.items()}
+        self.next_seq = len(kept)
+        self.sorted = sorted(kept)
+        self.postings = {}
+        for seq, text in self.entries.items():
+            for key in self.keys(text):
+                self.postings.setdefault(key, []).append(seq)
+
+    def remove(self, text):
+        seq = self.seqs.pop(text)
+        del self.entries[seq]
+        del self.sorted[bisect.bisect_left(self.sorted, text)]
+        for key in self.keys(text):
+            postings = self.postings[key]
+            del postings[bisect.bisect_left(postings, seq)]
+            if not postings:
+                del self.postings[key]
+
+    def search(self, query, before=None):
+        """
+        The newest (seq, command) containing query, ignoring case, older than
+        seq before (or the newest overall if before is None). None if nothing matches.
+        """
+        query = query.lower()
+        with self.lock:
+            if not query:
+                for seq, text in reversed(self.entries.items()):
+                    if before is None or seq < before:
+                        return seq, text
+                return None
+
+            postings = []
+            for key in self.query_keys(query):
+                if key not in self.postings:
+                    return None
+                postings.append(self.postings[key])
+            postings.sort(key=len)
+            rarest, others = postings[0], postings[1:]
+            end = len(rarest) if before is None else bisect.bisect_left(rarest, before)
+            # newest first, so the first entry that has everything is the answer
+            for i in range(end - 1, -1, -1):
+                seq = rarest[i]
+                if all(self.has(other, seq) for other in others) and query in self.entries[seq].lower():
+                    return seq, self.entries[seq]
+            return None
+
+    def has(self, postings, seq):
+        i = bisect.bisect_left(postings, seq)
+        return i < len(postings) and postings[i] == seq
+
+    def prefix_matches(self, prefix):
+        """Every command starting with prefix, newest first."""
+        with self.lock:
+            if not prefix:
+                return list(reversed(self.entries.values()))
+            start = bisect.bisect_left(self.sorted, prefix)
+            matches = []
+            for text in self.sorted[start:]:
+                if not text.startswith(prefix):
+                    break
+                matches.append(text)
+            matches.sort(key=self.seqs.get, reverse=True)
+            return matches
+
+    # --- the file ---
+
+    def start_loading(self):
+        """Runs load() in the background, so a long history doesn't hold up the window opening."""
+        self.loader = threading.Thread(target=self.load, daemon=True)
+        self.loader.start()
+
+    def load(self):
+        lines = []
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not read command history: {e}")
+        # indexed on the side, the live index keeps answering until it's swapped in
+        loaded = CommandHistory(self.path, self.max_entries)
+        loaded.rebuild(line for line in lines if line.strip())
+
+        with self.lock:
+            if self.added_while_loading is None:
+                self.added_while_loading = []
+            self.entries, self.seqs, self.next_seq = loaded.entries, loaded.seqs, loaded.next_seq
+            self.sorted, self.postings = loaded.sorted, loaded.postings
+            for text in self.added_while_loading:
+                self.insert(text)
+            kept = list(self.entries.values())
+            swapped = len(self.added_while_loading)
+            saved = 0
+
+        # duplicates and dropped entries pile up in the file, fold them away now and then
+        if len(lines) > len(loaded.entries) + max(64, self.max_entries // 2):
+            self.compact(kept)
+            saved = swapped
+        self.open()
+        # anything entered up to now, including while the file was being opened, gets written
+        with self.lock:
+            for text in self.added_while_loading[saved:]:
+                self.append(text)
+            self.added_while_loading = None
+
+    def open(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"Warning: Command history won't be saved: {e}")
+            self.file = None
+
+    def add(self, text):
+        text = text.strip()
+        if not text:
+            return
+        with self.lock:
+            newest = self.entries[next(reversed(self.entries))] if self.entries else None
+            if text == newest:
+                return
+            self.insert(text)
+            if self.added_while_loading is not None and self.loader is not None:
+                # the loader puts it back on top and saves it once it's done
+                self.added_while_loading.append(text)
+                return
+        self.append(text)
+
+    def append(self, text):
+        if self.file is None:
+            return
+        try:
+            self.file.write(text + "\n")
+        except OSError as e:
+            print(f"Warning: Could not save command history: {e}")
+            return
+        self.unsynced += 1
+        if self.unsynced >= self.sync_every or time.monotonic() - self.synced_at >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if self.file is None or not self.unsynced:
+            return
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except OSError as e:
+            print(f"Warning: Could not save command history: {e}")
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def compact(self, texts):
+        """Rewrites the file with just texts, replacing it in one step so a crash can't lose it."""
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for text in texts:
+                    f.write(text + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not compact command history: {e}")
+
+    def close(self):
+        if self.loader is not None:
+            # what was entered while it loaded is only saved once it's done
+            self.loader.join(timeout=5)
+        self.sync()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,185 @@
+import threading
+
+# Job control for the Terminal. Every command line (or each part of it ending in &)
+# runs as a Job on its own thread; the Terminal waits on foreground jobs and only
+# keeps the ones sent to the background (with & or Ctrl+Z) in its JobTable.
+
+class JobOutput:
+    """
+    Passes a job's output on in whole lines only. Jobs print at the same time, so
+    a half line from one would otherwise get the next job's line glued to it.
+    """
+
+    def __init__(self, on_line):
+        self.on_line = on_line
+        self.pending = ""
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            self.pending += text
+            *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.on_line(line + "\n")
+
+    def error(self, text):
+        self.write(f"Error: {text}")
+
+    def close(self):
+        with self.lock:
+            rest, self.pending = self.pending, ""
+        if rest:
+            self.on_line(rest + "\n")
+
+class Job:
+    def __init__(self, text, output, background=False):
+        self.id = None
+        self.text = text
+        self.output = output
+        self.background = background
+        # "running", "stopped" or "done"
+        self.state = "running"
+        self.status = None
+        self.killed = False
+        # the PipelineRun it's in the middle of
+        self.current = None
+        self.thread = None
+        self.changed = threading.Condition()
+
+    def start(self, target):
+        self.thread = threading.Thread(target=self.run, args=(target,), daemon=True)
+        self.thread.start()
+
+    def run(self, target):
+        status = 1
+        try:
+            status = target(self)
+        finally:
+            self.output.close()
+            with self.changed:
+                self.status = status
+                self.state = "done"
+                self.current = None
+                self.changed.notify_all()
+
+    def run_pipeline(self, run):
+        """Runs one pipeline of the job and returns its exit code. Raises OSError like PipelineRun.start()."""
+        with self.changed:
+            if self.killed:
+                return 130
+            self.current = run
+        try:
+            try:
+                run.start()
+            except OSError:
+                run.wait()
+                raise
+            if self.killed:
+                # killed while it was starting up
+                run.kill()
+            return run.wait()
+        finally:
+            with self.changed:
+                self.current = None
+
+    def wait_foreground(self):
+        """Blocks until the job finishes or gets sent to the background. Returns True if it finished."""
+        with self.changed:
+            self.background = False
+            while self.state != "done" and not self.background:
+                self.changed.wait()
+            return self.state == "done"
+
+    def to_background(self):
+        with self.changed:
+            self.background = True
+            self.changed.notify_all()
+
+    def interrupt(self):
+        # like a shell, Ctrl+C drops the rest of a && chain as well
+        with self.changed:
+            self.killed = True
+            run = self.current
+        if run is not None:
+            run.interrupt()
+
+    def stop(self):
+        """Pauses the job's processes and sends it to the background. A job running a cmdlet can't be paused and keeps going."""
+        run = self.current
+        if run is not None and run.stop():
+            with self.changed:
+                self.state = "stopped"
+        self.to_background()
+
+    def resume(self):
+        run = self.current
+        if self.state == "stopped":
+            if run is not None:
+                run.resume()
+            with self.changed:
+                self.state = "running"
+                self.changed.notify_all()
+
+    def wait_while_stopped(self):
+        """Holds the job's thread while it's stopped, so the rest of a && chain doesn't start behind its back."""
+        with self.changed:
+            while self.state == "stopped" and not self.killed:
+                self.changed.wait()
+
+    def kill(self):
+        with self.changed:
+            self.killed = True
+            self.changed.notify_all()
+            run = self.current
+        if run is not None:
+            run.kill()
+            if self.state == "stopped":
+                run.resume()
+
+    def describe(self):
+        if self.state == "done":
+            state = "Done" if not self.status else f"Exit {self.status}"
+        else:
+            state = self.state.capitalize()
+        return f"[{self.id}]  {state:<10}{self.text}"
+
+class JobTable:
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def add(self, job):
+        with self.lock:
+            if job.id is None:
+                job.id = max(self.jobs, default=0) + 1
+                self.jobs[job.id] = job
+            return job.id
+
+    def get(self, spec=None):
+        """A job by %n (or plain n), the most recent one if spec is empty or %%/%+. None if there's no such job."""
+        with self.lock:
+            if not self.jobs:
+                return None
+            if spec in (None, "", "%", "%%", "%+"):
+                return self.jobs[max(self.jobs)]
+            try:
+                return self.jobs.get(int(spec.lstrip("%")))
+            except ValueError:
+                return None
+
+    def list(self):
+        with self.lock:
+            return [self.jobs[job_id] for job_id in sorted(self.jobs)]
+
+    def discard(self, job):
+        with self.lock:
+            if self.jobs.get(job.id) is job:
+                del self.jobs[job.id]
+
+    def reap(self):
+        """Takes finished jobs out of the table and returns them, for the "Done" notices."""
+        with self.lock:
+            done = [job for job in self.jobs.values() if job.state == "done"]
+            for job in done:
+                del self.jobs[job.id]
+        return sorted(done, key=lambda job: job.id)
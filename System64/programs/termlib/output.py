@@ -0,0 +1,72 @@
+import time
+import queue
+import threading
+
+class OutputQueue:
+    """
+    Everything worker threads want shown in the Terminal, in order: text, lines
+    that need the >>label: colouring, and UI calls like printing the prompt (which
+    have to wait their turn behind the output before them).
+
+    The queue is bounded, so a program printing faster than the window can keep
+    up gets blocked in its reader thread instead of piling up memory. The UI
+    thread drains it on a fixed cadence, so there is one pending Tk callback at a
+    time no matter how much output is coming in.
+    """
+
+    def __init__(self, root, handle_batch, max_items=4096, interval_ms=16, budget_ms=8):
+        self.root = root
+        self.handle_batch = handle_batch
+        self.items = queue.Queue(maxsize=max_items)
+        self.interval_ms = interval_ms
+        self.budget = budget_ms / 1000
+        self.scheduled = False
+        self.lock = threading.Lock()
+
+    def put(self, kind, payload=None, tag=None):
+        self.items.put((kind, payload, tag))
+        self.schedule()
+
+    def schedule(self):
+        with self.lock:
+            if self.scheduled:
+                return
+            self.scheduled = True
+        self.root.after(self.interval_ms, self.drain)
+
+    def drain(self):
+        """Runs on the UI thread. Hands over as much as fits in the time budget, the rest waits for the next tick."""
+        with self.lock:
+            self.scheduled = False
+        deadline = time.perf_counter() + self.budget
+        while time.perf_counter() < deadline:
+            batch = []
+            try:
+                while len(batch) < 512:
+                    batch.append(self.items.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                return
+            self.handle_batch(batch)
+        if not self.items.empty():
+            self.schedule()
+
+def coalesce(batch):
+    """
+    Joins neighbouring text items with the same tag into one block, so a drain is a
+    handful of Text.insert calls instead of one per line. Calls and coloured lines
+    stay separate, and keep their place in the order.
+    """
+    merged = []
+    for kind, payload, tag in batch:
+        if kind == "text" and merged and merged[-1][0] == "text" and merged[-1][2] == tag:
+            merged[-1][1].append(payload)
+        elif kind == "text":
+            merged.append(["text", [payload], tag])
+        else:
+            merged.append([kind, payload, tag])
+    for item in merged:
+        if item[0] == "text":
+            item[1] = "".join(item[1])
+    return merged
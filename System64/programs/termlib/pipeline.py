@@ -0,0 +1,281 @@
+import io
+import os
+import queue
+import threading
+import subprocess
+
+from cmdlets import CmdletContext, LineWriter
+import process
+
+# Runs one parsed pipeline. Cmdlets run on threads of the Terminal's own process and
+# hand lines to each other through an in-memory queue; a real OS pipe only appears
+# where an external process sits on one side of a |.
+
+_EOF = None
+
+class PipeWriter(io.TextIOBase):
+    """The writing end of an in-process pipe. Whole lines go into the queue, the rest waits for its newline or close()."""
+
+    def __init__(self, lines, state):
+        self.lines = lines
+        self.state = state
+        self.pending = ""
+
+    def put(self, item):
+        # short waits so Ctrl+C (an async exception) can land while the reader is behind
+        while True:
+            if self.state["reader_closed"]:
+                raise BrokenPipeError("the next command in the pipeline has finished")
+            try:
+                self.lines.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, text):
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.put(line + "\n")
+        return len(text)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.pending:
+                self.put(self.pending)
+                self.pending = ""
+            self.put(_EOF)
+        except BrokenPipeError:
+            pass
+        super().close()
+
+    def writable(self):
+        return True
+
+class PipeReader(io.TextIOBase):
+    """The reading end of an in-process pipe. Iterating it gives lines until the writer closes."""
+
+    def __init__(self, lines, state):
+        self.lines = lines
+        self.state = state
+        self.eof = False
+        self.buffer = ""
+
+    def next_line(self):
+        if self.eof:
+            return ""
+        while True:
+            try:
+                line = self.lines.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        if line is _EOF:
+            self.eof = True
+            return ""
+        return line
+
+    def readline(self, size=-1):
+        line = self.buffer or self.next_line()
+        self.buffer = ""
+        if size is not None and 0 <= size < len(line):
+            line, self.buffer = line[:size], line[size:]
+        return line
+
+    def read(self, size=-1):
+        chunks = []
+        length = 0
+        while size is None or size < 0 or length < size:
+            line = self.readline(-1 if size is None or size < 0 else size - length)
+            if not line:
+                break
+            chunks.append(line)
+            length += len(line)
+        return "".join(chunks)
+
+    def close(self):
+        # tells the writer to stop, like SIGPIPE would
+        self.state["reader_closed"] = True
+        super().close()
+
+    def readable(self):
+        return True
+
+def line_pipe(max_lines=1024):
+    """A (reader, writer) pair for connecting two cmdlets."""
+    lines = queue.Queue(maxsize=max_lines)
+    state = {"reader_closed": False}
+    return PipeReader(lines, state), PipeWriter(lines, state)
+
+class Stage:
+    """
+    One command of a pipeline, already resolved by the Terminal. kind is "cmdlet"
+    (target is the script's path), "process" (target is an argv list) or "shell"
+    (target is a command line for the host shell). on_stderr gets the stage's
+    error output a line at a time.
+    """
+
+    def __init__(self, kind, target, args=(), on_stderr=None, stdin_path=None, stdout_path=None, append=False):
+        self.kind = kind
+        self.target = target
+        self.args = list(args)
+        self.on_stderr = on_stderr
+        self.stdin_path = stdin_path
+        self.stdout_path = stdout_path
+        self.append = append
+
+class PipelineRun:
+    """
+    Starts every stage of a pipeline at once, like a shell does, so data streams
+    through instead of each command waiting for the one before to finish. wait()
+    returns the exit code of the last stage.
+    """
+
+    def __init__(self, stages, cwd, runtime, on_stdout):
+        self.stages = stages
+        self.cwd = cwd
+        self.runtime = runtime
+        self.on_stdout = on_stdout
+        self.processes = []
+        self.cmdlet_threads = []
+        self.readers = []
+        self.codes = [None] * len(stages)
+        self.last_process = None
+        self.interrupted = False
+
+    def open_redirect(self, stage):
+        stdin = stdout = None
+        if stage.stdin_path is not None:
+            stdin = open(os.path.join(self.cwd, stage.stdin_path), "r", encoding="utf-8", errors="replace")
+        if stage.stdout_path is not None:
+            try:
+                stdout = open(os.path.join(self.cwd, stage.stdout_path), "a" if stage.append else "w", encoding="utf-8")
+            except OSError:
+                if stdin is not None:
+                    stdin.close()
+                raise
+        return stdin, stdout
+
+    def start(self):
+        """Raises OSError if a redirect file or a process can't be opened; stages already started keep running."""
+        upstream = None
+        for index, stage in enumerate(self.stages):
+            last = index == len(self.stages) - 1
+            following = None if last else self.stages[index + 1]
+            try:
+                stdin_file, stdout_file = self.open_redirect(stage)
+            except OSError:
+                self.close_quietly(upstream)
+                raise
+            stdin = stdin_file if stdin_file is not None else upstream
+            if stage.kind == "cmdlet":
+                upstream = self.start_cmdlet(index, stage, stdin, stdout_file, following)
+            else:
+                upstream = self.start_process(index, stage, stdin, stdout_file, last)
+
+    def start_cmdlet(self, index, stage, stdin, stdout_file, following):
+        upstream = None
+        if stdout_file is not None:
+            stdout = stdout_file
+        elif following is None:
+            stdout = LineWriter(self.on_stdout)
+        elif following.kind == "cmdlet":
+            upstream, stdout = line_pipe()
+        else:
+            read_fd, write_fd = os.pipe()
+            stdout = open(write_fd, "w", encoding="utf-8", errors="replace")
+            upstream = read_fd
+        if isinstance(stdin, int):
+            stdin = open(stdin, "r", encoding="utf-8", errors="replace")
+        stderr = LineWriter(stage.on_stderr or self.on_stdout)
+        ctx = CmdletContext(stage.args, self.cwd, stdin=stdin, stdout=stdout, stderr=stderr)
+        thread = threading.Thread(target=self.run_cmdlet, args=(index, stage.target, ctx), daemon=True)
+        self.cmdlet_threads.append(thread)
+        thread.start()
+        return upstream
+
+    def run_cmdlet(self, index, path, ctx):
+        try:
+            self.codes[index] = self.runtime.run(path, ctx)
+        finally:
+            for stream in (ctx.stdout, ctx.stderr, ctx.stdin):
+                self.close_quietly(stream)
+
+    def start_process(self, index, stage, stdin, stdout_file, last):
+        if stdin is None:
+            stdin = subprocess.DEVNULL
+        stdout = stdout_file if stdout_file is not None else subprocess.PIPE
+        try:
+            child = process.spawn(stage.target if stage.kind == "shell" else stage.target + stage.args, self.cwd,
+                                  shell=stage.kind == "shell", stdin=stdin, stdout=stdout, stderr=subprocess.PIPE)
+        finally:
+            # the child has its own copies now
+            if stdin is not subprocess.DEVNULL:
+                self.close_quietly(stdin)
+            self.close_quietly(stdout_file)
+        self.processes.append(child)
+        self.pump(child.stderr, stage.on_stderr or self.on_stdout)
+        if last:
+            self.last_process = child
+            if child.stdout is not None:
+                self.pump(child.stdout, self.on_stdout)
+            return None
+        return child.stdout
+
+    def pump(self, stream, on_line):
+        reader = threading.Thread(target=process.pump, args=(stream, on_line), daemon=True)
+        self.readers.append(reader)
+        reader.start()
+
+    def close_quietly(self, stream):
+        if stream is None:
+            return
+        try:
+            if isinstance(stream, int):
+                os.close(stream)
+            else:
+                stream.close()
+        except (OSError, ValueError):
+            pass
+
+    def wait(self):
+        for thread in self.cmdlet_threads:
+            thread.join()
+        for child in self.processes:
+            child.wait()
+        for reader in self.readers:
+            reader.join()
+        if self.last_process is not None:
+            return self.last_process.returncode
+        code = self.codes[-1]
+        return 130 if code is None and self.interrupted else (code or 0)
+
+    def interrupt(self):
+        self.interrupted = True
+        for child in self.processes:
+            process.interrupt(child)
+        for thread in self.cmdlet_threads:
+            process.interrupt_thread(thread)
+
+    def kill(self):
+        self.interrupted = True
+        for child in self.processes:
+            process.terminate(child)
+        for thread in self.cmdlet_threads:
+            # a cmdlet can't be killed from outside, this is as close as it gets
+            process.interrupt_thread(thread)
+
+    def stop(self):
+        """
+        Pauses the external processes. Returns False, leaving everything running, if
+        there aren't any or a cmdlet is still going: those can't be paused.
+        """
+        if not self.processes or any(thread.is_alive() for thread in self.cmdlet_threads):
+            return False
+        return all([process.stop(child) for child in self.processes])
+
+    def resume(self):
+        for child in self.processes:
+            process.resume(child)
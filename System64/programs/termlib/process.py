@@ -0,0 +1,102 @@
+import os
+import sys
+import signal
+import ctypes
+import threading
+import subprocess
+
+# starting, streaming and interrupting the programs the Terminal runs
+
+def spawn(cmd, cwd, shell=False, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE):
+    """
+    Starts cmd in its own process group so Ctrl+C can reach it (and whatever it
+    starts) without hitting the Terminal. Python children are unbuffered so their
+    output shows up as it's printed rather than when they exit.
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(
+        cmd, shell=shell, cwd=cwd, env=env,
+        stdin=stdin, stdout=stdout, stderr=stderr,
+        text=True, encoding="utf-8", errors="replace", bufsize=1,
+        **kwargs
+    )
+
+def interrupt(process):
+    """Sends the equivalent of Ctrl+C to process and its group."""
+    if process.poll() is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGINT)
+    except (OSError, ValueError):
+        pass
+
+def terminate(process):
+    """Asks process and its group to quit, like kill does."""
+    if process.poll() is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            process.terminate()
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+    except (OSError, ValueError):
+        pass
+
+def stop(process):
+    """
+    Pauses process and its group. The group has no controlling terminal, so
+    SIGTSTP would be ignored and it takes SIGSTOP. Returns False where that isn't
+    possible (Windows).
+    """
+    if sys.platform == "win32":
+        return False
+    if process.poll() is None:
+        try:
+            os.killpg(process.pid, signal.SIGSTOP)
+        except OSError:
+            pass
+    return True
+
+def resume(process):
+    if sys.platform == "win32" or process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGCONT)
+    except OSError:
+        pass
+
+def interrupt_thread(thread):
+    """Raises KeyboardInterrupt in a thread running an in-process cmdlet, the next time it runs Python code."""
+    if thread is None or not thread.is_alive():
+        return
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread.ident), ctypes.py_object(KeyboardInterrupt))
+
+def pump(stream, on_line):
+    for line in iter(stream.readline, ""):
+        on_line(line)
+    stream.close()
+
+def stream_output(process, on_stdout, on_stderr=None):
+    """
+    Delivers process's output line by line as it arrives, reading stdout and
+    stderr at the same time so neither pipe can fill up and stall the child.
+    Blocks until the process exits and returns its exit code.
+    """
+    readers = []
+    if process.stderr is not None and on_stderr is not None:
+        reader = threading.Thread(target=pump, args=(process.stderr, on_stderr), daemon=True)
+        reader.start()
+        readers.append(reader)
+    if process.stdout is not None:
+        pump(process.stdout, on_stdout)
+    for reader in readers:
+        reader.join()
+    return process.wait()
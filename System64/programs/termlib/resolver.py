@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import threading
+
+# file types the Terminal knows how to run on this platform
+if sys.platform == "win32":
+    RUNNABLE_EXTENSIONS = (".py", ".bat")
+else:
+    RUNNABLE_EXTENSIONS = (".py", ".sh")
+
+class CommandResolver:
+    """
+    Maps command names to the script that runs them, like a shell's hash table.
+    Every directory is listed once into a case-insensitive name -> path table,
+    earlier directories winning when two have the same command. Lookups are a
+    dict hit; the table is only rebuilt when one of the directories' mtimes has
+    changed (a file was added, removed or renamed), and the mtimes themselves are
+    checked at most every check_interval seconds, or straight away on a miss so a
+    command that was just saved can be run right away.
+    """
+
+    def __init__(self, directories, check_interval=1.0):
+        self.directories = directories
+        self.check_interval = check_interval
+        self.table = {}
+        self.mtimes = {}
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        # how often each command was found, plus totals for `hash`
+        self.hits = {}
+        self.misses = 0
+        self.rebuilds = 0
+
+    def scan(self):
+        table = {}
+        mtimes = {}
+        for directory in self.directories:
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime_ns
+                entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+            except OSError:
+                mtimes[directory] = None
+                continue
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                if ext.lower() not in RUNNABLE_EXTENSIONS or not entry.is_file():
+                    continue
+                table.setdefault(name.lower(), entry.path)
+        return table, mtimes
+
+    def current_mtimes(self):
+        mtimes = {}
+        for directory in self.directories:
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtimes[directory] = None
+        return mtimes
+
+    def rehash(self):
+        """Rebuilds the table from scratch. Returns how many commands it found."""
+        table, mtimes = self.scan()
+        with self.lock:
+            self.table = table
+            self.mtimes = mtimes
+            self.checked_at = time.monotonic()
+            self.rebuilds += 1
+            # hit counts only make sense for commands that still exist
+            self.hits = {name: count for name, count in self.hits.items() if name in table}
+        return len(table)
+
+    def refresh(self, force_check=False):
+        """Rebuilds if a directory changed since the last scan. Returns True if it did."""
+        now = time.monotonic()
+        if self.rebuilds and not force_check and now - self.checked_at < self.check_interval:
+            return False
+        if self.rebuilds and self.current_mtimes() == self.mtimes:
+            self.checked_at = now
+            return False
+        self.rehash()
+        return True
+
+    def lookup(self, command, record=True):
+        """The path that runs command, or None if it isn't a ShellOS command. record=False leaves the stats alone."""
+        name = command.lower()
+        self.refresh()
+        path = self.table.get(name)
+        if path is None and self.refresh(force_check=True):
+            path = self.table.get(name)
+        if not record:
+            return path
+        with self.lock:
+            if path is None:
+                self.misses += 1
+            else:
+                self.hits[name] = self.hits.get(name, 0) + 1
+        return path
+
+    def names(self):
+        self.refresh()
+        return sorted(self.table)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "commands": len(self.table),
+                "directories": len(self.directories),
+                "hits": sum(self.hits.values()),
+                "misses": self.misses,
+                "rebuilds": self.rebuilds,
+            }
@@ -0,0 +1,305 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from collections import deque
+
+from ansi import AnsiParser
+
+class LineBuffer:
+    """
+    The Terminal's scrollback: a ring buffer of finished lines plus the one still
+    being written. A line is a plain str when it has no tags, otherwise a tuple of
+    (text, tags) runs. Once max_lines is reached the oldest line drops off,
+    dropped counts how many have, so a position can be kept as an absolute line
+    number while the buffer moves underneath it.
+    """
+
+    def __init__(self, max_lines):
+        self.lines = deque(maxlen=max_lines)
+        self.current = []
+        # a carriage return was the last thing written, what comes next replaces the current line
+        self.returned = False
+        self.dropped = 0
+        self.parser = AnsiParser()
+
+    def __len__(self):
+        return len(self.lines) + (1 if self.current else 0)
+
+    def write(self, text, tag=None):
+        for run_text, tags in self.parser.feed(text):
+            if tag:
+                tags = tags + (tag,)
+            parts = run_text.split("\n")
+            for index, part in enumerate(parts):
+                if part:
+                    self.add_text(part, tags)
+                if index < len(parts) - 1:
+                    self.end_line()
+
+    def add_text(self, text, tags):
+        # progress bars redraw their line after a \r. it's only acted on once more text
+        # comes, so the \r of a \r\n split across two writes doesn't wipe the line
+        for index, piece in enumerate(text.split("\r")):
+            if index > 0:
+                self.returned = True
+            if not piece:
+                continue
+            if self.returned:
+                self.current = []
+                self.returned = False
+            self.current.append((piece, tags))
+
+    def end_line(self):
+        line = self.current
+        self.current = []
+        self.returned = False
+        if len(self.lines) == self.lines.maxlen:
+            self.dropped += 1
+        if not line:
+            self.lines.append("")
+        elif all(not tags for text, tags in line):
+            self.lines.append("".join(text for text, tags in line))
+        else:
+            self.lines.append(tuple(line))
+
+    def window(self, start, count):
+        """Up to count lines from start (0 is the oldest line still kept)."""
+        end = min(start + count, len(self.lines))
+        lines = [self.lines[i] for i in range(max(0, start), end)] if start < end else []
+        if self.current and start + count > len(self.lines):
+            lines.append(tuple(self.current))
+        return lines
+
+    def clear(self):
+        self.dropped += len(self.lines)
+        self.lines.clear()
+        self.current = []
+        self.returned = False
+
+class TerminalView:
+    """
+    A Text widget that only ever holds the lines that fit on screen, taken from a
+    LineBuffer, with the live region (prompt and what's being typed) after them.
+    However much output scrolls past, the widget stays a screenful of text, so
+    inserts and redraws cost the same after a million lines as after ten. The
+    scrollbar and mouse wheel move through the buffer instead of the widget.
+
+    The live region starts at the "live_start" mark. Everything before it is
+    replaced on each render(), so nothing outside the view should insert there.
+    A selection in it is carried over by buffer position. The widget's own undo
+    is off, since it records edits by line number and those shift on every
+    render; the input line has a small undo of its own instead (remember_input()).
+    """
+
+    def __init__(self, root, max_lines, font=("Consolas", 12), bg="black", fg="white"):
+        self.buffer = LineBuffer(max_lines)
+        self.font = font
+        # absolute number of the first line shown while scrolled back, None follows the output
+        self.top = None
+        # absolute number of the line at the top of the widget after the last render
+        self.shown_top = 0
+        self.shown_count = 0
+        self.configured_tags = set()
+        # earlier versions of the input line, for Ctrl+Z
+        self.input_undo = []
+        self.last_edit = None
+
+        self.scrollbar = tk.Scrollbar(root, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(root, wrap=tk.WORD, bg=bg, fg=fg, insertbackground=fg, font=font, undo=False)
+        self.text.pack(expand=True, fill=tk.BOTH)
+        self.text.mark_set("live_start", "1.0")
+        self.text.mark_gravity("live_start", tk.LEFT)
+        self.linespace = tkfont.Font(root=root, font=font).metrics("linespace")
+
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", self.on_wheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll(3))
+        self.text.bind("<Prior>", lambda event: self.scroll(-(self.rows() - 1)))
+        self.text.bind("<Next>", lambda event: self.scroll(self.rows() - 1))
+
+    # --- the buffer ---
+
+    def write(self, text, tag=None):
+        """Adds output. Nothing shows until the next render()."""
+        self.buffer.write(text, tag)
+
+    def clear(self):
+        self.buffer.clear()
+        self.top = None
+        self.render()
+
+    def commit_live(self, suffix=""):
+        """Moves the live region (the prompt and the line typed after it) into the scrollback."""
+        text = self.text.get("live_start", "end-1c")
+        self.text.delete("live_start", tk.END)
+        self.buffer.write(text + suffix + "\n")
+        self.input_undo.clear()
+        self.last_edit = None
+        self.top = None
+        self.render()
+
+    # --- undo for the input line ---
+
+    def remember_input(self, kind):
+        """
+        Called before an edit of the input line. A run of edits of the same kind
+        ("type", "space", "delete") is undone in one go, like the Text widget's
+        own undo does for words; "replace" is always a step of its own.
+        """
+        if kind != self.last_edit or kind == "replace":
+            text = self.text.get("prompt_end", "end-1c")
+            if not self.input_undo or self.input_undo[-1] != text:
+                self.input_undo.append(text)
+                del self.input_undo[:-100]
+        self.last_edit = kind
+
+    def undo_input(self):
+        if not self.input_undo:
+            return
+        self.text.delete("prompt_end", "end-1c")
+        self.text.insert(tk.END, self.input_undo.pop())
+        self.text.mark_set("insert", tk.END)
+        self.last_edit = None
+
+    # --- drawing ---
+
+    def rows(self):
+        height = self.text.winfo_height()
+        # not laid out yet
+        if height <= 1:
+            return 40
+        return max(1, height // self.linespace)
+
+    def follow_start(self, rows):
+        # one row is left for the live region
+        return max(0, len(self.buffer) - (rows - 1))
+
+    def configure_tags(self, tags):
+        for tag in tags:
+            if tag in self.configured_tags:
+                continue
+            self.configured_tags.add(tag)
+            if tag.startswith("ansi_fg_"):
+                self.text.tag_config(tag, foreground=tag[len("ansi_fg_"):])
+            elif tag.startswith("ansi_bg_"):
+                self.text.tag_config(tag, background=tag[len("ansi_bg_"):])
+            elif tag == "ansi_bold":
+                self.text.tag_config(tag, font=tuple(self.font[:2]) + ("bold",))
+            elif tag == "ansi_underline":
+                self.text.tag_config(tag, underline=True)
+            # anything else is a tag the Terminal configured itself
+
+    def render(self):
+        rows = self.rows()
+        total = len(self.buffer)
+        start = self.follow_start(rows)
+        if self.top is not None:
+            start = self.top - self.buffer.dropped
+            if start < 0:
+                start = 0
+            if start >= self.follow_start(rows):
+                start = self.follow_start(rows)
+                self.top = None
+        lines = self.buffer.window(start, rows)
+
+        # one insert for the whole window, neighbouring runs with the same tags merged
+        args = []
+        for line in lines:
+            runs = ((line, ()),) if isinstance(line, str) else line
+            for text, tags in runs:
+                if args and args[-1] == tags:
+                    args[-2] += text
+                else:
+                    self.configure_tags(tags)
+                    args += [text, tags]
+            if args and args[-1] == ():
+                args[-2] += "\n"
+            else:
+                args += ["\n", ()]
+
+        selection = self.save_selection()
+        # the live region has to stay after the new text, wherever the marks sit
+        marks = [mark for mark in ("live_start", "prompt_end") if mark in self.text.mark_names()]
+        for mark in marks:
+            self.text.mark_gravity(mark, tk.RIGHT)
+        self.text.delete("1.0", "live_start")
+        if args:
+            self.text.insert("1.0", *args)
+        for mark in marks:
+            self.text.mark_gravity(mark, tk.LEFT)
+        self.shown_top = start + self.buffer.dropped
+        self.shown_count = len(lines)
+        if selection is not None:
+            self.restore_selection(selection)
+
+        if self.top is None:
+            self.text.see(tk.END)
+        else:
+            self.text.yview_moveto(0)
+        span = total + 1
+        self.scrollbar.set(start / span, min(1.0, (start + len(lines) + 1) / span))
+
+    def save_selection(self):
+        """The selection's ends as (absolute line, column), or a mark for an end in the live region."""
+        ranges = self.text.tag_ranges("sel")
+        if not ranges:
+            return None
+        ends = []
+        for name, index in zip(("sel_first_kept", "sel_last_kept"), ranges[:2]):
+            if self.text.compare(index, ">=", "live_start"):
+                # the live region isn't redrawn, a mark keeps its place
+                self.text.mark_set(name, index)
+                ends.append(name)
+            else:
+                line, column = map(int, str(index).split("."))
+                ends.append((self.shown_top + line - 1, column))
+        return ends
+
+    def restore_selection(self, ends):
+        indices = []
+        for end in ends:
+            if isinstance(end, str):
+                indices.append(end)
+                continue
+            line = end[0] - self.shown_top + 1
+            if line < 1:
+                indices.append("1.0")
+            elif line > self.shown_count:
+                indices.append("live_start")
+            else:
+                indices.append(f"{line}.{end[1]}")
+        if self.text.compare(indices[0], "<", indices[1]):
+            self.text.tag_add("sel", indices[0], indices[1])
+        for end in ends:
+            if isinstance(end, str):
+                self.text.mark_unset(end)
+
+    # --- scrolling ---
+
+    def scroll(self, lines):
+        rows = self.rows()
+        current = self.follow_start(rows) if self.top is None else self.top - self.buffer.dropped
+        target = max(0, current + lines)
+        self.top = None if target >= self.follow_start(rows) else target + self.buffer.dropped
+        self.render()
+        return "break"
+
+    def follow(self):
+        if self.top is not None:
+            self.top = None
+            self.render()
+
+    def on_wheel(self, event):
+        # Windows sends multiples of 120, macOS small steps
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * steps)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        rows = self.rows()
+        if action == "moveto":
+            target = int(float(amount) * (len(self.buffer) + 1))
+            self.top = None if target >= self.follow_start(rows) else max(0, target) + self.buffer.dropped
+            self.render()
+        elif action == "scroll":
+            self.scroll(int(amount) * (rows - 1 if unit == "pages" else 1))
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SYSTEM"))
+
+import ShlOSAccounts
+
+def make_store(tmp_path):
+    return ShlOSAccounts.AccountStore(str(tmp_path / "accounts.json"), iterations=1000, compact_after=64)
+
+def test_corrupt_snapshot_is_kept_aside(tmp_path):
+    store = make_store(tmp_path).load()
+    store.create("alice", "secret")
+    store.compact()
+
+    snapshot = tmp_path / "accounts.json"
+    damaged = snapshot.read_text(encoding="utf-8")[:-5]
+    snapshot.write_text(damaged, encoding="utf-8")
+
+    store = make_store(tmp_path).load()
+    store.create("bob", "hunter2")
+    store.compact()
+
+    kept = [path for path in tmp_path.iterdir() if path.name.startswith("accounts.json.corrupt-")]
+    assert len(kept) == 1
+    assert kept[0].read_text(encoding="utf-8") == damaged
+    assert make_store(tmp_path).load().verify("bob", "hunter2")
+
+def test_unreadable_snapshot_is_never_compacted(tmp_path, monkeypatch):
+    store = make_store(tmp_path).load()
+    store.create("alice", "secret")
+    store.compact()
+    before = (tmp_path / "accounts.json").read_bytes()
+
+    real_open = open
+
+    def failing_open(path, *args, **kwargs):
+        if str(path) == str(tmp_path / "accounts.json"):
+            raise PermissionError(13, "Permission denied", str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", failing_open)
+    store = make_store(tmp_path).load()
+    assert store.degraded
+    store.create("bob", "hunter2")
+    store.compact()
+    monkeypatch.undo()
+
+    assert (tmp_path / "accounts.json").read_bytes() == before
+    store = make_store(tmp_path).load()
+    assert store.get("alice") is not None and store.get("bob") is not None
+
+def test_malformed_journal_lines_are_torn(tmp_path):
+    store = make_store(tmp_path).load()
+    store.create("alice", "secret")
+    with open(tmp_path / "accounts.journal", "a", encoding="utf-8") as f:
+        for line in ('[]', '"x"', '{"op":"put"}', '{"op":"put","account":{}}', '{"op":"delete"}'):
+            f.write(line + "\n")
+
+    store = make_store(tmp_path).load()
+    assert store.verify("alice", "secret")
+    assert not (tmp_path / "accounts.journal").exists()
@@ -0,0 +1,26 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "System64"))
+
+import grep
+
+def open_in(directory):
+    return lambda name: open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace")
+
+def test_match_and_no_match(tmp_path):
+    (tmp_path / "notes.txt").write_text("alpha\nbeta\n", encoding="utf-8")
+    assert grep.run(["beta", "notes.txt"], io.StringIO(), open_in(tmp_path)) == 0
+    assert grep.run(["gamma", "notes.txt"], io.StringIO(), open_in(tmp_path)) == 1
+
+def test_bad_pattern_exits_2(tmp_path):
+    assert grep.run(["(", "notes.txt"], io.StringIO(), open_in(tmp_path)) == 2
+
+def test_missing_file_exits_2(tmp_path):
+    assert grep.run(["alpha", "missing.txt"], io.StringIO(), open_in(tmp_path)) == 2
+
+def test_unreadable_file_exits_2_even_if_another_matched(tmp_path):
+    (tmp_path / "notes.txt").write_text("alpha\n", encoding="utf-8")
+    (tmp_path / "folder").mkdir()
+    assert grep.run(["alpha", "notes.txt", "folder"], io.StringIO(), open_in(tmp_path)) == 2